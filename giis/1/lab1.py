@@ -1,5 +1,78 @@
 import tkinter as tk
-import time
+import os
+import sys
+
+COMMON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "common")
+if COMMON_DIR not in sys.path:
+    sys.path.append(COMMON_DIR)
+
+from framebuffer import resolve
+from raster import LineScene, rasterize_segments
+from surface import PixelSurface
+
+class DebugPlayback:
+    """Покадровое проигрывание записанной последовательности пикселей.
+
+    Пиксели рассчитываются один раз, затем выводятся по таймеру after()
+    по steps_per_frame штук за кадр. Подписи координат берутся из
+    фиксированного пула элементов канвы, поэтому их число не растёт
+    с длиной линии: подписаны только последние pool_size пикселей.
+    """
+
+    def __init__(self, canvas, draw_cell, grid_step, pool_size=64, steps_per_frame=1, frame_ms=10):
+        self.canvas = canvas
+        self.draw_cell = draw_cell
+        self.grid_step = grid_step
+        self.pool_size = pool_size
+        self.steps_per_frame = steps_per_frame
+        self.frame_ms = frame_ms
+        self.labels = []
+        self.pixels = []
+        self.colors = []
+        self.index = 0
+        self.job = None
+
+    def start(self, pixels, colors):
+        """Начинает проигрывание записанных пикселей и их цветов."""
+        self.stop()
+        # Канва могла быть очищена целиком — пул создаётся заново
+        self.labels = [label for label in self.labels if self.canvas.type(label)]
+        self.pixels = pixels
+        self.colors = colors
+        self.index = 0
+        self.job = self.canvas.after(self.frame_ms, self.step)
+
+    def stop(self):
+        """Прерывает проигрывание, если оно идёт."""
+        if self.job is not None:
+            self.canvas.after_cancel(self.job)
+            self.job = None
+
+    def step(self):
+        """Выводит очередную порцию пикселей и планирует следующий кадр."""
+        end = min(self.index + self.steps_per_frame, len(self.pixels))
+        for i in range(self.index, end):
+            x, y = self.pixels[i]
+            self.draw_cell(x, y, self.colors[i])
+            self.place_label(i, x, y)
+        self.index = end
+        if self.index < len(self.pixels):
+            self.job = self.canvas.after(self.frame_ms, self.step)
+        else:
+            self.job = None
+
+    def place_label(self, i, x, y):
+        """Переносит подпись из пула к пикселю (x, y)."""
+        cx = x * self.grid_step + self.grid_step / 2
+        cy = y * self.grid_step + self.grid_step / 2
+        slot = i % self.pool_size
+        if slot < len(self.labels):
+            label = self.labels[slot]
+            self.canvas.coords(label, cx, cy)
+            self.canvas.itemconfigure(label, text=f"({x}, {y})")
+            self.canvas.tag_raise(label)
+        else:
+            self.labels.append(self.canvas.create_text(cx, cy, text=f"({x}, {y})", fill="red"))
 
 class SimpleEditor:
     def __init__(self, master):
@@ -11,6 +84,12 @@ class SimpleEditor:
         self.canvas = tk.Canvas(master, width=self.canvas_width, height=self.canvas_height, bg='white')
         self.canvas.pack()
 
+        # Сцена обычного режима: линии копятся в буфере кадра, и каждая новая
+        # перерисовывает на канве только свой прямоугольник
+        self.scene = LineScene(self.canvas_width, self.canvas_height)
+        self.surface = PixelSurface(self.canvas, self.canvas_width, self.canvas_height)
+        self.showing_debug = False
+
         self.canvas.bind("<Button-1>", self.start_line)
         self.canvas.bind("<ButtonRelease-1>", self.end_line)
 
@@ -25,14 +104,42 @@ class SimpleEditor:
         self.dda_button.pack()
         self.wu_button = tk.Button(master, text="Ву", command=lambda: self.set_algorithm("wu"))
         self.wu_button.pack()
+        self.wu_aa_button = tk.Button(master, text="Ву (накопление)", command=lambda: self.set_algorithm("wu_aa"))
+        self.wu_aa_button.pack()
+        self.bresenham_vec_button = tk.Button(master, text="Брезенхем (NumPy)", command=lambda: self.set_algorithm("bresenham_vec"))
+        self.bresenham_vec_button.pack()
+        self.dda_vec_button = tk.Button(master, text="ЦДА (NumPy)", command=lambda: self.set_algorithm("dda_vec"))
+        self.dda_vec_button.pack()
+        self.bresenham_runs_button = tk.Button(master, text="Брезенхем (серии)", command=lambda: self.set_algorithm("bresenham_runs"))
+        self.bresenham_runs_button.pack()
+        self.dda_fixed_button = tk.Button(master, text="ЦДА (16.16)", command=lambda: self.set_algorithm("dda_fixed"))
+        self.dda_fixed_button.pack()
+        self.wu_fixed_button = tk.Button(master, text="Ву (16.16)", command=lambda: self.set_algorithm("wu_fixed"))
+        self.wu_fixed_button.pack()
+        self.clear_button = tk.Button(master, text="Очистить", command=self.clear_scene)
+        self.clear_button.pack()
+        self.undo_button = tk.Button(master, text="Отменить", command=self.undo_line)
+        self.undo_button.pack()
+        master.bind("<Control-z>", lambda event: self.undo_line())
 
         # Отладочный режим
         self.debug_mode = tk.BooleanVar()
         self.debug_checkbutton = tk.Checkbutton(master, text="Отладочный режим", variable=self.debug_mode)
         self.debug_checkbutton.pack()
+        self.legacy_pixels = tk.BooleanVar()
+        self.legacy_checkbutton = tk.Checkbutton(master, text="Ячейки элементами канвы (отладка)", variable=self.legacy_pixels)
+        self.legacy_checkbutton.pack()
 
         # Шаг сетки (для отладочного режима)
         self.grid_step = 10 # Уменьшаем шаг сетки в 2 раза
+        self.grid_image = None  # Сетка строится один раз и выводится одним изображением
+
+        # Проигрывание отладочного режима
+        self.debug_steps_per_frame = 1
+        self.debug_frame_ms = 10
+        self.playback = DebugPlayback(self.canvas, self.putpixel, self.grid_step,
+                                      steps_per_frame=self.debug_steps_per_frame,
+                                      frame_ms=self.debug_frame_ms)
 
     def set_algorithm(self, algorithm):
         """Устанавливает текущий алгоритм рисования."""
@@ -40,236 +147,68 @@ class SimpleEditor:
 
     def draw_grid(self):
         """Рисует дискретную сетку на канве."""
-        grid_color = "lightgray"
-        for i in range(0, self.canvas_width, self.grid_step):
-            self.canvas.create_line(i, 0, i, self.canvas_height, fill=grid_color)
-        for i in range(0, self.canvas_height, self.grid_step):
-            self.canvas.create_line(0, i, self.canvas_width, i, fill=grid_color)
+        if self.grid_image is None:
+            # Незаписанные пиксели PhotoImage прозрачны, поэтому под сеткой видны ячейки
+            grid_color = "lightgray"
+            self.grid_image = tk.PhotoImage(width=self.canvas_width, height=self.canvas_height)
+            for i in range(0, self.canvas_width, self.grid_step):
+                self.grid_image.put(grid_color, to=(i, 0, i + 1, self.canvas_height))
+            for i in range(0, self.canvas_height, self.grid_step):
+                self.grid_image.put(grid_color, to=(0, i, self.canvas_width, i + 1))
+        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.grid_image, tags="grid")
 
     def putpixel(self, x, y, color="black", algorithm=""):
         """Рисует пиксель на канве."""
         if self.debug_mode.get():
-            # Отладочный режим: рисуем с учетом сетки
-            x0 = x * self.grid_step
-            y0 = y * self.grid_step
-            x1 = x0 + self.grid_step
-            y1 = y0 + self.grid_step
-            self.canvas.create_rectangle(x0, y0, x1, y1, fill=color, outline=color)
-            text_color = "red"
-            self.canvas.create_text(x0 + self.grid_step/2, y0 + self.grid_step/2,
-                                    text=f"({x}, {y})", fill=text_color)
-            self.master.update()
-            time.sleep(0.01)
+            # Отладочный режим: закрашиваем ячейку сетки
+            self.surface.put(x * self.grid_step, y * self.grid_step, color, size=self.grid_step)
         else:
             # Обычный режим: рисуем пиксель размером 1x1
-            self.canvas.create_rectangle(x, y, x, y, fill=color, outline=color)
-
-    def bresenham(self, x1, y1, x2, y2):
-        """Алгоритм Брезенхема для рисования линии."""
-        if self.debug_mode.get():
-            # Отладочный режим: работаем с координатами сетки
-            # Делим координаты на размер ячейки сетки
-            x1 //= self.grid_step
-            y1 //= self.grid_step
-            x2 //= self.grid_step
-            y2 //= self.grid_step
-
-            dx = abs(x2 - x1)
-            dy = abs(y2 - y1)
-            sx = 1 if x1 < x2 else -1
-            sy = 1 if y1 < y2 else -1
-            err = dx - dy
-
-            x = x1
-            y = y1
-            while True:
-                self.putpixel(x, y, color="black", algorithm="Брезенхем")
-                if x == x2 and y == y2:
-                    break
-                e2 = 2 * err
-                if e2 > -dy:
-                    err -= dy
-                    x += sx
-                if e2 < dx:
-                    err += dx
-                    y += sy
-        else:
-            # Обычный режим: используем оригинальный алгоритм Брезенхема
-            dx = abs(x2 - x1)
-            dy = abs(y2 - y1)
-            sx = 1 if x1 < x2 else -1
-            sy = 1 if y1 < y2 else -1
-            err = dx - dy
-
-            x = x1
-            y = y1
-            while True:
-                self.putpixel(x, y, color="black", algorithm="Брезенхем")
-                if x == x2 and y == y2:
-                    break
-                e2 = 2 * err
-                if e2 > -dy:
-                    err -= dy
-                    x += sx
-                if e2 < dx:
-                    err += dx
-                    y += sy
-
-    def dda(self, x1, y1, x2, y2):
-        """Алгоритм ЦДА (DDA) для рисования линии."""
-        if self.debug_mode.get():
-            # Отладочный режим: работаем с координатами сетки
-            # Делим координаты на размер ячейки сетки
-            x1 //= self.grid_step
-            y1 //= self.grid_step
-            x2 //= self.grid_step
-            y2 //= self.grid_step
-
-            dx = x2 - x1
-            dy = y2 - y1
-
-            if abs(dx) > abs(dy):
-                steps = abs(dx)
-            else:
-                steps = abs(dy)
-
-            x_inc = dx / steps
-            y_inc = dy / steps
-
-            x = x1
-            y = y1
-
-            for i in range(steps):
-                self.putpixel(round(x), round(y), color="black", algorithm="ЦДА")
-                x += x_inc
-                y += y_inc
-        else:
-            # Обычный режим: используем оригинальный алгоритм ЦДА
-            dx = x2 - x1
-            dy = y2 - y1
-
-            if abs(dx) > abs(dy):
-                steps = abs(dx)
-            else:
-                steps = abs(dy)
-
-            x_inc = dx / steps
-            y_inc = dy / steps
-
-            x = x1
-            y = y1
-
-            for i in range(steps):
-                self.putpixel(round(x), round(y), color="black", algorithm="ЦДА")
-                x += x_inc
-                y += y_inc
-
-    def wu(self, x1, y1, x2, y2):
-        """Алгоритм Ву для рисования линии с антиалиасингом."""
-        def putpixel_wu(x, y, intensity):
-            """Рисует пиксель с учетом интенсивности (антиалиасинг)"""
-            color = self.intensity(intensity)
-            self.putpixel(x, y, color=color, algorithm="Ву")
-
-        if self.debug_mode.get():
-            # Отладочный режим: работаем с координатами сетки
-            # Делим координаты на размер ячейки сетки
-            x1 //= self.grid_step
-            y1 //= self.grid_step
-            x2 //= self.grid_step
-            y2 //= self.grid_step
-
-            # Используем алгоритм из обычного режима, но с дискретными координатами
-            steep = abs(y2 - y1) > abs(x2 - x1)
-
-            # Изменяем порядок координат, если линия крутая
-            if steep:
-                x1, y1 = y1, x1
-                x2, y2 = y2, x2
-
-            dx = x2 - x1
-            dy = y2 - y1
-
-            gradient = dy / dx
-
-            x_end = round(x1)
-            y_end = y1 + gradient * (x_end - x1)
-            x_gap = 1 - (x1 - int(x1))
-            xpxl1 = x_end
-            ypxl1 = int(y_end)
-
-            def plot(x, y, brightness):
-                if steep:
-                    putpixel_wu(y, x, brightness)
-                else:
-                    putpixel_wu(x, y, brightness)
-
-            plot(xpxl1, ypxl1, 1 - (y_end - int(y_end)))
-            plot(xpxl1, ypxl1 + 1, y_end - int(y_end))
-            intery = y_end + gradient
-
-            x_start = xpxl1 + 1
-            x_end_loop = x2
-
-            if x1 > x2:
-                x_start = xpxl1 - 1
-                x_end_loop = x2
-                gradient = -gradient  # Инвертируем градиент
-
-            x = x_start
-            while (x <= x_end_loop) if (x1 <= x2) else (x >= x_end_loop):
-                plot(x, int(intery), 1 - (intery - int(intery)))
-                plot(x, int(intery) + 1, intery - int(intery))
-                intery += gradient
-                x += 1 if (x1 <= x2) else -1
-        else:
-            # Обычный режим: используем оригинальный алгоритм Ву
-            steep = abs(y2 - y1) > abs(x2 - x1)
-
-            # Изменяем порядок координат, если линия крутая
-            if steep:
-                x1, y1 = y1, x1
-                x2, y2 = y2, x2
-
-            # Изменяем порядок координат, если x1 > x2
-            if x1 > x2:
-                x1, x2 = x2, x1
-                y1, y2 = y2, y1
-
-            dx = x2 - x1
-            dy = y2 - y1
-
-            gradient = dy / dx
-
-            x_end = round(x1)
-            y_end = y1 + gradient * (x_end - x1)
-            x_gap = 1 - (x1 - int(x1))
-            xpxl1 = x_end
-            ypxl1 = int(y_end)
-
-            def plot(x, y, brightness):
-                if steep:
-                    putpixel_wu(y, x, brightness)
-                else:
-                    putpixel_wu(x, y, brightness)
-
-            plot(xpxl1, ypxl1, 1 - (y_end - int(y_end)))
-            plot(xpxl1, ypxl1 + 1, y_end - int(y_end))
-            intery = y_end + gradient
-
-            x = xpxl1 + 1
-            while x <= x2:
-                plot(x, int(intery), 1 - (intery - int(intery)))
-                plot(x, int(intery) + 1, intery - int(intery))
-                intery += gradient
-                x += 1
-
+            self.surface.put(x, y, color)
 
     def intensity(self, value):
         """Вычисляет оттенок серого на основе значения."""
         gray = int(value * 255)
         return "#{:02x}{:02x}{:02x}".format(gray, gray, gray)
 
+    def blit(self, rect):
+        """Выводит на канву прямоугольник rect буфера кадра сцены."""
+        x0, y0, x1, y1 = rect
+        if x0 < x1 and y0 < y1:
+            self.surface.blit(resolve(self.scene.framebuffer[y0:y1, x0:x1]), x0, y0)
+
+    def reset_canvas(self):
+        """Очищает канву, сцену и поверхность пикселей."""
+        self.playback.stop()
+        self.canvas.delete("all")
+        self.scene.clear()
+        self.surface.show()
+        self.surface.clear()
+
+    def clear_scene(self):
+        """Удаляет все нарисованные линии."""
+        self.reset_canvas()
+        self.showing_debug = False
+
+    def undo_line(self):
+        """Убирает последнюю линию сцены и выводит перерисованную область."""
+        if self.showing_debug:
+            return
+        rect = self.scene.remove_last()
+        if rect is not None:
+            self.blit(rect)
+
+    def record_debug_line(self, x1, y1, x2, y2):
+        """Записывает пиксели линии в координатах сетки и их цвета."""
+        segment = (x1 // self.grid_step, y1 // self.grid_step,
+                   x2 // self.grid_step, y2 // self.grid_step)
+        grid_rect = (0, 0, self.canvas_width // self.grid_step - 1,
+                     self.canvas_height // self.grid_step - 1)
+        pixels, coverage, _ = rasterize_segments([segment], algorithm=self.current_algorithm,
+                                                 clip_rect=grid_rect)
+        colors = [self.intensity(1 - c) for c in coverage.tolist()]
+        return pixels.tolist(), colors
+
     def start_line(self, event):
         """Запоминает начальную точку линии."""
         self.start_x = event.x
@@ -277,25 +216,28 @@ class SimpleEditor:
 
     def end_line(self, event):
         """Рисует линию, когда отпускается кнопка мыши."""
-        self.canvas.delete("all")
-
         if self.start_x is not None and self.start_y is not None:
             x1, y1 = self.start_x, self.start_y
             x2, y2 = event.x, event.y
 
-            if self.current_algorithm == "bresenham":
-                self.bresenham(x1, y1, x2, y2)
-            elif self.current_algorithm == "dda":
-                self.dda(x1, y1, x2, y2)
-            elif self.current_algorithm == "wu":
-                self.wu(x1, y1, x2, y2)
-
-            if self.debug_mode.get():
+            if not self.debug_mode.get():
+                # Обычный режим: линия выводится в буфер сцены, на канву копируется её прямоугольник
+                if self.showing_debug:
+                    self.clear_scene()
+                self.surface.legacy = False
+                self.blit(self.scene.add((x1, y1, x2, y2), self.current_algorithm))
+            else:
+                # Отладочный режим показывает одну линию на сетке
+                self.reset_canvas()
+                self.showing_debug = True
+                self.surface.legacy = self.legacy_pixels.get()
                 self.draw_grid()
+                self.playback.start(*self.record_debug_line(x1, y1, x2, y2))
 
             self.start_x = None
             self.start_y = None
 
-root = tk.Tk()
-editor = SimpleEditor(root)
-root.mainloop()
+if __name__ == "__main__":
+    root = tk.Tk()
+    editor = SimpleEditor(root)
+    root.mainloop()
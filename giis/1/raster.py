@@ -0,0 +1,637 @@
+"""Растеризация отрезков без Tk: ЦДА, Брезенхем и Ву над NumPy-буфером кадра."""
+import os
+import sys
+
+import numpy as np
+
+COMMON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "common")
+if COMMON_DIR not in sys.path:
+    sys.path.append(COMMON_DIR)
+
+from clipping import liang_barsky_batch, outcode
+from framebuffer import new_framebuffer, plot_pixels
+
+
+def step_range(start, sign, count, window):
+    """Шаги [first, stop) из count, у которых start + sign * i попадает в window = (lo, hi).
+
+    window — видимый диапазон координаты по основной оси (см. clip_segments);
+    без него выводятся все шаги.
+    """
+    if window is None:
+        return 0, count
+    lo, hi = window
+    if sign > 0:
+        first, stop = lo - start, hi - start + 1
+    else:
+        first, stop = start - hi, start - lo + 1
+    return max(first, 0), max(min(stop, count), 0)
+
+
+def bresenham_pixels(x1, y1, x2, y2, window=None):
+    """Пиксели отрезка по алгоритму Брезенхема, массив (N, 2).
+
+    С window выводятся только шаги, чья координата по основной оси лежит
+    в window; состояние цикла на первом из них берётся в замкнутом виде,
+    как в bresenham_batch, поэтому пиксели те же, что у всей линии.
+    """
+    dx = abs(x2 - x1)
+    dy = abs(y2 - y1)
+    sx = 1 if x1 < x2 else -1
+    sy = 1 if y1 < y2 else -1
+    n = max(dx, dy)
+    x_major = dx >= dy
+    first, stop = step_range(x1 if x_major else y1, sx if x_major else sy, n + 1, window)
+    minor = (2 * first * min(dx, dy) + n - 1) // (2 * n) if n else 0
+    x_steps, y_steps = (first, minor) if x_major else (minor, first)
+    err = dx - dy - x_steps * dy + y_steps * dx
+
+    points = []
+    x = x1 + sx * x_steps
+    y = y1 + sy * y_steps
+    for _ in range(stop - first):
+        points.append((x, y))
+        e2 = 2 * err
+        if e2 > -dy:
+            err -= dy
+            x += sx
+        if e2 < dx:
+            err += dx
+            y += sy
+    return np.array(points, dtype=np.int32).reshape(-1, 2)
+
+
+def major_start(x1, y1, x2, y2):
+    """Начальная координата и направление шага по основной оси (x при |dx| >= |dy|)."""
+    if abs(x2 - x1) >= abs(y2 - y1):
+        return x1, 1 if x2 >= x1 else -1
+    return y1, 1 if y2 >= y1 else -1
+
+
+def dda_pixels(x1, y1, x2, y2, window=None):
+    """Пиксели отрезка по алгоритму ЦДА (без конечной точки, как в редакторе).
+
+    Координата шага i считается как начало + i * приращение, а не
+    накоплением суммы: ошибка округления не копится, и отсечённая линия
+    (window, см. bresenham_pixels) начинается с середины без расхождений.
+    """
+    dx = x2 - x1
+    dy = y2 - y1
+    steps = max(abs(dx), abs(dy))
+    if steps == 0:
+        return np.empty((0, 2), dtype=np.int32)
+
+    x_inc = dx / steps
+    y_inc = dy / steps
+    first, stop = step_range(*major_start(x1, y1, x2, y2), steps, window)
+    points = []
+    for i in range(first, stop):
+        points.append((round(x1 + i * x_inc), round(y1 + i * y_inc)))
+    return np.array(points, dtype=np.int32).reshape(-1, 2)
+
+
+def wu_pixels(x1, y1, x2, y2, window=None):
+    """Пиксели и интенсивности отрезка по алгоритму Ву: ((N, 2), (N,)).
+
+    Как и в dda_pixels, intery столбца i равен y_end + i * gradient;
+    window ограничивает столбцы видимым диапазоном основной оси.
+    """
+    steep = abs(y2 - y1) > abs(x2 - x1)
+    if steep:
+        x1, y1 = y1, x1
+        x2, y2 = y2, x2
+    if x1 > x2:
+        x1, x2 = x2, x1
+        y1, y2 = y2, y1
+
+    dx = x2 - x1
+    dy = y2 - y1
+    # Отрезок нулевой длины вырождается в одну точку
+    gradient = dy / dx if dx else 0.0
+
+    points = []
+    intensity = []
+
+    def plot(x, y, brightness):
+        points.append((y, x) if steep else (x, y))
+        intensity.append(brightness)
+
+    x_end = round(x1)
+    y_end = y1 + gradient * (x_end - x1)
+    first, stop = step_range(x_end, 1, max(x2 - x_end, 0) + 1, window)
+    for i in range(first, stop):
+        intery = y_end + i * gradient
+        plot(x_end + i, int(intery), 1 - (intery - int(intery)))
+        plot(x_end + i, int(intery) + 1, intery - int(intery))
+    return (np.array(points, dtype=np.int32).reshape(-1, 2),
+            np.array(intensity, dtype=np.float32))
+
+
+# Формат 16.16: младшие FRACTION_BITS бит целого — дробная часть
+FRACTION_BITS = 16
+FIXED_ONE = 1 << FRACTION_BITS
+FIXED_HALF = FIXED_ONE >> 1
+
+
+def fixed_divmod(numerator, denominator):
+    """Приращение 16.16 и остаток для шага numerator / denominator (denominator > 0).
+
+    Приращение округлено вниз, а остаток копится в целочисленной ошибке,
+    как в алгоритме Брезенхема: когда ошибка доходит до denominator,
+    координата получает ещё 1/65536. После i шагов координата равна
+    floor(i * numerator * 65536 / denominator) — без накопленного ухода.
+    """
+    return divmod(numerator << FRACTION_BITS, denominator)
+
+
+def dda_pixels_fixed(x1, y1, x2, y2, window=None):
+    """ЦДА в целых числах 16.16: без float в цикле, без конечной точки, как dda_pixels.
+
+    Остаток деления переносится целочисленной ошибкой (fixed_divmod),
+    поэтому координата шага точна и на длинных отрезках. Смещение
+    FIXED_HALF заменяет round() сдвигом вправо (половина округляется
+    вверх, а не к чётному). Состояние на первом шаге window
+    вычисляется сразу делением.
+    """
+    dx = x2 - x1
+    dy = y2 - y1
+    steps = max(abs(dx), abs(dy))
+    if steps == 0:
+        return np.empty((0, 2), dtype=np.int32)
+
+    x_inc, x_rem = fixed_divmod(dx, steps)
+    y_inc, y_rem = fixed_divmod(dy, steps)
+    first, stop = step_range(*major_start(x1, y1, x2, y2), steps, window)
+    x, x_err = divmod(first * (dx << FRACTION_BITS), steps)
+    y, y_err = divmod(first * (dy << FRACTION_BITS), steps)
+    x += (x1 << FRACTION_BITS) + FIXED_HALF
+    y += (y1 << FRACTION_BITS) + FIXED_HALF
+    points = []
+    for i in range(first, stop):
+        points.append((x >> FRACTION_BITS, y >> FRACTION_BITS))
+        x += x_inc
+        x_err += x_rem
+        if x_err >= steps:
+            x_err -= steps
+            x += 1
+        y += y_inc
+        y_err += y_rem
+        if y_err >= steps:
+            y_err -= steps
+            y += 1
+    return np.array(points, dtype=np.int32).reshape(-1, 2)
+
+
+def wu_pixels_fixed(x1, y1, x2, y2, window=None):
+    """Алгоритм Ву в целых числах 16.16: ((N, 2), (N,)).
+
+    Пара пикселей столбца — целая часть intery и следующий за ней,
+    интенсивности берутся из дробных бит и переводятся в float
+    один раз после цикла. Наклон переносит остаток деления, как
+    dda_pixels_fixed, так что intery отличается от точного меньше
+    чем на 1/65536 на любой длине.
+    """
+    steep = abs(y2 - y1) > abs(x2 - x1)
+    if steep:
+        x1, y1 = y1, x1
+        x2, y2 = y2, x2
+    if x1 > x2:
+        x1, x2 = x2, x1
+        y1, y2 = y2, y1
+
+    dx = x2 - x1
+    dy = y2 - y1
+    gradient, remainder = fixed_divmod(dy, dx) if dx else (0, 0)
+
+    points = []
+    fractions = []
+    first, stop = step_range(x1, 1, x2 - x1 + 1, window)
+    intery, error = divmod(first * (dy << FRACTION_BITS), dx) if dx else (0, 0)
+    intery += y1 << FRACTION_BITS
+    for x in range(x1 + first, x1 + stop):
+        y = intery >> FRACTION_BITS
+        points.append((x, y))
+        points.append((x, y + 1))
+        fractions.append(intery & (FIXED_ONE - 1))
+        intery += gradient
+        error += remainder
+        if error >= dx:
+            error -= dx
+            intery += 1
+
+    pixels = np.array(points, dtype=np.int32).reshape(-1, 2)
+    if steep:
+        pixels = pixels[:, ::-1].copy()
+    frac = np.array(fractions, dtype=np.float32) / FIXED_ONE
+    intensity = np.empty(len(pixels), dtype=np.float32)
+    intensity[0::2] = 1 - frac
+    intensity[1::2] = frac
+    return pixels, intensity
+
+
+def bresenham_batch(segments, windows=None):
+    """Векторный Брезенхем для массива отрезков (N, 4) за один проход NumPy.
+
+    Смещение по неосновной оси для шага i равно (2 * i * d_min + n - 1) // (2 * n),
+    где n = max(dx, dy): это то же округление половины вниз, что даёт
+    накопление ошибки в bresenham_pixels, поэтому результат совпадает побитно.
+    Шаг вычисляется независимо от предыдущих, так что windows (N, 2) —
+    видимые диапазоны основной оси — сразу ограничивают шаги видимыми.
+    Возвращает пиксели (M, 2) и смещения (N + 1,).
+    """
+    segments = np.asarray(segments, dtype=np.int64).reshape(-1, 4)
+    x1, y1, x2, y2 = segments.T
+    dx = np.abs(x2 - x1)
+    dy = np.abs(y2 - y1)
+    sx = np.where(x1 < x2, 1, -1)
+    sy = np.where(y1 < y2, 1, -1)
+    n = np.maximum(dx, dy)
+
+    first = np.zeros(len(segments), dtype=np.int64)
+    stop = n + 1
+    if windows is not None:
+        windows = np.asarray(windows, dtype=np.int64).reshape(-1, 2)
+        x_major = dx >= dy
+        start = np.where(x_major, x1, y1)
+        forward = np.where(x_major, sx, sy) > 0
+        first = np.maximum(np.where(forward, windows[:, 0] - start, start - windows[:, 1]), 0)
+        stop = np.maximum(np.minimum(np.where(forward, windows[:, 1] - start, start - windows[:, 0]) + 1, stop), first)
+    counts = stop - first
+    offsets = np.zeros(len(segments) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    owner = np.repeat(np.arange(len(segments)), counts)
+    i = np.arange(offsets[-1]) - offsets[owner] + first[owner]
+
+    n = n[owner]
+    x_major = dx[owner] >= dy[owner]
+    d_min = np.where(x_major, dy[owner], dx[owner])
+    minor = np.where(n > 0, (2 * i * d_min + n - 1) // np.maximum(2 * n, 1), 0)
+
+    pixels = np.empty((len(i), 2), dtype=np.int32)
+    pixels[:, 0] = x1[owner] + sx[owner] * np.where(x_major, i, minor)
+    pixels[:, 1] = y1[owner] + sy[owner] * np.where(x_major, minor, i)
+    return pixels, offsets
+
+
+def bresenham_pixels_vec(x1, y1, x2, y2, window=None):
+    """Векторный вариант bresenham_pixels для одного отрезка."""
+    pixels, _ = bresenham_batch([(x1, y1, x2, y2)], None if window is None else [window])
+    return pixels
+
+
+def dda_pixels_vec(x1, y1, x2, y2, window=None):
+    """Векторный вариант dda_pixels: все пиксели отрезка одним вызовом NumPy.
+
+    Координаты шагов считаются той же формулой x1 + i * x_inc, а np.rint
+    округляет половину к чётному, как round(), поэтому результат
+    совпадает побитно, включая отсутствующую конечную точку.
+    """
+    dx = x2 - x1
+    dy = y2 - y1
+    steps = max(abs(dx), abs(dy))
+    if steps == 0:
+        return np.empty((0, 2), dtype=np.int32)
+
+    i = np.arange(*step_range(*major_start(x1, y1, x2, y2), steps, window))
+    pixels = np.empty((len(i), 2), dtype=np.int32)
+    pixels[:, 0] = np.rint(x1 + i * (dx / steps))
+    pixels[:, 1] = np.rint(y1 + i * (dy / steps))
+    return pixels
+
+
+def wu_pixels_vec(x1, y1, x2, y2, window=None):
+    """Векторный вариант wu_pixels: пиксели и интенсивности одним вызовом NumPy."""
+    steep = abs(y2 - y1) > abs(x2 - x1)
+    if steep:
+        x1, y1 = y1, x1
+        x2, y2 = y2, x2
+    if x1 > x2:
+        x1, x2 = x2, x1
+        y1, y2 = y2, y1
+
+    dx = x2 - x1
+    dy = y2 - y1
+    gradient = dy / dx if dx else 0.0
+
+    x_end = round(x1)
+    y_end = y1 + gradient * (x_end - x1)
+    # Тот же intery = y_end + i * gradient, что в цикле wu_pixels
+    i = np.arange(*step_range(x_end, 1, max(x2 - x_end, 0) + 1, window))
+    intery = y_end + i * gradient
+    base = np.trunc(intery)
+    frac = intery - base
+
+    xs = x_end + i
+    pixels = np.empty((2 * len(i), 2), dtype=np.int32)
+    pixels[0::2, 0] = xs
+    pixels[1::2, 0] = xs
+    pixels[0::2, 1] = base
+    pixels[1::2, 1] = base + 1
+    if steep:
+        pixels = pixels[:, ::-1].copy()
+
+    intensity = np.empty(2 * len(i), dtype=np.float32)
+    intensity[0::2] = 1 - frac
+    intensity[1::2] = frac
+    return pixels, intensity
+
+
+def bresenham_runs(x1, y1, x2, y2, window=None):
+    """Брезенхем по сериям (run-slice): одна итерация на серию, а не на пиксель.
+
+    Серия — отрезок пикселей вдоль основной оси с одинаковой координатой по
+    неосновной. Начало серии m находится целочисленно как наименьший шаг i,
+    для которого (2 * i * d_min + n - 1) // (2 * n) >= m.
+    С window (см. bresenham_pixels) перебираются только серии видимых шагов.
+    Возвращает серии (R, 3) вида x, y, длина, где x, y — меньший конец
+    серии, и признак горизонтальности серий.
+    """
+    dx = abs(x2 - x1)
+    dy = abs(y2 - y1)
+    sx = 1 if x1 < x2 else -1
+    sy = 1 if y1 < y2 else -1
+    horizontal = dx >= dy
+    n = max(dx, dy)
+    d_min = min(dx, dy)
+    first, stop = step_range(x1 if horizontal else y1, sx if horizontal else sy, n + 1, window)
+
+    def run_start(m):
+        # Наименьший i с 2 * i * d_min >= 2 * n * m - n + 1
+        if m == 0:
+            return 0
+        if m > d_min:
+            return n + 1
+        return -((n - 1 - 2 * n * m) // (2 * d_min))
+
+    runs = []
+    if first < stop:
+        m_first = (2 * first * d_min + n - 1) // (2 * n) if n else 0
+        m_last = (2 * (stop - 1) * d_min + n - 1) // (2 * n) if n else 0
+        for m in range(m_first, m_last + 1):
+            start = max(run_start(m), first)
+            end = min(run_start(m + 1), stop)
+            if horizontal:
+                low, high = x1 + sx * start, x1 + sx * (end - 1)
+                runs.append((min(low, high), y1 + sy * m, end - start))
+            else:
+                low, high = y1 + sy * start, y1 + sy * (end - 1)
+                runs.append((x1 + sx * m, min(low, high), end - start))
+    return np.array(runs, dtype=np.int32).reshape(-1, 3), horizontal
+
+
+def expand_runs(runs, horizontal):
+    """Разворачивает серии в отдельные пиксели (M, 2)."""
+    lengths = runs[:, 2]
+    owner = np.repeat(np.arange(len(runs)), lengths)
+    starts = np.cumsum(lengths) - lengths
+    step = np.arange(lengths.sum()) - starts[owner]
+    pixels = np.empty((len(step), 2), dtype=np.int32)
+    pixels[:, 0] = runs[owner, 0] + (step if horizontal else 0)
+    pixels[:, 1] = runs[owner, 1] + (0 if horizontal else step)
+    return pixels
+
+
+def fill_runs(framebuffer, runs, horizontal, value=None):
+    """Заливает серии в буфер кадра срезами строк/столбцов (аналог memset)."""
+    if value is None:
+        value = 255 if framebuffer.dtype == np.uint8 else 1.0
+    height, width = framebuffer.shape
+    for x, y, length in runs.tolist():
+        if horizontal:
+            start, end = max(x, 0), min(x + length, width)
+            if 0 <= y < height and start < end:
+                framebuffer[y, start:end] = value
+        else:
+            start, end = max(y, 0), min(y + length, height)
+            if 0 <= x < width and start < end:
+                framebuffer[start:end, x] = value
+
+
+def bresenham_pixels_runs(x1, y1, x2, y2, window=None):
+    """Пиксели отрезка, полученные разворачиванием серий bresenham_runs."""
+    return expand_runs(*bresenham_runs(x1, y1, x2, y2, window))
+
+
+def _aliased(algorithm):
+    def pixels_with_coverage(x1, y1, x2, y2, window=None):
+        pixels = algorithm(x1, y1, x2, y2, window)
+        return pixels, np.ones(len(pixels), dtype=np.float32)
+    return pixels_with_coverage
+
+
+# Каждый алгоритм (x1, y1, x2, y2, window=None) возвращает пиксели и их покрытие в диапазоне [0, 1]
+LINE_ALGORITHMS = {
+    "bresenham": _aliased(bresenham_pixels),
+    "dda": _aliased(dda_pixels),
+    "wu": wu_pixels,
+    "bresenham_vec": _aliased(bresenham_pixels_vec),
+    "dda_vec": _aliased(dda_pixels_vec),
+    "wu_aa": wu_pixels_vec,
+    "bresenham_runs": _aliased(bresenham_pixels_runs),
+    "dda_fixed": _aliased(dda_pixels_fixed),
+    "wu_fixed": wu_pixels_fixed,
+}
+
+# Режимы, покрытие которых складывается в буфере float32, а не перезаписывается
+ACCUMULATING_ALGORITHMS = {"wu_aa"}
+
+
+# Запас отсечения: пиксель отстоит от точной линии по неосновной оси меньше
+# чем на 1 (второй пиксель Ву), поэтому шаги, чья точка линии дальше 2 от
+# прямоугольника, заведомо не дают в нём пикселей
+CLIP_MARGIN = 2
+
+
+def clip_segments(segments, clip_rect):
+    """Видимые диапазоны основной оси (N, 2) отрезков (N, 4) для прямоугольника clip_rect.
+
+    Основная ось — x при |dx| >= |dy|, иначе y, как у всех алгоритмов
+    LINE_ALGORITHMS. Прямоугольник расширяется на CLIP_MARGIN; коды
+    Коэна–Сазерленда сразу принимают отрезки внутри него (весь диапазон)
+    и отбрасывают лежащие по одну сторону (пустой диапазон lo > hi),
+    остальные отсекаются векторным Лиангом–Барски. Сами отрезки не
+    меняются: округлённые концы отсечённой части дали бы другие пиксели.
+    """
+    segments = np.asarray(segments, dtype=np.int64).reshape(-1, 4)
+    xmin, ymin, xmax, ymax = clip_rect
+    rect = (xmin - CLIP_MARGIN, ymin - CLIP_MARGIN, xmax + CLIP_MARGIN, ymax + CLIP_MARGIN)
+    x1, y1, x2, y2 = segments.T
+    x_major = np.abs(x2 - x1) >= np.abs(y2 - y1)
+    starts = np.where(x_major, x1, y1)
+    ends = np.where(x_major, x2, y2)
+    windows = np.column_stack((np.minimum(starts, ends), np.maximum(starts, ends)))
+
+    code1 = outcode(x1, y1, *rect)
+    code2 = outcode(x2, y2, *rect)
+    windows[(code1 & code2) != 0] = (1, 0)
+    partial = ((code1 | code2) != 0) & ((code1 & code2) == 0)
+    if partial.any():
+        clipped, visible = liang_barsky_batch(segments[partial], *rect)
+        major = np.where(x_major[partial, np.newaxis], clipped[:, 0::2], clipped[:, 1::2])
+        with np.errstate(invalid="ignore"):
+            lo = np.ceil(major.min(axis=1))
+            hi = np.floor(major.max(axis=1))
+        windows[partial] = np.where(visible[:, np.newaxis], np.column_stack((lo, hi)), (1, 0))
+    return windows
+
+
+def rasterize_segments(segments, framebuffer=None, algorithm="bresenham", clip_rect=None):
+    """Растеризует массив отрезков (N, 4) вида x1, y1, x2, y2.
+
+    Возвращает упакованные пиксели (M, 2), их покрытие (M,) и смещения (N + 1,):
+    пиксели отрезка i лежат в pixels[offsets[i]:offsets[i + 1]].
+    Если передан буфер кадра, пиксели сразу записываются в него
+    (для режимов из ACCUMULATING_ALGORITHMS — прибавляются).
+    С clip_rect (а если он не задан — по границам буфера кадра) каждый
+    отрезок выводится только в видимом диапазоне шагов (clip_segments):
+    работа пропорциональна видимой части, а пиксели внутри прямоугольника
+    те же, что у неотсечённой линии.
+    """
+    if algorithm not in LINE_ALGORITHMS:
+        raise ValueError(f"Неизвестный алгоритм: {algorithm}")
+    segments = np.asarray(segments, dtype=np.int64).reshape(-1, 4)
+    if clip_rect is None and framebuffer is not None:
+        height, width = framebuffer.shape
+        clip_rect = (0, 0, width - 1, height - 1)
+    if clip_rect is None:
+        return _rasterize(segments, framebuffer, algorithm)
+
+    windows = clip_segments(segments, clip_rect)
+    visible = windows[:, 0] <= windows[:, 1]
+    pixels, coverage, visible_offsets = _rasterize(segments[visible], None, algorithm, windows[visible])
+    xmin, ymin, xmax, ymax = clip_rect
+    inside = (pixels[:, 0] >= xmin) & (pixels[:, 0] <= xmax) & (pixels[:, 1] >= ymin) & (pixels[:, 1] <= ymax)
+    owners = np.repeat(np.flatnonzero(visible), np.diff(visible_offsets))
+    pixels = pixels[inside]
+    coverage = coverage[inside]
+    offsets = np.zeros(len(segments) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(owners[inside], minlength=len(segments)), out=offsets[1:])
+    if framebuffer is not None:
+        plot_pixels(framebuffer, pixels, coverage, algorithm in ACCUMULATING_ALGORITHMS)
+    return pixels, coverage, offsets
+
+
+def _rasterize(segments, framebuffer, algorithm, windows=None):
+    """Растеризация без отсечения (или в диапазонах windows); см. rasterize_segments."""
+    if algorithm == "bresenham_vec":
+        pixels, offsets = bresenham_batch(segments, windows)
+        coverage = np.ones(len(pixels), dtype=np.float32)
+        if framebuffer is not None:
+            plot_pixels(framebuffer, pixels, coverage)
+        return pixels, coverage, offsets
+    if algorithm == "bresenham_runs":
+        return _rasterize_runs(segments, framebuffer, windows)
+
+    rasterize = LINE_ALGORITHMS[algorithm]
+    pixel_parts = []
+    coverage_parts = []
+    offsets = np.zeros(len(segments) + 1, dtype=np.int64)
+    for i, (x1, y1, x2, y2) in enumerate(segments.tolist()):
+        pixels, coverage = rasterize(x1, y1, x2, y2, None if windows is None else tuple(windows[i].tolist()))
+        pixel_parts.append(pixels)
+        coverage_parts.append(coverage)
+        offsets[i + 1] = offsets[i] + len(pixels)
+
+    if pixel_parts:
+        pixels = np.concatenate(pixel_parts).astype(np.int32, copy=False)
+        coverage = np.concatenate(coverage_parts).astype(np.float32, copy=False)
+    else:
+        pixels = np.empty((0, 2), dtype=np.int32)
+        coverage = np.empty(0, dtype=np.float32)
+
+    if framebuffer is not None:
+        plot_pixels(framebuffer, pixels, coverage, algorithm in ACCUMULATING_ALGORITHMS)
+    return pixels, coverage, offsets
+
+
+def _rasterize_runs(segments, framebuffer, windows=None):
+    """rasterize_segments для режима серий: буфер заполняется срезами."""
+    pixel_parts = [np.empty((0, 2), dtype=np.int32)]
+    offsets = np.zeros(len(segments) + 1, dtype=np.int64)
+    for i, (x1, y1, x2, y2) in enumerate(segments.tolist()):
+        runs, horizontal = bresenham_runs(x1, y1, x2, y2, None if windows is None else tuple(windows[i].tolist()))
+        if framebuffer is not None:
+            fill_runs(framebuffer, runs, horizontal)
+        pixel_parts.append(expand_runs(runs, horizontal))
+        offsets[i + 1] = offsets[i] + len(pixel_parts[-1])
+    pixels = np.concatenate(pixel_parts)
+    return pixels, np.ones(len(pixels), dtype=np.float32), offsets
+
+
+class LineScene:
+    """Сохранённая сцена отрезков с ограничивающими прямоугольниками.
+
+    Новый отрезок просто выводится поверх буфера кадра — так же, как при
+    полной перерисовке, где он идёт последним, — и время добавления не
+    зависит от размера сцены. Удаление перерисовывает прямоугольник
+    удалённого отрезка из тех отрезков сцены, которые его задевают.
+    Прямоугольники хранятся полуоткрытыми: (x0, y0, x1, y1), x1 и y1 не входят.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.framebuffer = new_framebuffer(width, height, dtype=np.float32)
+        self.items = []
+
+    def bbox(self, segment):
+        """Прямоугольник отрезка в пределах буфера; +1 захватывает второй пиксель Ву."""
+        x1, y1, x2, y2 = segment
+        return (max(min(x1, x2), 0), max(min(y1, y2), 0),
+                min(max(x1, x2) + 2, self.width), min(max(y1, y2) + 2, self.height))
+
+    def add(self, segment, algorithm="bresenham"):
+        """Добавляет отрезок и выводит его в буфер; возвращает грязный прямоугольник."""
+        if algorithm not in LINE_ALGORITHMS:
+            raise ValueError(f"Неизвестный алгоритм: {algorithm}")
+        rect = self.bbox(segment)
+        self.items.append((tuple(segment), algorithm, rect))
+        rasterize_segments([segment], self.framebuffer, algorithm)
+        return rect
+
+    def remove_last(self):
+        """Убирает последний отрезок и перерисовывает его прямоугольник; None, если сцена пуста."""
+        if not self.items:
+            return None
+        _, _, rect = self.items.pop()
+        self.repaint(rect)
+        return rect
+
+    def clear(self):
+        """Удаляет все отрезки сцены."""
+        self.items = []
+        self.framebuffer.fill(0)
+
+    def repaint(self, rect):
+        """Заново выводит в буфер прямоугольник rect из отрезков, которые его задевают.
+
+        Подряд идущие отрезки одного алгоритма выводятся одним вызовом
+        rasterize_segments, отсечённым по rect: пиксели те же, что у
+        целых линий, а работа — только внутри прямоугольника.
+        """
+        x0, y0, x1, y1 = rect
+        if x0 >= x1 or y0 >= y1:
+            return
+        # Область собирается в отдельном буфере и копируется целиком
+        patch = new_framebuffer(x1 - x0, y1 - y0, dtype=np.float32)
+        offset = np.array([x0, y0], dtype=np.int32)
+        touching = [(segment, algorithm) for segment, algorithm, bbox in self.items
+                    if not (bbox[2] <= x0 or bbox[0] >= x1 or bbox[3] <= y0 or bbox[1] >= y1)]
+        start = 0
+        while start < len(touching):
+            algorithm = touching[start][1]
+            stop = start + 1
+            while stop < len(touching) and touching[stop][1] == algorithm:
+                stop += 1
+            segments = [segment for segment, _ in touching[start:stop]]
+            pixels, coverage, _ = rasterize_segments(segments, algorithm=algorithm, clip_rect=(x0, y0, x1 - 1, y1 - 1))
+            accumulate = algorithm in ACCUMULATING_ALGORITHMS
+            if not accumulate:
+                # Как при выводе по одному: из повторов пикселя остаётся последний
+                flat = (pixels[:, 1].astype(np.int64) - y0) * (x1 - x0) + (pixels[:, 0] - x0)
+                _, last = np.unique(flat[::-1], return_index=True)
+                keep = np.sort(len(flat) - 1 - last)
+                pixels, coverage = pixels[keep], coverage[keep]
+            plot_pixels(patch, pixels - offset, coverage, accumulate)
+            start = stop
+        self.framebuffer[y0:y1, x0:x1] = patch
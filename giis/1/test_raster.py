@@ -0,0 +1,340 @@
+import unittest
+
+import numpy as np
+
+from raster import (bresenham_pixels, dda_pixels, wu_pixels, bresenham_batch,
+                    dda_pixels_fixed, wu_pixels_fixed, FIXED_ONE,
+                    bresenham_pixels_vec, dda_pixels_vec, wu_pixels_vec,
+                    bresenham_runs, expand_runs,
+                    new_framebuffer, rasterize_segments, plot_pixels,
+                    ACCUMULATING_ALGORITHMS, LINE_ALGORITHMS, LineScene)
+from framebuffer import resolve  # Каталог common добавляет в sys.path модуль raster
+
+
+class TestLinePixels(unittest.TestCase):
+    def test_bresenham_includes_both_endpoints(self):
+        pixels = bresenham_pixels(2, 3, 12, 7)
+        self.assertEqual(tuple(pixels[0]), (2, 3))
+        self.assertEqual(tuple(pixels[-1]), (12, 7))
+        self.assertEqual(len(pixels), 11)
+
+    def test_bresenham_zero_length(self):
+        self.assertEqual(bresenham_pixels(5, 5, 5, 5).tolist(), [[5, 5]])
+
+    def test_dda_skips_final_pixel(self):
+        pixels = dda_pixels(0, 0, 10, 4)
+        self.assertEqual(len(pixels), 10)
+        self.assertEqual(tuple(pixels[0]), (0, 0))
+        self.assertNotIn([10, 4], pixels.tolist())
+
+    def test_dda_zero_length(self):
+        self.assertEqual(dda_pixels(5, 5, 5, 5).shape, (0, 2))
+
+    def test_wu_intensity_pairs_sum_to_one(self):
+        pixels, intensity = wu_pixels(0, 0, 9, 4)
+        self.assertEqual(len(pixels), len(intensity))
+        np.testing.assert_allclose(intensity[0::2] + intensity[1::2], 1.0, atol=1e-6)
+
+
+class TestVectorizedLines(unittest.TestCase):
+    def endpoints(self):
+        # Все октанты, оси, диагонали и отрезки нулевой длины
+        for dx in range(-12, 13):
+            for dy in range(-12, 13):
+                yield 7, -3, 7 + dx, -3 + dy
+        rng = np.random.default_rng(2)
+        for x1, y1, x2, y2 in rng.integers(-2000, 2000, size=(100, 4)).tolist():
+            yield x1, y1, x2, y2
+
+    def test_bresenham_vec_matches_loop(self):
+        for segment in self.endpoints():
+            np.testing.assert_array_equal(bresenham_pixels_vec(*segment),
+                                          bresenham_pixels(*segment), err_msg=str(segment))
+
+    def test_dda_vec_matches_loop(self):
+        for segment in self.endpoints():
+            np.testing.assert_array_equal(dda_pixels_vec(*segment),
+                                          dda_pixels(*segment), err_msg=str(segment))
+
+    def test_wu_vec_matches_loop(self):
+        for segment in self.endpoints():
+            pixels, intensity = wu_pixels_vec(*segment)
+            expected_pixels, expected_intensity = wu_pixels(*segment)
+            np.testing.assert_array_equal(pixels, expected_pixels, err_msg=str(segment))
+            np.testing.assert_array_equal(intensity, expected_intensity, err_msg=str(segment))
+
+    def test_runs_cover_same_pixel_set_as_bresenham(self):
+        for segment in self.endpoints():
+            runs, horizontal = bresenham_runs(*segment)
+            pixels = expand_runs(runs, horizontal)
+            expected = bresenham_pixels(*segment)
+            self.assertEqual(len(pixels), len(expected), str(segment))
+            self.assertEqual(set(map(tuple, pixels.tolist())),
+                             set(map(tuple, expected.tolist())), str(segment))
+
+    def test_runs_are_one_per_minor_step(self):
+        runs, horizontal = bresenham_runs(0, 0, 1000, 3)
+        self.assertTrue(horizontal)
+        self.assertEqual(len(runs), 4)
+        self.assertEqual(int(runs[:, 2].sum()), 1001)
+
+    def test_runs_mode_fills_framebuffer(self):
+        segments = [(3, 2, 60, 9), (40, 1, 35, 30), (-10, 5, 10, -3)]
+        expected = new_framebuffer(64, 32)
+        rasterize_segments(segments, expected, "bresenham")
+        framebuffer = new_framebuffer(64, 32)
+        rasterize_segments(segments, framebuffer, "bresenham_runs")
+        np.testing.assert_array_equal(framebuffer, expected)
+
+    def test_bresenham_batch_offsets(self):
+        segments = list(self.endpoints())[:50]
+        pixels, offsets = bresenham_batch(segments)
+        for i, segment in enumerate(segments):
+            np.testing.assert_array_equal(pixels[offsets[i]:offsets[i + 1]],
+                                          bresenham_pixels(*segment))
+
+    def test_vec_modes_in_rasterize_segments(self):
+        segments = [(0, 0, 30, 11), (4, 4, 4, 4), (20, 3, -5, 9)]
+        for mode in ("bresenham", "dda"):
+            expected, _, expected_offsets = rasterize_segments(segments, algorithm=mode)
+            pixels, _, offsets = rasterize_segments(segments, algorithm=mode + "_vec")
+            np.testing.assert_array_equal(pixels, expected)
+            np.testing.assert_array_equal(offsets, expected_offsets)
+
+
+class TestFixedPointLines(unittest.TestCase):
+    endpoints = TestVectorizedLines.endpoints
+
+    # Отрезки длиной 10 000 пикселей во всех октантах
+    LONG_SEGMENTS = [(0, 0, 10000, 3333), (0, 0, 3333, 10000), (10000, 0, 0, 7071),
+                     (0, 10000, 9999, 0), (5000, 5000, -5000, 4999), (0, 0, 10000, 10000)]
+
+    def test_dda_fixed_close_to_float(self):
+        for segment in self.endpoints():
+            fixed = dda_pixels_fixed(*segment)
+            floating = dda_pixels(*segment)
+            self.assertEqual(fixed.shape, floating.shape, segment)
+            if len(fixed):
+                self.assertLessEqual(np.abs(fixed - floating).max(), 1, segment)
+
+    def test_dda_fixed_drift_on_long_lines(self):
+        for x1, y1, x2, y2 in self.LONG_SEGMENTS:
+            pixels = dda_pixels_fixed(x1, y1, x2, y2)
+            steps = max(abs(x2 - x1), abs(y2 - y1))
+            i = np.arange(steps)
+            # Точное округление половины вверх: floor(x1 + i * dx / steps + 1/2) в целых числах
+            exact = np.column_stack((x1 + (2 * i * (x2 - x1) + steps) // (2 * steps),
+                                     y1 + (2 * i * (y2 - y1) + steps) // (2 * steps)))
+            np.testing.assert_array_equal(pixels, exact)
+
+    def test_wu_fixed_close_to_float(self):
+        for segment in self.endpoints():
+            fixed, fixed_intensity = wu_pixels_fixed(*segment)
+            floating, float_intensity = wu_pixels(*segment)
+            self.assertEqual(fixed.shape, floating.shape, segment)
+            np.testing.assert_allclose(fixed_intensity[0::2] + fixed_intensity[1::2], 1)
+            # Центр тяжести пары пикселей совпадает с float-версией; допуск задают
+            # интенсивности float32 у float-версии (у 16.16 они точны)
+            minor = 0 if abs(segment[3] - segment[1]) > abs(segment[2] - segment[0]) else 1
+            np.testing.assert_allclose(
+                (fixed[:, minor] * fixed_intensity).reshape(-1, 2).sum(axis=1),
+                (floating[:, minor] * float_intensity).reshape(-1, 2).sum(axis=1), rtol=0, atol=1e-3)
+
+    def test_wu_fixed_drift_on_long_lines(self):
+        for x1, y1, x2, y2 in self.LONG_SEGMENTS:
+            pixels, intensity = wu_pixels_fixed(x1, y1, x2, y2)
+            steep = abs(y2 - y1) > abs(x2 - x1)
+            major, minor = (1, 0) if steep else (0, 1)
+            start, end = sorted([(x1, y1), (x2, y2)], key=lambda p: p[major])
+            columns = pixels[0::2, major]
+            ideal = start[minor] + (columns - start[major]) * (end[minor] - start[minor]) / (end[major] - start[major])
+            centre = (pixels[:, minor] * intensity).reshape(-1, 2).sum(axis=1)
+            # intery — точное значение, округлённое вниз до 1/65536
+            error = ideal - centre
+            self.assertGreaterEqual(error.min(), -1e-9)
+            self.assertLess(error.max(), 1 / FIXED_ONE + 1e-9)
+
+    def test_wu_fixed_intensity_resolution(self):
+        _, intensity = wu_pixels_fixed(0, 0, 3, 1)
+        np.testing.assert_array_equal(intensity * FIXED_ONE, np.rint(intensity * FIXED_ONE))
+
+    def test_fixed_modes_in_rasterize_segments(self):
+        for algorithm in ("dda_fixed", "wu_fixed"):
+            framebuffer = new_framebuffer(20, 20, dtype=np.float32)
+            rasterize_segments([(1, 1, 15, 9)], framebuffer, algorithm)
+            self.assertGreater(framebuffer[1, 1], 0.99, algorithm)
+
+
+class TestRasterizeSegments(unittest.TestCase):
+    def test_offsets_split_packed_pixels(self):
+        segments = np.array([[0, 0, 5, 0], [0, 0, 0, 3], [1, 1, 1, 1]])
+        pixels, coverage, offsets = rasterize_segments(segments)
+        self.assertEqual(offsets.tolist(), [0, 6, 10, 11])
+        self.assertEqual(pixels.shape, (11, 2))
+        self.assertTrue(np.all(coverage == 1.0))
+        np.testing.assert_array_equal(pixels[6:10], bresenham_pixels(0, 0, 0, 3))
+
+    def test_framebuffer_drops_outside_pixels(self):
+        framebuffer = new_framebuffer(8, 4)
+        rasterize_segments([(-4, 1, 20, 1)], framebuffer)
+        self.assertEqual(framebuffer[1].tolist(), [255] * 8)
+        self.assertEqual(int(framebuffer.sum()), 255 * 8)
+
+    def test_float_framebuffer_stores_coverage(self):
+        framebuffer = new_framebuffer(16, 16, dtype=np.float32)
+        _, coverage, _ = rasterize_segments([(0, 0, 15, 5)], framebuffer, "wu")
+        self.assertEqual(framebuffer.dtype, np.float32)
+        self.assertLessEqual(framebuffer.max(), 1.0)
+        self.assertGreater(framebuffer.sum(), 0)
+
+    def test_wu_aa_accumulates_overlapping_lines(self):
+        framebuffer = new_framebuffer(32, 32, dtype=np.float32)
+        rasterize_segments([(0, 4, 31, 20), (0, 4, 31, 20)], framebuffer, "wu_aa")
+        single = new_framebuffer(32, 32, dtype=np.float32)
+        rasterize_segments([(0, 4, 31, 20)], single, "wu")
+        np.testing.assert_allclose(framebuffer, 2 * single, atol=1e-6)
+
+    def test_accumulation_into_slice(self):
+        framebuffer = new_framebuffer(16, 16, dtype=np.float32)
+        pixels = np.array([(1, 1), (1, 1), (3, 2)], dtype=np.int32)
+        plot_pixels(framebuffer[4:10, 2:12], pixels, np.full(3, 0.25, dtype=np.float32), accumulate=True)
+        self.assertAlmostEqual(framebuffer[5, 3], 0.5)
+        self.assertAlmostEqual(framebuffer[6, 5], 0.25)
+        self.assertAlmostEqual(framebuffer.sum(), 0.75)
+
+    def test_clipping_keeps_unclipped_pixels(self):
+        rect = (0, 0, 39, 29)
+        rng = np.random.default_rng(8)
+        segments = np.concatenate((rng.integers(-60, 100, (60, 4)), rng.integers(-3000, 3000, (20, 4))))
+        for algorithm in LINE_ALGORITHMS:
+            pixels, coverage, offsets = rasterize_segments(segments, algorithm=algorithm, clip_rect=rect)
+            for i, segment in enumerate(segments.tolist()):
+                full, full_coverage = LINE_ALGORITHMS[algorithm](*segment)
+                inside = (full[:, 0] >= 0) & (full[:, 0] <= 39) & (full[:, 1] >= 0) & (full[:, 1] <= 29)
+                np.testing.assert_array_equal(pixels[offsets[i]:offsets[i + 1]], full[inside], err_msg=algorithm)
+                np.testing.assert_array_equal(coverage[offsets[i]:offsets[i + 1]], full_coverage[inside])
+
+    def test_clipped_work_follows_visible_part(self):
+        # Полная растеризация таких отрезков заняла бы минуты: выводятся только видимые шаги
+        framebuffer = new_framebuffer(800, 600, dtype=np.float32)
+        segments = [(400, 300, 10 ** 9, 300), (400, 300, 10 ** 9, 301), (-10 ** 9, 10 ** 9, 300, -10 ** 9)]
+        for algorithm in LINE_ALGORITHMS:
+            pixels, _, offsets = rasterize_segments(segments, framebuffer, algorithm)
+            # Ву выводит по два пикселя на столбец
+            self.assertIn(offsets[1], (400, 800), algorithm)
+            self.assertLessEqual(len(pixels), 2 * (400 + 400 + 600), algorithm)
+
+    def test_window_selects_steps_of_full_line(self):
+        segment = (30, -7, -45, 12)
+        full = bresenham_pixels(*segment)
+        np.testing.assert_array_equal(bresenham_pixels(*segment, window=(-10, 5)), full[25:41])
+        np.testing.assert_array_equal(bresenham_pixels_vec(*segment, window=(-10, 5)), full[25:41])
+        np.testing.assert_array_equal(dda_pixels(*segment, window=(-10, 5)), dda_pixels(*segment)[25:41])
+        pixels, intensity = wu_pixels(*segment, window=(-10, 5))
+        full, full_intensity = wu_pixels(*segment)
+        np.testing.assert_array_equal(pixels, full[2 * 35:2 * 51])
+        np.testing.assert_array_equal(intensity, full_intensity[2 * 35:2 * 51])
+        self.assertEqual(bresenham_pixels(*segment, window=(100, 200)).shape, (0, 2))
+
+    def test_accumulation_requires_float_buffer(self):
+        with self.assertRaises(ValueError):
+            rasterize_segments([(0, 0, 5, 2)], new_framebuffer(8, 8), "wu_aa")
+
+    def test_resolve_blends_and_saturates(self):
+        framebuffer = np.array([[0.0, 0.5, 3.0]], dtype=np.float32)
+        rgb = resolve(framebuffer, ink=(0, 0, 255), background=(255, 255, 255))
+        self.assertEqual(rgb.dtype, np.uint8)
+        self.assertEqual(rgb[0].tolist(), [[255, 255, 255], [128, 128, 255], [0, 0, 255]])
+
+    def test_offscreen_segments_are_clipped_away(self):
+        framebuffer = new_framebuffer(64, 48)
+        segments = [(-100000, -5, -1, 100000), (5, 5, 40, 30), (-100000, 10, 100000, 10)]
+        pixels, _, offsets = rasterize_segments(segments, framebuffer)
+        self.assertEqual(offsets[1] - offsets[0], 0)
+        np.testing.assert_array_equal(pixels[offsets[1]:offsets[2]], bresenham_pixels(5, 5, 40, 30))
+        self.assertEqual(offsets[3] - offsets[2], 64)
+
+    def test_explicit_clip_rect_without_framebuffer(self):
+        pixels, _, offsets = rasterize_segments([(-50, 3, 50, 3)], algorithm="dda",
+                                                clip_rect=(0, 0, 9, 9))
+        self.assertEqual(pixels[:, 0].min(), 0)
+        self.assertEqual(pixels[:, 0].max(), 9)
+
+    def test_unknown_algorithm(self):
+        with self.assertRaises(ValueError):
+            rasterize_segments([(0, 0, 1, 1)], algorithm="spline")
+
+
+class TestLineScene(unittest.TestCase):
+    def full_redraw(self, scene):
+        framebuffer = new_framebuffer(scene.width, scene.height, dtype=np.float32)
+        for segment, algorithm, _ in scene.items:
+            pixels, coverage, _ = rasterize_segments([segment], algorithm=algorithm,
+                                                     clip_rect=(0, 0, scene.width - 1, scene.height - 1))
+            plot_pixels(framebuffer, pixels, coverage, algorithm in ACCUMULATING_ALGORITHMS)
+        return framebuffer
+
+    def test_incremental_matches_full_redraw(self):
+        rng = np.random.default_rng(3)
+        scene = LineScene(120, 80)
+        algorithms = ["bresenham", "dda", "wu", "wu_aa", "bresenham_runs"]
+        for i in range(40):
+            segment = tuple(rng.integers(-20, 140, 4).tolist())
+            scene.add(segment, algorithms[i % len(algorithms)])
+        np.testing.assert_allclose(scene.framebuffer, self.full_redraw(scene), atol=1e-5)
+
+    def test_add_returns_clamped_dirty_rect(self):
+        scene = LineScene(50, 40)
+        self.assertEqual(scene.add((10, 30, 3, 5)), (3, 5, 12, 32))
+        self.assertEqual(scene.add((-5, -5, 100, 100)), (0, 0, 50, 40))
+
+    def test_repaint_leaves_pixels_outside_rect(self):
+        scene = LineScene(50, 40)
+        scene.add((0, 0, 49, 0))
+        scene.framebuffer[0, 40] = 0.5
+        scene.repaint((0, 0, 10, 5))
+        self.assertEqual(scene.framebuffer[0, 5], 1)
+        self.assertEqual(scene.framebuffer[0, 40], 0.5)
+
+    def test_remove_last_matches_full_redraw(self):
+        rng = np.random.default_rng(4)
+        scene = LineScene(120, 80)
+        algorithms = ["bresenham", "dda", "wu", "wu_aa", "bresenham_runs"]
+        for i in range(40):
+            segment = tuple(rng.integers(-20, 140, 4).tolist())
+            scene.add(segment, algorithms[i // 8])
+        for _ in range(10):
+            scene.remove_last()
+            np.testing.assert_allclose(scene.framebuffer, self.full_redraw(scene), atol=1e-5)
+        self.assertEqual(len(scene.items), 30)
+
+    def test_repaint_keeps_last_overlapping_line(self):
+        scene = LineScene(30, 10)
+        scene.add((0, 5, 29, 5), "wu")
+        scene.add((0, 5, 29, 5), "bresenham")
+        scene.add((0, 5, 29, 5), "wu")
+        expected = scene.framebuffer.copy()
+        scene.framebuffer.fill(0)
+        scene.repaint((0, 0, 30, 10))
+        np.testing.assert_array_equal(scene.framebuffer, expected)
+
+    def test_add_does_not_touch_other_lines(self):
+        scene = LineScene(50, 40)
+        scene.add((0, 0, 49, 39))
+        scene.framebuffer[0, 0] = 0.5
+        scene.add((0, 39, 49, 0))
+        self.assertEqual(scene.framebuffer[0, 0], 0.5)
+
+    def test_remove_last_on_empty_scene(self):
+        self.assertIsNone(LineScene(10, 10).remove_last())
+
+    def test_clear(self):
+        scene = LineScene(20, 20)
+        scene.add((0, 0, 19, 19))
+        scene.clear()
+        self.assertEqual(scene.items, [])
+        self.assertFalse(scene.framebuffer.any())
+
+
+if __name__ == "__main__":
+    unittest.main()
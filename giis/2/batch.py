@@ -0,0 +1,109 @@
+"""Параллельный вывод больших наборов кривых второго порядка без Tk.
+
+Канва делится на горизонтальные полосы строк, и фигура приписывается
+каждой полосе, которую задевают её строки. Процессы ProcessPoolExecutor
+растеризуют фигуры своей полосы прямо в общий буфер кадра
+multiprocessing.shared_memory и оставляют только пиксели строк этой
+полосы, так что записи процессов не пересекаются, а родителю
+возвращаются одни счётчики.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from conics import classify_conic, ellipse_bounds, conic_pixels
+
+
+def row_span(coefficients, height):
+    """Строки (y0, y1) включительно, которые может задеть фигура: у эллипса — по его границам, у прочих — вся канва."""
+    if classify_conic(*coefficients) == "ellipse":
+        _, ymin, _, ymax = ellipse_bounds(coefficients)
+        return max(ymin, 0), min(ymax, height - 1)
+    return 0, height - 1
+
+
+def split_bands(primitives, height, bands):
+    """Делит строки канвы на bands полос и раскладывает по ним фигуры.
+
+    Возвращает список (y0, y1, фигуры) с полуоткрытыми диапазонами строк
+    [y0, y1), которые покрывают канву без пересечений. Фигура попадает
+    во все полосы, которые пересекает её row_span; незамкнутые кривые —
+    во все полосы.
+    """
+    bounds = np.unique(np.linspace(0, height, max(min(bands, height), 1) + 1).astype(int))
+    groups = [[] for _ in range(len(bounds) - 1)]
+    for coefficients in primitives:
+        y0, y1 = row_span(coefficients, height)
+        first = max(int(np.searchsorted(bounds, y0, side='right')) - 1, 0)
+        last = min(int(np.searchsorted(bounds, y1, side='right')) - 1, len(groups) - 1)
+        for band in range(first, last + 1):
+            groups[band].append(coefficients)
+    return [(int(y0), int(y1), group) for y0, y1, group in zip(bounds[:-1], bounds[1:], groups) if group]
+
+
+def draw_band(framebuffer, y0, y1, primitives):
+    """Рисует фигуры полосы в строки [y0, y1) буфера кадра.
+
+    Пиксели вне полосы отбрасываются: их выводят соседние полосы.
+    Возвращает число пикселей фигур в строках полосы.
+    """
+    height, width = framebuffer.shape
+    count = 0
+    for coefficients in primitives:
+        pixels = conic_pixels(coefficients, width, height)
+        pixels = pixels[(pixels[:, 1] >= y0) & (pixels[:, 1] < y1)]
+        framebuffer[pixels[:, 1], pixels[:, 0]] = 255
+        count += len(pixels)
+    return count
+
+
+def render_band(name, width, height, y0, y1, primitives):
+    """Рабочий процесс: подключается к общему буферу по имени и рисует свою полосу.
+
+    Пул — дочерние процессы, они делят resource_tracker с родителем,
+    поэтому подключение не приводит к удалению сегмента при их выходе.
+    """
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        framebuffer = np.ndarray((height, width), dtype=np.uint8, buffer=memory.buf)
+        result = draw_band(framebuffer, y0, y1, primitives)
+        del framebuffer
+        return result
+    finally:
+        memory.close()
+
+
+def render_batch(primitives, width, height, workers=None, bands_per_worker=1):
+    """Рисует фигуры (кортежи коэффициентов) в буфер кадра uint8 (height, width).
+
+    workers=1 рисует в текущем процессе. Полос в bands_per_worker раз
+    больше, чем процессов: лишние полосы выравнивают очередь пула, но
+    каждая фигура растеризуется заново во всех задетых ею полосах.
+    Возвращает (буфер, число пикселей).
+    """
+    workers = workers or os.cpu_count() or 1
+    primitives = [tuple(float(c) for c in coefficients) for coefficients in primitives]
+    if width * height == 0:
+        # Общий сегмент нулевого размера создать нельзя, а рисовать некуда
+        return np.zeros((height, width), dtype=np.uint8), 0
+    memory = shared_memory.SharedMemory(create=True, size=width * height)
+    try:
+        framebuffer = np.ndarray((height, width), dtype=np.uint8, buffer=memory.buf)
+        framebuffer.fill(0)
+        bands = split_bands(primitives, height, workers * bands_per_worker)
+        if workers == 1:
+            results = [draw_band(framebuffer, y0, y1, group) for y0, y1, group in bands]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(render_band, memory.name, width, height, y0, y1, group)
+                           for y0, y1, group in bands]
+                results = [future.result() for future in futures]
+        count = sum(results)
+        result = framebuffer.copy()
+        del framebuffer
+        return result, count
+    finally:
+        memory.close()
+        memory.unlink()
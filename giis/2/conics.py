@@ -0,0 +1,786 @@
+"""Алгоритмы построения линий второго порядка без Tk.
+
+Каждая функция выводит пиксели через plot(x, y), поэтому один и тот же
+алгоритм рисует и на канву редактора, и в буфер пикселей. Функции *_pixels
+возвращают все пиксели фигуры одним массивом (N, 2) для пакетного вывода.
+
+Любая из фигур — частный случай общей кривой A x^2 + B xy + C y^2 + Dx +
+Ey + F = 0: conic_pixels строит её по шести коэффициентам, а *_conic
+задают коэффициенты окружности, эллипса, гиперболы и параболы (с поворотом).
+"""
+import itertools
+import math
+
+import numpy as np
+
+
+def midpoint_circle(center_x, center_y, radius, plot):
+    """Окружность по алгоритму средней точки."""
+    x = radius
+    y = 0
+    decision_over_2 = 1 - x   # Decision criterion divided by 2 evaluated at x=r, y=0
+
+    while x >= y:
+        plot(x + center_x, y + center_y)
+        plot(y + center_x, x + center_y)
+        plot(-x + center_x, y + center_y)
+        plot(-y + center_x, x + center_y)
+        plot(-x + center_x, -y + center_y)
+        plot(-y + center_x, -x + center_y)
+        plot(x + center_x, -y + center_y)
+        plot(y + center_x, -x + center_y)
+        y += 1
+        if decision_over_2 <= 0:
+            decision_over_2 += 2 * y + 1   # Change in decision criterion for y -> y+1
+        else:
+            x -= 1
+            decision_over_2 += 2 * (y - x) + 1   # Change for y -> y+1, x -> x-1
+
+
+def isqrt(values):
+    """Целый квадратный корень (пол) массива неотрицательных int64."""
+    roots = np.floor(np.sqrt(values.astype(np.float64))).astype(np.int64)
+    # float64 ошибается не больше чем на единицу — исправляем в обе стороны
+    roots -= roots * roots > values
+    roots += (roots + 1) * (roots + 1) <= values
+    return roots
+
+
+def circle_octant(radius):
+    """Октант окружности средней точки (x >= y >= 0) как массивы xs, ys.
+
+    Для каждого y алгоритм средней точки выбирает x, ближайший к
+    sqrt(r^2 - y^2) по средней точке: x^2 - x < r^2 - y^2 <= x^2 + x,
+    то есть x = (1 + isqrt(4 (r^2 - y^2) + 1)) // 2. Цикл заменяется
+    одним вычислением по всем y.
+    """
+    if radius == 0:
+        return np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64)
+    ys = np.arange(int(radius / math.sqrt(2)) + 2, dtype=np.int64)
+    xs = (1 + isqrt(4 * (radius * radius - ys * ys) + 1)) // 2
+    inside = xs >= ys
+    return xs[inside], ys[inside]
+
+
+def mirror_quadrant(xs, ys, center_x, center_y, values=None):
+    """Отражает четверть (x, y >= 0) в четыре, не повторяя пиксели на осях.
+
+    Если переданы значения пикселей четверти (например, покрытие),
+    возвращает и их, размноженные в том же порядке.
+    """
+    nx = xs != 0
+    ny = ys != 0
+    nxy = nx & ny
+    # Столбцы собираются целиком и склеиваются один раз: запись в срез pixels[:, 0] заметно медленнее
+    pixels = np.column_stack((np.concatenate((xs, -xs[nx], xs[ny], -xs[nxy])) + center_x,
+                              np.concatenate((ys, ys[nx], -ys[ny], -ys[nxy])) + center_y))
+    if values is None:
+        return pixels
+    return pixels, np.concatenate((values, values[nx], values[ny], values[nxy]))
+
+
+def circle_pixels(center_x, center_y, radius):
+    """Пиксели окружности средней точки одним массивом (N, 2) без повторов.
+
+    Октант отражается в остальные семь перестановкой и сменой знаков;
+    пиксели на диагонали (x == y) и на осях (x == 0, y == 0) берутся
+    по одному разу.
+    """
+    xs, ys = circle_octant(radius)
+    # Четверть окружности: октант и его отражение относительно диагонали
+    off_diagonal = xs != ys
+    qx = np.concatenate((xs, ys[off_diagonal]))
+    qy = np.concatenate((ys, xs[off_diagonal]))
+    return mirror_quadrant(qx, qy, center_x, center_y)
+
+
+def midpoint_ellipse(center_x, center_y, rx, ry, plot):
+    """Эллипс по алгоритму средней точки (две области)."""
+    x = 0
+    y = ry
+
+    rx2 = rx * rx
+    ry2 = ry * ry
+    dx = 2 * ry2 * x
+    dy = 2 * rx2 * y
+    err = ry2 - rx2 * ry + rx2 / 4
+
+    while dx < dy:
+        plot(center_x + x, center_y + y)
+        plot(center_x - x, center_y + y)
+        plot(center_x + x, center_y - y)
+        plot(center_x - x, center_y - y)
+
+        if err < 0:
+            x += 1
+            dx = dx + 2 * ry2
+            err = err + dx + ry2
+        else:
+            x += 1
+            y -= 1
+            dx = dx + 2 * ry2
+            dy = dy - 2 * rx2
+            err = err + dx - dy + ry2
+
+    err = (x + 0.5) ** 2 * ry2 + (y - 1) ** 2 * rx2 - rx2 * ry2
+    while y >= 0:
+        plot(center_x + x, center_y + y)
+        plot(center_x - x, center_y + y)
+        plot(center_x + x, center_y - y)
+        plot(center_x - x, center_y - y)
+
+        if err > 0:
+            y -= 1
+            dy = dy - 2 * rx2
+            err = err - dy + rx2
+        else:
+            x += 1
+            y -= 1
+            dx = dx + 2 * ry2
+            dy = dy - 2 * rx2
+            err = err + dx - dy + rx2
+
+
+def ellipse_quadrant(rx, ry):
+    """Четверть эллипса средней точки (x, y >= 0) в целых числах: массивы xs, ys.
+
+    Решающие переменные midpoint_ellipse умножены на 4, поэтому
+    rx^2 / 4 и (x + 0.5)^2 становятся целыми. Целые Python не
+    переполняются, и точность не теряется при любых радиусах.
+    """
+    rx2 = rx * rx
+    ry2 = ry * ry
+    x = 0
+    y = ry
+    dx = 0
+    dy = 2 * rx2 * y
+    err = 4 * ry2 - 4 * rx2 * ry + rx2
+    xs = []
+    ys = []
+
+    # Область 1: наклон меньше 1, шаг по x
+    while dx < dy:
+        xs.append(x)
+        ys.append(y)
+        x += 1
+        dx += 2 * ry2
+        if err < 0:
+            err += 4 * (dx + ry2)
+        else:
+            y -= 1
+            dy -= 2 * rx2
+            err += 4 * (dx - dy + ry2)
+
+    # Область 2: шаг по y; 4 * (x + 0.5)^2 = (2x + 1)^2
+    err = ry2 * (2 * x + 1) ** 2 + 4 * rx2 * (y - 1) ** 2 - 4 * rx2 * ry2
+    while y >= 0:
+        xs.append(x)
+        ys.append(y)
+        y -= 1
+        dy -= 2 * rx2
+        if err > 0:
+            err += 4 * (rx2 - dy)
+        else:
+            x += 1
+            dx += 2 * ry2
+            err += 4 * (dx - dy + rx2)
+    return np.array(xs, dtype=np.int64), np.array(ys, dtype=np.int64)
+
+
+def ellipse_pixels(center_x, center_y, rx, ry):
+    """Пиксели эллипса средней точки одним массивом (N, 2) без повторов."""
+    xs, ys = ellipse_quadrant(rx, ry)
+    return mirror_quadrant(xs, ys, center_x, center_y)
+
+
+def degenerate_ellipse_pixels(center_x, center_y, rx, ry, angle=0.0):
+    """Эллипс с нулевой полуосью: точка или отрезок ellipse_pixels, повёрнутый на angle.
+
+    Такой эллипс нельзя задать коэффициентами: кривая второго порядка
+    u^2 = 0 — вся прямая, а не отрезок. Возвращает None, если обе полуоси
+    ненулевые.
+    """
+    if rx and ry:
+        return None
+    pixels = ellipse_pixels(center_x, center_y, rx, ry)
+    if not angle or len(pixels) == 1:
+        return pixels
+    # Концы отрезка поворачиваются вокруг центра, и отрезок строится заново без разрывов
+    c = math.cos(angle)
+    s = math.sin(angle)
+    half = ry if rx == 0 else rx
+    u, v = (0, half) if rx == 0 else (half, 0)
+    dx, dy = c * u - s * v, s * u + c * v
+    steps = max(math.ceil(2 * abs(dx)), math.ceil(2 * abs(dy)), 1)
+    t = np.linspace(-1, 1, steps + 1)
+    xs = np.rint(center_x + t * dx).astype(np.int64)
+    ys = np.rint(center_y + t * dy).astype(np.int64)
+    return np.unique(np.column_stack((xs, ys)), axis=0)
+
+
+def wu_pairs(minor):
+    """Пары пикселей Ву для точных координат minor вдоль ведущей оси 0, 1, 2, ...
+
+    Как в wu_pixels giis/1: точка делится между пикселями floor(minor) и
+    floor(minor) + 1 с покрытием 1 - frac и frac. Возвращает массивы
+    ведущей и второй координаты и покрытия длиной 2 * len(minor).
+    """
+    base = np.floor(minor)
+    frac = minor - base
+    major = np.repeat(np.arange(len(minor), dtype=np.int64), 2)
+    minors = np.repeat(base.astype(np.int64), 2)
+    minors[1::2] += 1
+    coverage = np.empty(2 * len(minor), dtype=np.float32)
+    coverage[0::2] = 1 - frac
+    coverage[1::2] = frac
+    return major, minors, coverage
+
+
+def ellipse_coverage(center_x, center_y, rx, ry):
+    """Сглаженный эллипс (Ву): пиксели (N, 2) и покрытие (N,) float32, без повторов.
+
+    Пока наклон меньше 1, шаг идёт по столбцам x и точный y делится между
+    двумя строками; дальше — по строкам y. Повторы возможны только у
+    стыка областей (около 45°) — там берётся наибольшее покрытие — и на
+    осях, которые при отражении четверти не дублируются.
+    """
+    if rx == 0 or ry == 0:
+        pixels = ellipse_pixels(center_x, center_y, rx, ry)
+        return pixels, np.ones(len(pixels), dtype=np.float32)
+    diagonal = math.sqrt(rx * rx + ry * ry)
+    last_column = int(rx * rx / diagonal)
+    last_row = int(ry * ry / diagonal)
+    # Область 1: столбцы x = 0 .. rx^2 / diagonal, область 2: строки y = 0 .. ry^2 / diagonal
+    columns = np.arange(last_column + 1) / rx
+    rows = np.arange(last_row + 1) / ry
+    top_x, top_y, top_coverage = wu_pairs(ry * np.sqrt(np.maximum(1 - columns * columns, 0)))
+    side_y, side_x, side_coverage = wu_pairs(rx * np.sqrt(np.maximum(1 - rows * rows, 0)))
+
+    xs = np.concatenate((top_x, side_x))
+    ys = np.concatenate((top_y, side_y))
+    coverage = np.concatenate((top_coverage, side_coverage))
+    # Области пересекаются только в углу у стыка: повторы сводятся по коду пикселя x * stride + y
+    corner = np.concatenate((top_y <= last_row + 1, side_x <= last_column + 1))
+    stride = ry + 2
+    codes, inverse = np.unique(xs[corner] * stride + ys[corner], return_inverse=True)
+    merged = np.zeros(len(codes), dtype=np.float32)
+    np.maximum.at(merged, inverse, coverage[corner])
+    rest = ~corner & (coverage > 0)
+    visible = merged > 0
+    xs = np.concatenate((xs[rest], codes[visible] // stride))
+    ys = np.concatenate((ys[rest], codes[visible] % stride))
+    coverage = np.concatenate((coverage[rest], merged[visible]))
+    return mirror_quadrant(xs, ys, center_x, center_y, coverage)
+
+
+def circle_coverage(center_x, center_y, radius):
+    """Сглаженная окружность (Ву): пиксели (N, 2) и покрытие (N,) float32."""
+    return ellipse_coverage(center_x, center_y, radius, radius)
+
+
+def clip_pixels(pixels, width, height):
+    """Оставляет пиксели, попадающие на канву width x height."""
+    xs = pixels[:, 0]
+    ys = pixels[:, 1]
+    return pixels[(xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)]
+
+
+def hyperbola_quadrant(a, b, x_limit, y_limit):
+    """Ветвь x^2/a^2 - y^2/b^2 = 1 при x, y >= 0 по средней точке: массивы xs, ys.
+
+    F(x, y) = b^2 x^2 - a^2 y^2 - a^2 b^2. У вершины кривая крутая, и
+    ведущей осью служит y; когда наклон b^2 x / (a^2 y) падает ниже 1,
+    ведущей становится x. Решающая переменная — F в средней точке,
+    она обновляется приращениями. Шаги идут, пока x <= x_limit и y <= y_limit.
+    """
+    if a <= 0 or b <= 0:
+        raise ValueError("Полуоси гиперболы должны быть положительными")
+    a2 = a * a
+    b2 = b * b
+    x = round(a)
+    y = 0
+    xs = []
+    ys = []
+
+    # Область 1: шаг по y, средняя точка (x + 1/2, y + 1)
+    err = b2 * (x + 0.5) ** 2 - a2 * (y + 1) ** 2 - a2 * b2
+    while b2 * x >= a2 * y and x <= x_limit and y <= y_limit:
+        xs.append(x)
+        ys.append(y)
+        if err < 0:
+            err += b2 * (2 * x + 2)
+            x += 1
+        err -= a2 * (2 * y + 3)
+        y += 1
+
+    # Область 2: шаг по x, средняя точка (x + 1, y + 1/2)
+    err = b2 * (x + 1) ** 2 - a2 * (y + 0.5) ** 2 - a2 * b2
+    while x <= x_limit and y <= y_limit:
+        xs.append(x)
+        ys.append(y)
+        if err > 0:
+            err -= a2 * (2 * y + 2)
+            y += 1
+        err += b2 * (2 * x + 3)
+        x += 1
+    return np.array(xs, dtype=np.int64), np.array(ys, dtype=np.int64)
+
+
+def hyperbola_pixels(center_x, center_y, a, b, width, height):
+    """Пиксели гиперболы в пределах канвы width x height, каждый по одному разу."""
+    return conic_pixels(hyperbola_conic(center_x, center_y, a, b), width, height)
+
+
+def hyperbola(center_x, center_y, a, b, width, height, plot):
+    """Гипербола x^2/a^2 - y^2/b^2 = 1 в пределах канвы; возвращает число пикселей."""
+    pixels = hyperbola_pixels(center_x, center_y, a, b, width, height)
+    for x, y in pixels.tolist():
+        plot(x, y)
+    return len(pixels)
+
+
+def parabola_half(p, x_limit, y_limit):
+    """Правая половина параболы y = x^2 / 2p при p > 0 по средней точке: массивы xs, ys.
+
+    F(x, y) = x^2 - 2p y. Пока наклон x / p меньше 1, ведущая ось — x,
+    дальше — y. Шаги идут, пока x <= x_limit и y <= y_limit.
+    """
+    x = 0
+    y = 0
+    xs = []
+    ys = []
+
+    # Область 1: шаг по x, средняя точка (x + 1, y + 1/2)
+    err = 1 - p
+    while x < p and x <= x_limit and y <= y_limit:
+        xs.append(x)
+        ys.append(y)
+        if err > 0:
+            err -= 2 * p
+            y += 1
+        err += 2 * x + 3
+        x += 1
+
+    # Область 2: шаг по y, средняя точка (x + 1/2, y + 1)
+    err = (x + 0.5) ** 2 - 2 * p * (y + 1)
+    while x <= x_limit and y <= y_limit:
+        xs.append(x)
+        ys.append(y)
+        if err < 0:
+            err += 2 * x + 2
+            x += 1
+        err -= 2 * p
+        y += 1
+    return np.array(xs, dtype=np.int64), np.array(ys, dtype=np.int64)
+
+
+def parabola_pixels(center_x, center_y, p, width, height):
+    """Пиксели параболы y = x^2 / 2p (ветви вверх при p > 0) в пределах канвы."""
+    return conic_pixels(parabola_conic(center_x, center_y, p), width, height)
+
+
+def parabola(center_x, center_y, p, width, height, plot):
+    """Парабола y = x^2 / 2p в пределах канвы; возвращает число пикселей."""
+    pixels = parabola_pixels(center_x, center_y, p, width, height)
+    for x, y in pixels.tolist():
+        plot(x, y)
+    return len(pixels)
+
+
+# Общая кривая второго порядка A x^2 + B xy + C y^2 + D x + E y + F = 0
+# задаётся кортежем коэффициентов (A, B, C, D, E, F) в координатах канвы.
+
+def placed_conic(a_uu, a_vv, a_u, a_v, a_0, center_x, center_y, angle=0.0):
+    """Коэффициенты кривой a_uu u^2 + a_vv v^2 + a_u u + a_v v + a_0 = 0,
+    заданной в осях (u, v), повёрнутых на angle (радианы) вокруг центра."""
+    c = math.cos(angle)
+    s = math.sin(angle)
+    # u = c x' + s y', v = -s x' + c y', где x' = x - center_x, y' = y - center_y
+    A = a_uu * c * c + a_vv * s * s
+    B = 2 * c * s * (a_uu - a_vv)
+    C = a_uu * s * s + a_vv * c * c
+    D0 = a_u * c - a_v * s
+    E0 = a_u * s + a_v * c
+    D = D0 - 2 * A * center_x - B * center_y
+    E = E0 - B * center_x - 2 * C * center_y
+    F = (a_0 + A * center_x * center_x + B * center_x * center_y + C * center_y * center_y
+         - D0 * center_x - E0 * center_y)
+    return A, B, C, D, E, F
+
+
+def circle_conic(center_x, center_y, radius):
+    return placed_conic(1, 1, 0, 0, -radius * radius, center_x, center_y)
+
+
+def ellipse_conic(center_x, center_y, rx, ry, angle=0.0):
+    return placed_conic(ry * ry, rx * rx, 0, 0, -rx * rx * ry * ry, center_x, center_y, angle)
+
+
+def hyperbola_conic(center_x, center_y, a, b, angle=0.0):
+    if a <= 0 or b <= 0:
+        raise ValueError("Полуоси гиперболы должны быть положительными")
+    return placed_conic(b * b, -a * a, 0, 0, -a * a * b * b, center_x, center_y, angle)
+
+
+def parabola_conic(center_x, center_y, p, angle=0.0):
+    if p == 0:
+        raise ValueError("Параметр параболы не может быть нулевым")
+    # Ось y канвы направлена вниз: ветви вверх при p > 0 — это v = -u^2 / 2p
+    return placed_conic(1, 0, 0, 2 * p, 0, center_x, center_y, angle)
+
+
+def conic_center(A, B, C, D, E, F):
+    """Центр центральной кривой (эллипс, гипербола) и значение K в форме
+    A u^2 + B uv + C v^2 = K относительно него."""
+    det = 4 * A * C - B * B
+    x0 = (B * E - 2 * C * D) / det
+    y0 = (B * D - 2 * A * E) / det
+    return x0, y0, -(F + (D * x0 + E * y0) / 2)
+
+
+def classify_conic(A, B, C, D, E, F):
+    """Тип кривой: "ellipse", "hyperbola", "parabola", "degenerate" или "empty" (мнимый эллипс)."""
+    scale = max(abs(A), abs(B), abs(C))
+    if scale == 0:
+        return "degenerate"
+    discriminant = B * B - 4 * A * C
+    if abs(discriminant) <= 1e-9 * scale * scale:
+        # Квадратичная часть — квадрат линейной формы с нормалью (alpha, beta);
+        # кривая вырождена, если линейные члены ей параллельны
+        alpha, beta = (A, B / 2) if abs(A) >= abs(C) else (B / 2, C)
+        if abs(E * alpha - D * beta) <= 1e-9 * math.hypot(alpha, beta) * math.hypot(D, E):
+            return "degenerate"
+        return "parabola"
+    x0, y0, K = conic_center(A, B, C, D, E, F)
+    if abs(K) <= 1e-12 * (abs(F) + abs(D * x0) / 2 + abs(E * y0) / 2):
+        return "degenerate"
+    if discriminant > 0:
+        return "hyperbola"
+    return "ellipse" if K * A > 0 else "empty"
+
+
+def quadratic_roots(a, b, c):
+    """Вещественные корни a t^2 + b t + c = 0 (устойчивая формула)."""
+    if a == 0:
+        return [-c / b] if b else []
+    discriminant = b * b - 4 * a * c
+    if discriminant < 0:
+        return []
+    q = -0.5 * (b + math.copysign(math.sqrt(discriminant), b))
+    if q == 0:
+        return [0.0]
+    return [q / a, c / q]
+
+
+def conic_seeds(coefficients, bounds):
+    """Точки кривой на линиях сетки, с которых начинается слежение в пределах bounds.
+
+    Каждая видимая дуга незамкнутой кривой пересекает край области,
+    поэтому затравки — пересечения с краями; замкнутый эллипс, целиком
+    лежащий внутри, дополнительно ищется на горизонтали через центр.
+    Затравка — (x, y, на_столбце): на_столбце=True, если x — целый номер
+    столбца, иначе целый номер строки y.
+    """
+    A, B, C, D, E, F = coefficients
+    xmin, ymin, xmax, ymax = bounds
+    rows = [ymin, ymax]
+    if classify_conic(*coefficients) == "ellipse":
+        rows.append(round(conic_center(*coefficients)[1]))
+    seeds = []
+    for y in rows:
+        for x in quadratic_roots(A, B * y + D, C * y * y + E * y + F):
+            if xmin <= round(x) <= xmax and ymin <= y <= ymax:
+                seeds.append((x, y, False))
+    for x in (xmin, xmax):
+        for y in quadratic_roots(C, B * x + E, A * x * x + D * x + F):
+            if ymin <= round(y) <= ymax:
+                seeds.append((x, y, True))
+    return seeds
+
+
+def trace_conic(coefficients, bounds):
+    """Пиксели кривой второго порядка в прямоугольнике bounds (включительно), по одному.
+
+    Слежение в духе Питтевея: касательная (-Fy, Fx) в текущей точке
+    кривой задаёт главную ось, шаг идёт к пересечению кривой со
+    следующим столбцом (строкой), и выводится ближайший к нему пиксель —
+    то же решение, что знак F в средней точке. Текущая точка лежит на
+    самой кривой, а не в центре пикселя, поэтому у тонких фигур, где
+    центр пикселя ближе к противоположной стороне, слежение не
+    перескакивает на неё. Если кривая разворачивается, не дойдя до
+    следующей линии сетки (вершина), выводится пиксель вершины, и путь
+    продолжается по второму пересечению той же линии. Дуга проходится
+    от затравки в обе стороны до края области или до уже пройденного
+    пересечения, после которого путь повторился бы.
+    """
+    A, B, C, D, E, F = (float(c) for c in coefficients)
+    xmin, ymin, xmax, ymax = bounds
+    limit = 4 * (xmax - xmin + ymax - ymin + 2) * (ymax - ymin + 1)
+    visited = set()
+    # Пересечение (на_столбце, линия, знак производной, направление) -> номер обхода
+    states = {}
+    closed = []
+    covered = set()
+
+    def crossing(on_column, line, side):
+        """Пересечение столбца x = line (строки y = line) с той частью кривой,
+        где производная F вдоль линии имеет знак side; (x, y) или None."""
+        if on_column:
+            a, b, c = C, B * line + E, (A * line + D) * line + F
+        else:
+            a, b, c = A, B * line + D, (C * line + E) * line + F
+        discriminant = b * b - 4 * a * c
+        if discriminant < 0 or side == 0:
+            return None
+        # Производная в корне равна 2 a v + b = side * sqrt(D); без вычитания близких чисел
+        root = side * math.sqrt(discriminant)
+        if b * root > 0:
+            v = 2 * c / (-b - root)
+        elif a != 0:
+            v = (root - b) / (2 * a)
+        else:
+            return None
+        return (line, v) if on_column else (v, line)
+
+    def extremum(on_column, point):
+        """Ближайшая к point вершина, где касательная параллельна линиям on_column, или None."""
+        # На вершине по x обнуляется Fy: y = p x + r, и наоборот
+        a, b, c, d, e = (A, B, C, D, E) if on_column else (C, B, A, E, D)
+        if c == 0:
+            return None
+        p, r = -b / (2 * c), -e / (2 * c)
+        u = point[not on_column]
+        found = quadratic_roots(a + b * p + c * p * p, b * r + 2 * c * p * r + d + e * p, c * r * r + e * r + F)
+        if not found:
+            return None
+        u = min(found, key=lambda root: abs(root - u))
+        return (u, p * u + r) if on_column else (p * u + r, u)
+
+    def turn(x, y, sides, current):
+        """Разворот: второе пересечение кривой со столбцом или строкой пикселя current."""
+        returns = []
+        for axis in (True, False):
+            point = crossing(axis, current[not axis], -sides[axis])
+            if point is None:
+                continue
+            nearest = (current[0], round(point[1])) if axis else (round(point[0]), current[1])
+            if abs(nearest[0] - current[0]) <= 1 and abs(nearest[1] - current[1]) <= 1:
+                returns.append((math.dist(point, (x, y)), point, axis, nearest))
+        return min(returns)[1:] if returns else None
+
+    for seed in conic_seeds((A, B, C, D, E, F), bounds):
+        start, start_column = seed[:2], seed[2]
+        current = (start[0], round(start[1])) if start_column else (round(start[0]), start[1])
+        cx, cy = current
+        # Дуга уже пройдена, если затравка выведена или примыкает к пройденной части
+        if current in visited or any((cx + i, cy + j) in covered for i in (-1, 0, 1) for j in (-1, 0, 1)):
+            continue
+        visited.add(current)
+        yield current
+        seed_pixel = current
+        for direction in (1, -1):
+            walk = len(closed)
+            closed.append(False)
+            (x, y), on_column, current = start, start_column, seed_pixel
+            for _ in range(limit):
+                gx = 2 * A * x + B * y + D
+                gy = B * x + 2 * C * y + E
+                sides = (gx > 0) - (gx < 0), (gy > 0) - (gy < 0)
+                state = (on_column, x if on_column else y, sides[on_column], direction)
+                if state in states:
+                    closed[walk] = closed[states[state]] or states[state] == walk
+                    break
+                states[state] = walk
+                # Касательная (direction * gy, -direction * gx): сначала главная ось, затем вторая
+                forwards = direction * sides[1], -direction * sides[0]
+                axes = (True, False) if abs(gy) >= abs(gx) else (False, True)
+                step = None
+                for axis in axes:
+                    forward = forwards[not axis]
+                    if forward == 0:
+                        continue
+                    u = x if axis else y
+                    if axis == on_column:
+                        line = u + forward
+                    else:
+                        line = math.floor(u) + 1 if forward > 0 else math.ceil(u) - 1
+                    point = crossing(axis, line, sides[axis])
+                    if point is not None:
+                        nearest = (line, round(point[1])) if axis else (round(point[0]), line)
+                        if abs(nearest[0] - current[0]) <= 1 and abs(nearest[1] - current[1]) <= 1:
+                            step = point, axis, nearest
+                            break
+                    if axis == axes[0]:
+                        # Кривая развернулась до следующей линии: пиксель вершины, если она ближе к ней
+                        tip = extremum(axis, (x, y))
+                        if tip is not None and abs(tip[not axis] - line) <= 0.5 and (tip[not axis] - u) * forward > 0:
+                            tip = (round(tip[0]), round(tip[1]))
+                            if (abs(tip[0] - current[0]) <= 1 and abs(tip[1] - current[1]) <= 1 and
+                                    tip not in visited and xmin <= tip[0] <= xmax and ymin <= tip[1] <= ymax):
+                                visited.add(tip)
+                                yield tip
+                if step is None:
+                    step = turn(x, y, sides, current)
+                    if step is None:
+                        break
+                (x, y), on_column, nearest = step
+                if not (xmin <= nearest[0] <= xmax and ymin <= nearest[1] <= ymax):
+                    # Конец незамкнутой дуги: затравка рядом с ним — та же дуга
+                    covered.add(current)
+                    break
+                current = nearest
+                if current not in visited:
+                    visited.add(current)
+                    yield current
+            if closed[walk]:
+                covered.update(visited)
+                break
+
+
+def ellipse_bounds(coefficients):
+    """Прямоугольник (xmin, ymin, xmax, ymax), содержащий эллипс, с запасом в пиксель."""
+    A, B, C, D, E, F = coefficients
+    x0, y0, K = conic_center(*coefficients)
+    det = 4 * A * C - B * B
+    half_x = math.sqrt(4 * C * K / det)
+    half_y = math.sqrt(4 * A * K / det)
+    return (math.floor(x0 - half_x) - 1, math.floor(y0 - half_y) - 1,
+            math.ceil(x0 + half_x) + 1, math.ceil(y0 + half_y) + 1)
+
+
+def exact_root(value):
+    """Целый квадратный корень value, если value — точный квадрат, иначе None."""
+    root = round(math.sqrt(value))
+    return root if root * root == value else None
+
+
+def axis_aligned_pixels(kind, coefficients, width, height):
+    """Быстрый путь для кривых без поворота (B = 0) с целым центром или вершиной.
+
+    Окружность, эллипс с целыми полуосями, гипербола и парабола
+    строятся специализированными алгоритмами средней точки выше.
+    Возвращает None, если кривая под быстрый путь не подходит.
+    """
+    A, B, C, D, E, F = coefficients
+    if B != 0:
+        return None
+    if kind == "parabola":
+        # Ось параболы вертикальна (C = 0) или горизонтальна (A = 0)
+        swap = C != 0
+        if swap:
+            A, C, D, E = C, A, E, D
+            width, height = height, width
+        if E == 0:
+            return None
+        x0 = -D / (2 * A)
+        y0 = -(A * x0 * x0 + D * x0 + F) / E
+        if not (x0.is_integer() and y0.is_integer()):
+            return None
+        x0, y0 = int(x0), int(y0)
+        # |y - y0| = (x - x0)^2 / 2q, ветви уходят в сторону opening
+        q = abs(E / (2 * A))
+        opening = -1 if A / E > 0 else 1
+        x_limit = max(x0, width - x0)
+        y_limit = y0 if opening < 0 else height - y0
+        xs, ys = parabola_half(q, x_limit, y_limit)
+        mirrored = xs != 0
+        pixels = np.empty((len(xs) + mirrored.sum(), 2), dtype=np.int64)
+        pixels[:, 0] = np.concatenate((xs, -xs[mirrored])) + x0
+        pixels[:, 1] = y0 + opening * np.concatenate((ys, ys[mirrored]))
+        if swap:
+            pixels = pixels[:, ::-1].copy()
+            width, height = height, width
+    else:
+        x0, y0, K = conic_center(*coefficients)
+        if not (x0.is_integer() and y0.is_integer()):
+            return None
+        x0, y0 = int(x0), int(y0)
+        if kind == "ellipse":
+            rx = exact_root(K / A)
+            ry = exact_root(K / C)
+            if rx is None or ry is None:
+                return None
+            if rx == ry:
+                pixels = circle_pixels(x0, y0, rx)
+            else:
+                pixels = ellipse_pixels(x0, y0, rx, ry)
+        else:
+            x_limit = max(x0, width - x0)
+            y_limit = max(y0, height - y0)
+            if K / A > 0:
+                xs, ys = hyperbola_quadrant(math.sqrt(K / A), math.sqrt(-K / C), x_limit, y_limit)
+            else:
+                ys, xs = hyperbola_quadrant(math.sqrt(K / C), math.sqrt(-K / A), y_limit, x_limit)
+            pixels = mirror_quadrant(xs, ys, x0, y0)
+    if width is not None:
+        pixels = clip_pixels(pixels, width, height)
+    return pixels
+
+
+def conic_source(coefficients, width=None, height=None):
+    """Готовый массив пикселей (быстрый путь) или генератор trace_conic.
+
+    Вырожденный эллипс-точка даёт один пиксель. Ошибки (прочие вырожденные
+    кривые, незамкнутая кривая без канвы) возникают сразу, а не при первом
+    next() у генератора.
+    """
+    coefficients = tuple(float(c) for c in coefficients)
+    kind = classify_conic(*coefficients)
+    A, B, C = coefficients[:3]
+    if kind == "degenerate" and 4 * A * C - B * B > 0:
+        # Эллипс нулевого размера (окружность радиуса 0) — одна точка в центре
+        x0, y0, _ = conic_center(*coefficients)
+        pixels = np.array([[round(x0), round(y0)]], dtype=np.int64)
+        return clip_pixels(pixels, width, height) if width is not None else pixels
+    if kind == "degenerate":
+        raise ValueError("Вырожденная кривая второго порядка")
+    if kind == "empty":
+        return np.empty((0, 2), dtype=np.int64)
+    if width is None and kind != "ellipse":
+        raise ValueError("Незамкнутую кривую нужно ограничить размерами канвы")
+    pixels = axis_aligned_pixels(kind, coefficients, width, height)
+    if pixels is None:
+        bounds = (0, 0, width - 1, height - 1) if width is not None else ellipse_bounds(coefficients)
+        return trace_conic(coefficients, bounds)
+    return pixels
+
+
+def conic_pixels(coefficients, width=None, height=None):
+    """Пиксели кривой A x^2 + B xy + C y^2 + D x + E y + F = 0 одним массивом (N, 2).
+
+    Кривая классифицируется; фигуры без поворота идут быстрым путём,
+    остальные прослеживаются trace_conic в пределах канвы width x height.
+    Без канвы можно строить только эллипс.
+    """
+    source = conic_source(coefficients, width, height)
+    if isinstance(source, np.ndarray):
+        return source
+    return np.array(list(source), dtype=np.int64).reshape(-1, 2)
+
+
+CHUNK_SIZE = 4096
+
+
+def chunked(source, chunk_size=CHUNK_SIZE):
+    """Порции пикселей (до chunk_size штук, массивы (M, 2)) из массива или итератора точек."""
+    if isinstance(source, np.ndarray):
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start + chunk_size]
+        return
+    while True:
+        chunk = list(itertools.islice(source, chunk_size))
+        if not chunk:
+            return
+        yield np.array(chunk, dtype=np.int64)
+
+
+def conic_chunks(coefficients, width=None, height=None, chunk_size=CHUNK_SIZE):
+    """Потоковый вариант conic_pixels: генератор порций пикселей.
+
+    Прослеживаемые кривые считаются по мере чтения, поэтому потребитель
+    (цикл after() редактора, запись в файл или буфер) может остановиться
+    в любой момент, не досчитывая фигуру.
+    """
+    if chunk_size < 1:
+        raise ValueError("Размер порции должен быть положительным")
+    return chunked(conic_source(coefficients, width, height), chunk_size)
@@ -1,6 +1,92 @@
 import tkinter as tk
 from tkinter import ttk, colorchooser, messagebox, simpledialog
 import math
+import os
+import sys
+
+COMMON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "common")
+if COMMON_DIR not in sys.path:
+    sys.path.append(COMMON_DIR)
+
+from clipping import rect_intersects
+from surface import PixelSurface
+from conics import (circle_conic, ellipse_conic, hyperbola_conic, parabola_conic, conic_pixels, conic_chunks,
+                    chunked, clip_pixels, degenerate_ellipse_pixels, circle_coverage, ellipse_coverage)
+
+# Каждая фигура редактора — обёртка над общей кривой второго порядка
+SHAPE_CONICS = {
+    "окружность": circle_conic,
+    "эллипс": ellipse_conic,
+    "гипербола": hyperbola_conic,
+    "парабола": parabola_conic,
+}
+
+# Эллипс с нулевой полуосью не задаётся коэффициентами и строится отдельно
+SHAPE_DEGENERATE = {
+    "эллипс": degenerate_ellipse_pixels,
+}
+
+# Сглаженные варианты есть у окружности и неповёрнутого эллипса
+SHAPE_COVERAGE = {
+    "окружность": circle_coverage,
+    "эллипс": lambda cx, cy, rx, ry, angle=0.0: None if angle else ellipse_coverage(cx, cy, rx, ry),
+}
+
+def expand_rect(rect, margin):
+    return rect[0] - margin, rect[1] - margin, rect[2] + margin, rect[3] + margin
+
+def inside_rect(pixels, rect):
+    """Маска пикселей (N, 2), лежащих в rect = (xmin, ymin, xmax, ymax) включительно."""
+    xs = pixels[:, 0]
+    ys = pixels[:, 1]
+    return (xs >= rect[0]) & (xs <= rect[2]) & (ys >= rect[1]) & (ys <= rect[3])
+
+class ChunkedRender:
+    """Потоковый вывод фигуры порциями по таймеру after().
+
+    Генератор порций читается по одной порции за кадр, поэтому цикл Tk
+    не замирает на больших фигурах, а вывод можно прервать через stop().
+    """
+
+    def __init__(self, canvas, draw_pixels, frame_ms=1):
+        self.canvas = canvas
+        self.draw_pixels = draw_pixels
+        self.frame_ms = frame_ms
+        self.chunks = None
+        self.on_done = None
+        self.count = 0
+        self.job = None
+
+    @property
+    def active(self):
+        return self.job is not None
+
+    def start(self, chunks, on_done):
+        """Начинает вывод; по окончании вызывает on_done(число пикселей)."""
+        self.stop()
+        self.chunks = chunks
+        self.on_done = on_done
+        self.count = 0
+        self.job = self.canvas.after_idle(self.step)
+
+    def stop(self):
+        """Прерывает вывод, если он идёт."""
+        if self.job is not None:
+            self.canvas.after_cancel(self.job)
+            self.job = None
+            self.chunks = None
+
+    def step(self):
+        """Выводит очередную порцию и планирует следующую."""
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.job = None
+            self.chunks = None
+            self.on_done(self.count)
+            return
+        self.draw_pixels(chunk)
+        self.count += len(chunk)
+        self.job = self.canvas.after(self.frame_ms, self.step)
 
 class GraphicsEditor:
     def __init__(self, master):
@@ -11,6 +97,7 @@ class GraphicsEditor:
         self.canvas_height = 600
         self.canvas = tk.Canvas(master, width=self.canvas_width, height=self.canvas_height, bg="white")
         self.canvas.pack(pady=10)
+        self.surface = PixelSurface(self.canvas, self.canvas_width, self.canvas_height)
 
         self.current_shape = "окружность"  # По умолчанию
         self.start_x = None
@@ -18,12 +105,23 @@ class GraphicsEditor:
 
         self.debug_mode = False  # Режим отладки
         self.grid_size = 20  # Размер ячейки сетки
+        self.legacy_pixels = tk.BooleanVar(value=False)  # Пиксели элементами канвы в режиме отладки
+        self.antialias = tk.BooleanVar(value=False)  # Сглаживание окружностей и эллипсов (Ву)
+        self.grid_item = None  # Сетка строится один раз одним изображением и только скрывается
+        self.grid_image = None
+        # Сохранённая сцена: (фигура, параметры, ограничивающий прямоугольник, сглаживание)
+        self.scene = []
+        # Фигуры выводятся порциями; нажатие мыши прерывает незаконченный вывод
+        self.chunk_size = 2048
+        self.render = ChunkedRender(self.canvas, self.draw_pixels)
+        self.rendering = None  # Элемент сцены, который сейчас выводится
 
         self.setup_toolbar()
         self.setup_menu()
 
         self.canvas.bind("<Button-1>", self.on_mouse_down)
         self.canvas.bind("<ButtonRelease-1>", self.on_mouse_up)
+        self.master.bind("<Control-z>", lambda event: self.undo_shape())
 
     def setup_toolbar(self):
         self.toolbar = ttk.Frame(self.master)
@@ -39,9 +137,18 @@ class GraphicsEditor:
         self.debug_button = ttk.Button(self.toolbar, text="Режим отладки: Выкл", command=self.toggle_debug_mode)
         self.debug_button.pack(side=tk.LEFT, padx=2, pady=2)
 
+        legacy_check = ttk.Checkbutton(self.toolbar, text="Пиксели элементами канвы (отладка)",
+                                       variable=self.legacy_pixels, command=self.update_pixel_mode)
+        legacy_check.pack(side=tk.LEFT, padx=2, pady=2)
+
+        antialias_check = ttk.Checkbutton(self.toolbar, text="Сглаживание", variable=self.antialias)
+        antialias_check.pack(side=tk.LEFT, padx=2, pady=2)
+
     def setup_menu(self):
         self.menu_bar = tk.Menu(self.master)
         self.file_menu = tk.Menu(self.menu_bar, tearoff=0)
+        self.file_menu.add_command(label="Отменить", command=self.undo_shape, accelerator="Ctrl+Z")
+        self.file_menu.add_command(label="Очистить", command=self.clear_scene)
         self.file_menu.add_command(label="Выход", command=self.master.quit)
         self.menu_bar.add_cascade(label="Файл", menu=self.file_menu)
 
@@ -57,6 +164,10 @@ class GraphicsEditor:
         self.current_shape = shape
         print(f"Выбрана фигура: {shape}")
 
+    def update_pixel_mode(self):
+        self.surface.legacy = self.debug_mode and self.legacy_pixels.get()
+        self.redraw_scene()
+
     def toggle_debug_mode(self):
         self.debug_mode = not self.debug_mode
         if self.debug_mode:
@@ -66,17 +177,137 @@ class GraphicsEditor:
         else:
             self.debug_button.config(text="Режим отладки: Выкл")
             print("Режим отладки выключен")
-            self.canvas.delete("grid")
+            self.canvas.itemconfigure(self.grid_item, state="hidden")
             self.canvas.config(bg="white")
+            self.surface.background = self.surface.color_rgb("white")
+        # Фигуры сцены перерисовываются в новом масштабе пикселей
+        self.update_pixel_mode()
 
     def draw_grid(self):
         self.canvas.config(bg="#f0f0f0")  # Светло-серый фон для сетки
-        for i in range(0, self.canvas_width, self.grid_size):
-            self.canvas.create_line(i, 0, i, self.canvas_height, fill="gray", tags="grid")
-        for j in range(0, self.canvas_height, self.grid_size):
-            self.canvas.create_line(0, j, self.canvas_width, j, fill="gray", tags="grid")
+        self.surface.background = self.surface.color_rgb("#f0f0f0")
+        if self.grid_item is None:
+            # Незаписанные пиксели PhotoImage прозрачны, видны только линии сетки
+            self.grid_image = tk.PhotoImage(width=self.canvas_width, height=self.canvas_height)
+            for i in range(0, self.canvas_width, self.grid_size):
+                self.grid_image.put("gray", to=(i, 0, i + 1, self.canvas_height))
+            for j in range(0, self.canvas_height, self.grid_size):
+                self.grid_image.put("gray", to=(0, j, self.canvas_width, j + 1))
+            self.grid_item = self.canvas.create_image(0, 0, anchor=tk.NW, image=self.grid_image, tags="grid")
+        self.canvas.itemconfigure(self.grid_item, state="normal")
+        self.canvas.tag_raise(self.grid_item)
+
+    def add_shape(self, shape, params, bbox):
+        """Добавляет фигуру в сцену и выводит только её, порциями."""
+        self.cancel_render()
+        antialias = self.antialias.get()
+        if antialias:
+            # Сглаженная фигура выводится сразу: её пиксели — только контур в 2 пикселя шириной
+            count = self.render_coverage(shape, params)
+            if count is not None:
+                self.scene.append((shape, params, bbox, True))
+                print(f"{shape}: {count} пикселей (сглаживание)")
+                return
+        pixels = self.degenerate_pixels(shape, params)
+        try:
+            if pixels is not None:
+                chunks = chunked(pixels, self.chunk_size)
+            else:
+                chunks = conic_chunks(SHAPE_CONICS[shape](*params), self.canvas_width, self.canvas_height,
+                                      self.chunk_size)
+        except ValueError as error:
+            messagebox.showerror("Ошибка", str(error))
+            return
+        entry = (shape, params, bbox, False)
+        self.scene.append(entry)
+        self.rendering = entry
+        self.render.start(chunks, lambda count: self.finish_render(shape, count))
+
+    def finish_render(self, shape, count):
+        self.rendering = None
+        print(f"{shape}: {count} пикселей")
+
+    def cancel_render(self):
+        """Прерывает вывод фигуры; недорисованная фигура убирается из сцены и с канвы."""
+        entry = self.rendering
+        self.rendering = None
+        if self.render.active:
+            self.render.stop()
+            self.scene.remove(entry)
+            print(f"{entry[0]}: вывод прерван")
+            # Уже выведенные порции стираются: прямоугольник фигуры собирается из оставшейся сцены
+            self.redraw_scene(entry[2])
+
+    def render_shape(self, shape, params, antialias=False, clip=None):
+        """Рисует фигуру (только пиксели внутри clip, если он задан) и возвращает число выведенных пикселей."""
+        if antialias:
+            count = self.render_coverage(shape, params, clip)
+            if count is not None:
+                return count
+        pixels = self.degenerate_pixels(shape, params)
+        if pixels is None:
+            pixels = conic_pixels(SHAPE_CONICS[shape](*params), self.canvas_width, self.canvas_height)
+        if clip is not None:
+            pixels = pixels[inside_rect(pixels, clip)]
+        self.draw_pixels(pixels)
+        return len(pixels)
+
+    def degenerate_pixels(self, shape, params):
+        """Пиксели вырожденной фигуры на канве или None, если фигура строится как кривая."""
+        rasterize = SHAPE_DEGENERATE.get(shape)
+        pixels = rasterize(*params) if rasterize else None
+        if pixels is None:
+            return None
+        return clip_pixels(pixels, self.canvas_width, self.canvas_height)
+
+    def render_coverage(self, shape, params, clip=None):
+        """Рисует сглаженную фигуру; None, если у фигуры нет сглаженного варианта."""
+        rasterize = SHAPE_COVERAGE.get(shape)
+        result = rasterize(*params) if rasterize else None
+        if result is None:
+            return None
+        pixels, coverage = result
+        if clip is not None:
+            inside = inside_rect(pixels, clip)
+            pixels, coverage = pixels[inside], coverage[inside]
+        self.draw_coverage(pixels, coverage)
+        return len(pixels)
+
+    def redraw_scene(self, rect=None):
+        """Перерисовывает rect (по умолчанию всю канву) из фигур сцены, которые его задевают.
+
+        Прямоугольник заливается фоном, и фигуры выводят в него только свои
+        пиксели, поэтому сглаженные края вне его не смешиваются повторно.
+        """
+        self.cancel_render()
+        if rect is None or self.debug_mode:
+            # Крупные пиксели отладки выходят за прямоугольник фигуры — перерисовывается вся канва
+            self.canvas.delete("pixel")
+            self.surface.clear()
+            clip = None
+        else:
+            # Сглаженный край выходит за ограничивающий прямоугольник на пиксель
+            clip = expand_rect(rect, 1)
+            if not rect_intersects(clip, self.visible_rect()):
+                return
+            self.surface.clear(clip)
+        for shape, params, bbox, antialias in self.scene:
+            if clip is None or rect_intersects(expand_rect(bbox, 1), clip):
+                self.render_shape(shape, params, antialias, clip)
+
+    def undo_shape(self):
+        """Убирает последнюю фигуру сцены и перерисовывает только её прямоугольник."""
+        self.cancel_render()
+        if self.scene:
+            shape, params, bbox, antialias = self.scene.pop()
+            self.redraw_scene(bbox)
+
+    def clear_scene(self):
+        self.scene = []
+        self.redraw_scene()
 
     def on_mouse_down(self, event):
+        self.cancel_render()
         self.start_x = event.x
         self.start_y = event.y
 
@@ -102,38 +333,45 @@ class GraphicsEditor:
         elif self.current_shape == "парабола":
             self.get_parabola_params(self.start_x, self.start_y, end_x, end_y)
 
+    def visible_rect(self):
+        """Прямоугольник отсечения канвы (xmin, ymin, xmax, ymax)."""
+        return 0, 0, self.canvas_width - 1, self.canvas_height - 1
+
     def draw_pixel(self, x, y, color="black"):
+        if not (0 <= x < self.canvas_width and 0 <= y < self.canvas_height):
+            return
         if self.debug_mode:
             x = self.grid_size * round(x / self.grid_size)
             y = self.grid_size * round(y / self.grid_size)
             x0 = x - self.grid_size // 2
             y0 = y - self.grid_size // 2
-            x1 = x + self.grid_size // 2
-            y1 = y + self.grid_size // 2
-            self.canvas.create_rectangle(x0, y0, x1, y1, fill=color, outline=color)
+            self.surface.put(x0, y0, color, size=self.grid_size, tags="pixel")
         else:
-            self.canvas.create_rectangle(x, y, x + 1, y + 1, fill=color, outline=color)
+            self.surface.put(x, y, color)
+
+    def draw_pixels(self, pixels, color="black"):
+        """Выводит массив пикселей (N, 2): в обычном режиме одним присваиванием в поверхность."""
+        if self.debug_mode:
+            for x, y in pixels.tolist():
+                self.draw_pixel(x, y, color)
+        else:
+            self.surface.put_many(pixels, color)
+
+    def draw_coverage(self, pixels, coverage, color="black"):
+        """Выводит пиксели (N, 2) с покрытием (N,), смешивая цвет с фоном как сглаженные линии."""
+        if self.debug_mode:
+            # Крупные пиксели сетки закрашиваются оттенком серого по покрытию
+            for (x, y), value in zip(pixels.tolist(), coverage.tolist()):
+                level = round(255 * (1 - min(max(value, 0.0), 1.0)))
+                self.draw_pixel(x, y, "#%02x%02x%02x" % (level, level, level))
+        else:
+            self.surface.blend_many(pixels, coverage, color)
 
     def draw_circle(self, center_x, center_y, radius):
-        x = radius
-        y = 0
-        decision_over_2 = 1 - x   # Decision criterion divided by 2 evaluated at x=r, y=0
-
-        while x >= y:
-            self.draw_pixel(x + center_x, y + center_y)
-            self.draw_pixel(y + center_x, x + center_y)
-            self.draw_pixel(-x + center_x, y + center_y)
-            self.draw_pixel(-y + center_x, x + center_y)
-            self.draw_pixel(-x + center_x, -y + center_y)
-            self.draw_pixel(-y + center_x, -x + center_y)
-            self.draw_pixel(x + center_x, -y + center_y)
-            self.draw_pixel(y + center_x, -x + center_y)
-            y += 1
-            if decision_over_2 <= 0:
-                decision_over_2 += 2 * y + 1   # Change in decision criterion for y -> y+1
-            else:
-                x -= 1
-                decision_over_2 += 2 * (y - x) + 1   # Change for y -> y+1, x -> x-1
+        bbox = (center_x - radius, center_y - radius, center_x + radius, center_y + radius)
+        if not rect_intersects(bbox, self.visible_rect()):
+            return
+        self.add_shape("окружность", (center_x, center_y, radius), bbox)
 
     def get_ellipse_params(self, center_x, center_y, end_x, end_y):
         self.ellipse_window = tk.Toplevel(self.master)
@@ -147,54 +385,30 @@ class GraphicsEditor:
         self.ry_entry = tk.Entry(self.ellipse_window)
         self.ry_entry.grid(row=1, column=1, padx=5, pady=5)
 
-        ok_button = ttk.Button(self.ellipse_window, text="OK", command=lambda: self.draw_ellipse(
-            center_x, center_y, int(self.rx_entry.get()), int(self.ry_entry.get())))
-        ok_button.grid(row=2, column=0, columnspan=2, padx=5, pady=5)
+        self.ellipse_angle_entry = self.angle_entry(self.ellipse_window, row=2)
 
-    def draw_ellipse(self, center_x, center_y, rx, ry):
-        x = 0
-        y = ry
-
-        rx2 = rx * rx
-        ry2 = ry * ry
-        dx = 2 * ry2 * x
-        dy = 2 * rx2 * y
-        err = ry2 - rx2 * ry + rx2 / 4
-
-        while dx < dy:
-            self.draw_pixel(center_x + x, center_y + y)
-            self.draw_pixel(center_x - x, center_y + y)
-            self.draw_pixel(center_x + x, center_y - y)
-            self.draw_pixel(center_x - x, center_y - y)
-
-            if err < 0:
-                x += 1
-                dx = dx + 2 * ry2
-                err = err + dx + ry2
-            else:
-                x += 1
-                y -= 1
-                dx = dx + 2 * ry2
-                dy = dy - 2 * rx2
-                err = err + dx - dy + ry2
-
-        err = (x + 0.5) ** 2 * ry2 + (y - 1) ** 2 * rx2 - rx2 * ry2
-        while y >= 0:
-            self.draw_pixel(center_x + x, center_y + y)
-            self.draw_pixel(center_x - x, center_y + y)
-            self.draw_pixel(center_x + x, center_y - y)
-            self.draw_pixel(center_x - x, center_y - y)
-
-            if err > 0:
-                y -= 1
-                dy = dy - 2 * rx2
-                err = err - dy + rx2
-            else:
-                x += 1
-                y -= 1
-                dx = dx + 2 * ry2
-                dy = dy - 2 * rx2
-                err = err + dx - dy + rx2
+        ok_button = ttk.Button(self.ellipse_window, text="OK", command=lambda: self.draw_ellipse(
+            center_x, center_y, int(self.rx_entry.get()), int(self.ry_entry.get()),
+            math.radians(float(self.ellipse_angle_entry.get()))))
+        ok_button.grid(row=3, column=0, columnspan=2, padx=5, pady=5)
+
+    def angle_entry(self, window, row):
+        """Поле угла поворота фигуры в градусах (по умолчанию 0)."""
+        tk.Label(window, text="Угол, °:").grid(row=row, column=0, padx=5, pady=5)
+        entry = tk.Entry(window)
+        entry.insert(0, "0")
+        entry.grid(row=row, column=1, padx=5, pady=5)
+        return entry
+
+    def draw_ellipse(self, center_x, center_y, rx, ry, angle=0.0):
+        # Повёрнутый эллипс вписан в квадрат со стороной 2 max(rx, ry)
+        half_x, half_y = (rx, ry) if not angle else (max(rx, ry), max(rx, ry))
+        bbox = (center_x - half_x, center_y - half_y, center_x + half_x, center_y + half_y)
+        if not rect_intersects(bbox, self.visible_rect()):
+            if hasattr(self, 'ellipse_window') and self.ellipse_window.winfo_exists():
+                self.ellipse_window.destroy()
+            return
+        self.add_shape("эллипс", (center_x, center_y, rx, ry, angle), bbox)
 
         if hasattr(self, 'ellipse_window') and self.ellipse_window.winfo_exists():
             self.ellipse_window.destroy()
@@ -211,20 +425,16 @@ class GraphicsEditor:
         self.b_entry = tk.Entry(self.hyperbola_window)
         self.b_entry.grid(row=1, column=1, padx=5, pady=5)
 
+        self.hyperbola_angle_entry = self.angle_entry(self.hyperbola_window, row=2)
+
         ok_button = ttk.Button(self.hyperbola_window, text="OK", command=lambda: self.draw_hyperbola(
-            center_x, center_y, float(self.a_entry.get()), float(self.b_entry.get())))
-        ok_button.grid(row=2, column=0, columnspan=2, padx=5, pady=5)
+            center_x, center_y, float(self.a_entry.get()), float(self.b_entry.get()),
+            math.radians(float(self.hyperbola_angle_entry.get()))))
+        ok_button.grid(row=3, column=0, columnspan=2, padx=5, pady=5)
 
-    def draw_hyperbola(self, center_x, center_y, a, b):
-        x = a
-        y = 0
-        while x < self.canvas_width and y < self.canvas_height:
-            y = b * math.sqrt((x**2 / a**2) - 1)
-            self.draw_pixel(int(center_x + x), int(center_y + y))
-            self.draw_pixel(int(center_x - x), int(center_y + y))
-            self.draw_pixel(int(center_x + x), int(center_y - y))
-            self.draw_pixel(int(center_x - x), int(center_y - y))
-            x += 0.1
+    def draw_hyperbola(self, center_x, center_y, a, b, angle=0.0):
+        # Ветви гиперболы и параболы доходят до краёв канвы
+        self.add_shape("гипербола", (center_x, center_y, a, b, angle), self.visible_rect())
         if hasattr(self, 'hyperbola_window') and self.hyperbola_window.winfo_exists():
             self.hyperbola_window.destroy()
 
@@ -236,19 +446,18 @@ class GraphicsEditor:
         self.p_entry = tk.Entry(self.parabola_window)
         self.p_entry.grid(row=0, column=1, padx=5, pady=5)
 
+        self.parabola_angle_entry = self.angle_entry(self.parabola_window, row=1)
+
         ok_button = ttk.Button(self.parabola_window, text="OK", command=lambda: self.draw_parabola(
-            center_x, center_y, float(self.p_entry.get())))
+            center_x, center_y, float(self.p_entry.get()), math.radians(float(self.parabola_angle_entry.get()))))
         ok_button.grid(row=2, column=0, columnspan=2, padx=5, pady=5)
 
-    def draw_parabola(self, center_x, center_y, p):
-        x = -self.canvas_width/2
-        while x < self.canvas_width/2:
-            y = x**2 / (2 * p)
-            self.draw_pixel(int(center_x + x), int(center_y - y))
-            x += 0.1
+    def draw_parabola(self, center_x, center_y, p, angle=0.0):
+        self.add_shape("парабола", (center_x, center_y, p, angle), self.visible_rect())
         if hasattr(self, 'parabola_window') and self.parabola_window.winfo_exists():
             self.parabola_window.destroy()
 
-root = tk.Tk()
-editor = GraphicsEditor(root)
-root.mainloop()
+if __name__ == "__main__":
+    root = tk.Tk()
+    editor = GraphicsEditor(root)
+    root.mainloop()
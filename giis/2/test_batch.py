@@ -0,0 +1,74 @@
+import unittest
+
+import numpy as np
+
+from batch import row_span, split_bands, draw_band, render_batch
+from conics import circle_conic, ellipse_conic, parabola_conic, conic_pixels
+
+
+class TestRenderBatch(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.primitives = [circle_conic(int(x), int(y), int(r))
+                           for x, y, r in rng.integers([0, 0, 2], [200, 150, 40], (150, 3))]
+        self.primitives += [ellipse_conic(100, 75, 60, 20, 0.3), parabola_conic(100, 140, 12)]
+
+    def sequential(self, width, height):
+        framebuffer = np.zeros((height, width), dtype=np.uint8)
+        for coefficients in self.primitives:
+            pixels = conic_pixels(coefficients, width, height)
+            framebuffer[pixels[:, 1], pixels[:, 0]] = 255
+        return framebuffer
+
+    def test_matches_sequential_rendering(self):
+        expected = self.sequential(200, 150)
+        for workers in (1, 2, 3):
+            framebuffer, count = render_batch(self.primitives, 200, 150, workers=workers)
+            np.testing.assert_array_equal(framebuffer, expected)
+            self.assertEqual(count, sum(len(conic_pixels(c, 200, 150)) for c in self.primitives))
+        framebuffer, _ = render_batch(self.primitives, 200, 150, workers=2, bands_per_worker=4)
+        np.testing.assert_array_equal(framebuffer, expected)
+
+    def test_bands_cover_rows_without_overlap(self):
+        bands = split_bands(self.primitives, 150, 8)
+        rows = [row for y0, y1, _ in bands for row in range(y0, y1)]
+        self.assertEqual(len(rows), len(set(rows)))
+        self.assertLessEqual(set(rows), set(range(150)))
+        for coefficients in self.primitives:
+            top, bottom = row_span(coefficients, 150)
+            # Фигура есть ровно в тех полосах, чьи строки она задевает
+            for y0, y1, group in bands:
+                self.assertEqual(coefficients in group, y0 <= bottom and top < y1)
+
+    def test_open_curves_go_to_every_band(self):
+        parabolas = [parabola_conic(100, y, 12) for y in range(0, 150, 10)]
+        bands = split_bands(parabolas, 150, 4)
+        self.assertEqual([len(group) for _, _, group in bands], [15, 15, 15, 15])
+
+    def test_band_writes_stay_in_its_rows(self):
+        framebuffer = np.zeros((150, 200), dtype=np.uint8)
+        count = draw_band(framebuffer, 40, 80, self.primitives)
+        self.assertFalse(framebuffer[:40].any() or framebuffer[80:].any())
+        np.testing.assert_array_equal(framebuffer[40:80], self.sequential(200, 150)[40:80])
+        self.assertEqual(count, np.count_nonzero(
+            np.concatenate([conic_pixels(c, 200, 150)[:, 1] for c in self.primitives]) // 40 == 1))
+
+    def test_bands_leave_nothing_for_parent(self):
+        # Полосы вместе выводят всю картинку, родителю дописывать нечего
+        framebuffer = np.zeros((150, 200), dtype=np.uint8)
+        count = sum(draw_band(framebuffer, y0, y1, group)
+                    for y0, y1, group in split_bands(self.primitives, 150, 8))
+        np.testing.assert_array_equal(framebuffer, self.sequential(200, 150))
+        self.assertEqual(count, sum(len(conic_pixels(c, 200, 150)) for c in self.primitives))
+
+    def test_empty_batch(self):
+        framebuffer, count = render_batch([], 10, 10, workers=2)
+        self.assertEqual(count, 0)
+        self.assertFalse(framebuffer.any())
+        framebuffer, count = render_batch(self.primitives, 0, 10, workers=2)
+        self.assertEqual(framebuffer.shape, (10, 0))
+        self.assertEqual(count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
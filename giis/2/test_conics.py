@@ -0,0 +1,298 @@
+import math
+import unittest
+
+import numpy as np
+
+from conics import (midpoint_circle, circle_pixels, midpoint_ellipse, ellipse_quadrant, ellipse_pixels, isqrt,
+                    hyperbola_quadrant, hyperbola_pixels, hyperbola, parabola_half, parabola_pixels, parabola,
+                    circle_conic, ellipse_conic, hyperbola_conic, parabola_conic, classify_conic,
+                    quadratic_roots, trace_conic, conic_pixels, conic_chunks, circle_coverage, ellipse_coverage,
+                    degenerate_ellipse_pixels)
+
+
+def plotted(algorithm, *args):
+    """Множество пикселей, выведенных функцией с обратным вызовом plot."""
+    points = []
+    algorithm(*args, lambda x, y: points.append((x, y)))
+    return set(points)
+
+
+class TestCirclePixels(unittest.TestCase):
+    def test_matches_midpoint_circle(self):
+        for radius in list(range(0, 120)) + [499, 1000, 2047]:
+            pixels = circle_pixels(7, -3, radius)
+            self.assertEqual(set(map(tuple, pixels.tolist())), plotted(midpoint_circle, 7, -3, radius), radius)
+
+    def test_no_duplicates(self):
+        for radius in range(0, 200):
+            pixels = circle_pixels(0, 0, radius)
+            self.assertEqual(len(np.unique(pixels, axis=0)), len(pixels), radius)
+
+    def test_large_radius_stays_on_circle(self):
+        radius = 100000
+        pixels = circle_pixels(0, 0, radius)
+        distance = np.hypot(pixels[:, 0], pixels[:, 1])
+        self.assertLessEqual(np.abs(distance - radius).max(), 0.5 + 1e-6)
+
+    def test_isqrt_exact(self):
+        values = np.array([0, 1, 2, 3, 4, 15, 16, 17, 2 ** 52 + 1, 4 * 10 ** 17, 2 ** 62 - 1], dtype=np.int64)
+        roots = isqrt(values)
+        self.assertTrue(np.all(roots * roots <= values))
+        self.assertTrue(np.all((roots + 1) * (roots + 1) > values))
+
+
+class TestEllipsePixels(unittest.TestCase):
+    def test_matches_float_midpoint_ellipse(self):
+        for rx in range(0, 40):
+            for ry in range(0, 40):
+                pixels = ellipse_pixels(5, 9, rx, ry)
+                self.assertEqual(set(map(tuple, pixels.tolist())), plotted(midpoint_ellipse, 5, 9, rx, ry), (rx, ry))
+
+    def test_no_duplicates(self):
+        for rx, ry in [(0, 7), (7, 0), (1, 1), (10, 3), (3, 10), (50, 50)]:
+            pixels = ellipse_pixels(0, 0, rx, ry)
+            self.assertEqual(len(np.unique(pixels, axis=0)), len(pixels), (rx, ry))
+
+    def test_large_radii_stay_connected_and_on_curve(self):
+        rx, ry = 300000, 70001
+        xs, ys = ellipse_quadrant(rx, ry)
+        steps = np.abs(np.diff(np.column_stack((xs, ys)), axis=0))
+        self.assertLessEqual(steps.max(), 1)
+        self.assertEqual((xs[0], ys[0], xs[-1], ys[-1]), (0, ry, rx, 0))
+        # Расстояние до кривой в первом приближении: |f| / |grad f|
+        x = xs.astype(np.float64)
+        y = ys.astype(np.float64)
+        f = x * x * ry * ry + y * y * rx * rx - float(rx * rx) * ry * ry
+        grad = 2 * np.hypot(x * ry * ry, y * rx * rx)
+        self.assertLess(np.abs(f / grad).max(), 1)
+
+
+class TestCoverage(unittest.TestCase):
+    def test_no_duplicates_and_coverage_range(self):
+        for rx, ry in [(1, 1), (5, 5), (10, 3), (3, 10), (50, 50), (1000, 997)]:
+            pixels, coverage = ellipse_coverage(0, 0, rx, ry)
+            self.assertEqual(len(pixels), len(coverage))
+            self.assertEqual(len(np.unique(pixels, axis=0)), len(pixels), (rx, ry))
+            self.assertTrue(np.all((coverage > 0) & (coverage <= 1)), (rx, ry))
+
+    def test_columns_centred_on_circle(self):
+        # В столбцах области 1 покрытие делится между двумя строками: сумма 1, центр — на окружности
+        radius = 100
+        pixels, coverage = circle_coverage(0, 0, radius)
+        for x in range(0, 70):
+            column = (pixels[:, 0] == x) & (pixels[:, 1] > 0)
+            self.assertAlmostEqual(coverage[column].sum(), 1, places=5)
+            centroid = (pixels[column, 1] * coverage[column]).sum()
+            self.assertAlmostEqual(centroid, np.sqrt(radius * radius - x * x), places=4)
+
+    def test_symmetric(self):
+        pixels, coverage = ellipse_coverage(0, 0, 37, 21)
+        table = dict(zip(map(tuple, pixels.tolist()), coverage.tolist()))
+        for (x, y), value in table.items():
+            self.assertEqual(table.get((-x, y)), value)
+            self.assertEqual(table.get((x, -y)), value)
+
+    def test_degenerate_radii(self):
+        pixels, coverage = ellipse_coverage(4, 6, 5, 0)
+        self.assertEqual(set(map(tuple, pixels.tolist())), set(map(tuple, ellipse_pixels(4, 6, 5, 0).tolist())))
+        self.assertTrue(np.all(coverage == 1))
+        pixels, coverage = circle_coverage(4, 6, 0)
+        self.assertEqual(pixels.tolist(), [[4, 6]])
+
+
+class TestOpenConics(unittest.TestCase):
+    def assert_traced(self, xs, ys, x_curve, y_curve):
+        """Соседние пиксели 8-связны и отстоят от кривой не дальше 1/2 по одной из осей."""
+        steps = np.abs(np.diff(np.column_stack((xs, ys)), axis=0))
+        self.assertEqual(steps.max(), 1)
+        self.assertTrue(np.all(steps.sum(axis=1) > 0))
+        error = np.minimum(np.abs(xs - x_curve(ys)), np.abs(ys - y_curve(xs)))
+        self.assertLessEqual(error.max(), 0.5 + 1e-9)
+
+    def test_hyperbola_quadrant_follows_curve(self):
+        for a, b in [(50, 30), (30, 50), (3.4, 2.2), (120.5, 10), (7, 7)]:
+            xs, ys = hyperbola_quadrant(a, b, 2000, 2000)
+            self.assert_traced(xs, ys, lambda y: a * np.sqrt(1 + (y / b) ** 2),
+                               lambda x: b * np.sqrt(np.maximum((x / a) ** 2 - 1, 0)))
+            self.assertTrue(xs.max() == 2000 or ys.max() == 2000)
+
+    def test_parabola_half_follows_curve(self):
+        for p in [0.3, 1, 10.5, 100, 1000]:
+            xs, ys = parabola_half(p, 2000, 2000)
+            self.assert_traced(xs, ys, lambda y: np.sqrt(2 * p * y), lambda x: x * x / (2 * p))
+
+    def test_pixels_unique_and_on_canvas(self):
+        for pixels in (hyperbola_pixels(400, 300, 50, 30, 800, 600), hyperbola_pixels(10, 20, 0.3, 5, 800, 600),
+                       parabola_pixels(400, 300, 25, 800, 600), parabola_pixels(100, 50, -0.5, 800, 600)):
+            self.assertEqual(len(np.unique(pixels, axis=0)), len(pixels))
+            self.assertTrue(np.all((pixels >= 0) & (pixels < (800, 600))))
+
+    def test_parabola_orientation(self):
+        up = parabola_pixels(400, 300, 25, 800, 600)
+        down = parabola_pixels(400, 300, -25, 800, 600)
+        self.assertTrue(np.all(up[:, 1] <= 300))
+        self.assertTrue(np.all(down[:, 1] >= 300))
+
+    def test_plot_callbacks_report_count(self):
+        points = []
+        count = hyperbola(400, 300, 50, 30, 800, 600, lambda x, y: points.append((x, y)))
+        self.assertEqual(count, len(points))
+        self.assertEqual(count, len(set(points)))
+        points = []
+        self.assertEqual(parabola(400, 300, 25, 800, 600, lambda x, y: points.append((x, y))), len(points))
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            hyperbola_pixels(0, 0, 0, 5, 100, 100)
+        with self.assertRaises(ValueError):
+            parabola_pixels(0, 0, 0, 100, 100)
+
+
+class TestGeneralConic(unittest.TestCase):
+    WIDTH = 800
+    HEIGHT = 600
+
+    def assert_traced(self, coefficients, pixels):
+        """Пиксели уникальны, лежат на канве, близки к кривой и покрывают её без разрывов."""
+        A, B, C, D, E, F = coefficients
+        self.assertEqual(len(np.unique(pixels, axis=0)), len(pixels))
+        self.assertTrue(np.all((pixels >= 0) & (pixels < (self.WIDTH, self.HEIGHT))))
+        x = pixels[:, 0].astype(np.float64)
+        y = pixels[:, 1].astype(np.float64)
+        value = (A * x + B * y + D) * x + (C * y + E) * y + F
+        gradient = np.hypot(2 * A * x + B * y + D, B * x + 2 * C * y + E)
+        self.assertLess(np.abs(value / gradient).max(), 0.75)
+        # Точки кривой на частых горизонталях — в 8-окрестности выведенного пикселя
+        plotted_set = set(map(tuple, pixels.tolist()))
+        for row in np.arange(0, self.HEIGHT - 1, 0.37):
+            for column in quadratic_roots(A, B * row + D, C * row * row + E * row + F):
+                if 0 <= column <= self.WIDTH - 1:
+                    cx, cy = round(column), round(row)
+                    self.assertTrue(any((cx + i, cy + j) in plotted_set for i in (-1, 0, 1) for j in (-1, 0, 1)),
+                                    (column, row))
+
+    def test_classification(self):
+        self.assertEqual(classify_conic(*circle_conic(10, 20, 5)), "ellipse")
+        self.assertEqual(classify_conic(*ellipse_conic(10, 20, 5, 9, 0.4)), "ellipse")
+        self.assertEqual(classify_conic(*hyperbola_conic(10, 20, 5, 9, 1.1)), "hyperbola")
+        # Поворот даёт B^2 - 4AC порядка 1e-17 — это всё равно парабола
+        self.assertEqual(classify_conic(*parabola_conic(3, 4, 5, 1.234)), "parabola")
+        self.assertEqual(classify_conic(1, 0, -1, 0, 0, 0), "degenerate")
+        self.assertEqual(classify_conic(1, 0, 0, 0, 0, -4), "degenerate")
+        self.assertEqual(classify_conic(1, 0, 1, 0, 0, 1), "empty")
+
+    def test_degenerate_and_empty(self):
+        with self.assertRaises(ValueError):
+            conic_pixels((1, 0, -1, 0, 0, 0), self.WIDTH, self.HEIGHT)
+        self.assertEqual(len(conic_pixels((1, 0, 1, 0, 0, 1), self.WIDTH, self.HEIGHT)), 0)
+        with self.assertRaises(ValueError):
+            conic_pixels(hyperbola_conic(0, 0, 3, 4))
+
+    def test_zero_size_ellipse_is_a_point(self):
+        self.assertEqual(conic_pixels(circle_conic(3, 4, 0)).tolist(), [[3, 4]])
+        self.assertEqual(conic_pixels(circle_conic(30, 40, 0), self.WIDTH, self.HEIGHT).tolist(), [[30, 40]])
+        self.assertEqual(len(conic_pixels(circle_conic(-3, 4, 0), self.WIDTH, self.HEIGHT)), 0)
+
+    def test_degenerate_ellipse_pixels(self):
+        self.assertIsNone(degenerate_ellipse_pixels(3, 4, 5, 2))
+        # Без поворота — как у ellipse_pixels: отрезок при rx = 0, точка при ry = 0
+        np.testing.assert_array_equal(degenerate_ellipse_pixels(3, 4, 0, 6), ellipse_pixels(3, 4, 0, 6))
+        self.assertEqual(degenerate_ellipse_pixels(3, 4, 5, 0).tolist(), [[3, 4]])
+        self.assertEqual(degenerate_ellipse_pixels(3, 4, 0, 0, 1.0).tolist(), [[3, 4]])
+        self.assertEqual(set(map(tuple, degenerate_ellipse_pixels(20, 30, 0, 10, np.pi / 2).tolist())),
+                         {(x, 30) for x in range(10, 31)})
+        pixels = degenerate_ellipse_pixels(50, 50, 0, 20, 0.4)
+        steps = np.abs(np.diff(pixels[np.argsort(pixels[:, 1])], axis=0))
+        self.assertEqual(steps.max(), 1)
+        self.assertEqual(len(np.unique(pixels, axis=0)), len(pixels))
+
+    def test_axis_aligned_wrappers_use_fast_kernels(self):
+        np.testing.assert_array_equal(conic_pixels(circle_conic(3, 4, 70)), circle_pixels(3, 4, 70))
+        np.testing.assert_array_equal(conic_pixels(ellipse_conic(3, 4, 70, 20)), ellipse_pixels(3, 4, 70, 20))
+        # Вертикальная гипербола и горизонтальная парабола — те же ядра с переставленными осями
+        vertical = conic_pixels(hyperbola_conic(400, 300, 30, 50, np.pi / 2), self.WIDTH, self.HEIGHT)
+        horizontal = hyperbola_pixels(300, 400, 30, 50, self.HEIGHT, self.WIDTH)
+        self.assertEqual(set(map(tuple, vertical.tolist())), set(map(tuple, horizontal[:, ::-1].tolist())))
+
+    def test_rotated_conics(self):
+        for coefficients in (ellipse_conic(400, 300, 200, 100, 0.5), ellipse_conic(400.5, 300, 200, 100),
+                             ellipse_conic(400, 300, 5, 2, 1.0), ellipse_conic(-100, -50, 500, 250, 0.3),
+                             hyperbola_conic(400, 300, 50, 30, 0.7), hyperbola_conic(400, 300, 10, 80, 2.0),
+                             parabola_conic(400, 300, 40, 0.4), parabola_conic(400, 300, -3, 2.5)):
+            self.assert_traced(coefficients, conic_pixels(coefficients, self.WIDTH, self.HEIGHT))
+
+    def test_thin_rotated_ellipses_keep_their_tips(self):
+        for cx, cy, rx, ry, angle in ((400.3, 300.2, 150, 0.6, 0.3), (400.3, 300.2, 150, 1.0, 0.3),
+                                      (400.3, 300.2, 150, 1.5, 0.3), (420.6, 310.4, 233, 3.5, 2.7)):
+            pixels = conic_pixels(ellipse_conic(cx, cy, rx, ry, angle), self.WIDTH, self.HEIGHT)
+            self.assertEqual(len(np.unique(pixels, axis=0)), len(pixels))
+            half_x = math.hypot(rx * math.cos(angle), ry * math.sin(angle))
+            half_y = math.hypot(rx * math.sin(angle), ry * math.cos(angle))
+            self.assertEqual((pixels[:, 0].min(), pixels[:, 0].max()), (round(cx - half_x), round(cx + half_x)))
+            self.assertEqual((pixels[:, 1].min(), pixels[:, 1].max()), (round(cy - half_y), round(cy + half_y)))
+            # Точки эллипса не дальше пикселя от выведенных, и все пиксели — одна 8-связная линия
+            t = np.linspace(0, 2 * math.pi, 20000)
+            u, v = rx * np.cos(t), ry * np.sin(t)
+            xs = cx + u * math.cos(angle) - v * math.sin(angle)
+            ys = cy + u * math.sin(angle) + v * math.cos(angle)
+            plotted = set(map(tuple, pixels.tolist()))
+            sampled = set(zip(np.rint(xs).astype(int).tolist(), np.rint(ys).astype(int).tolist()))
+            for first, second in ((sampled, plotted), (plotted, sampled)):
+                for x, y in first:
+                    self.assertTrue(any((x + i, y + j) in second for i in (-1, 0, 1) for j in (-1, 0, 1)), (x, y))
+            component = {next(iter(plotted))}
+            frontier = list(component)
+            while frontier:
+                x, y = frontier.pop()
+                for neighbour in ((x + i, y + j) for i in (-1, 0, 1) for j in (-1, 0, 1)):
+                    if neighbour in plotted and neighbour not in component:
+                        component.add(neighbour)
+                        frontier.append(neighbour)
+            self.assertEqual(component, plotted)
+
+    def test_ellipse_outside_or_around_canvas(self):
+        self.assertEqual(len(conic_pixels(ellipse_conic(2000, 2000, 50, 30, 0.2), self.WIDTH, self.HEIGHT)), 0)
+        self.assertEqual(len(conic_pixels(ellipse_conic(400, 300, 900, 500, 0.3), self.WIDTH, self.HEIGHT)), 0)
+
+    def test_trace_is_incremental(self):
+        tracer = trace_conic(ellipse_conic(50, 50, 20, 10, 0.3), (0, 0, 99, 99))
+        first = next(tracer)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(list(tracer)) + 1, len(conic_pixels(ellipse_conic(50, 50, 20, 10, 0.3))))
+
+
+class TestConicChunks(unittest.TestCase):
+    CASES = [circle_conic(400, 300, 250), ellipse_conic(400, 300, 300, 120, 0.6),
+             hyperbola_conic(400, 300, 40, 30, 0.2), parabola_conic(400, 300, 15)]
+
+    def test_chunks_concatenate_to_pixels(self):
+        for coefficients in self.CASES:
+            chunks = list(conic_chunks(coefficients, 800, 600, chunk_size=100))
+            self.assertTrue(all(len(chunk) == 100 for chunk in chunks[:-1]))
+            self.assertTrue(0 < len(chunks[-1]) <= 100)
+            np.testing.assert_array_equal(np.concatenate(chunks), conic_pixels(coefficients, 800, 600))
+
+    def test_early_stop(self):
+        chunks = conic_chunks(ellipse_conic(400, 300, 300, 120, 0.6), 800, 600, chunk_size=10)
+        first = next(chunks)
+        chunks.close()
+        self.assertEqual(first.shape, (10, 2))
+        self.assertIsNone(next(chunks, None))
+
+    def test_pipe_into_buffer(self):
+        framebuffer = np.zeros((600, 800), dtype=np.uint8)
+        total = 0
+        for chunk in conic_chunks(self.CASES[1], 800, 600, chunk_size=64):
+            framebuffer[chunk[:, 1], chunk[:, 0]] = 255
+            total += len(chunk)
+        self.assertEqual(np.count_nonzero(framebuffer), total)
+
+    def test_errors_are_raised_eagerly(self):
+        with self.assertRaises(ValueError):
+            conic_chunks((1, 0, -1, 0, 0, 0), 800, 600)
+        with self.assertRaises(ValueError):
+            conic_chunks(self.CASES[0], 800, 600, chunk_size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,542 @@
+"""Вычисление точек кривых Эрмита, Безье и B-сплайна без Tk."""
+from functools import lru_cache
+
+import numpy as np
+
+HERMITE_MATRIX = np.array([
+    [ 2, -2,  1,  1],
+    [-3,  3, -2, -1],
+    [ 0,  0,  1,  0],
+    [ 1,  0,  0,  0]
+])
+
+BEZIER_MATRIX = np.array([
+    [-1,  3, -3,  1],
+    [ 3, -6,  3,  0],
+    [-3,  3,  0,  0],
+    [ 1,  0,  0,  0]
+])
+
+BSPLINE_MATRIX = (1/6) * np.array([
+    [-1,  3, -3,  1],
+    [ 3, -6,  3,  0],
+    [-3,  0,  3,  0],
+    [ 1,  4,  1,  0]
+])
+
+# Переход от коэффициентов степенного базиса к контрольным точкам Безье: BEZIER_MATRIX^-1
+POWER_TO_BEZIER = np.array([
+    [0, 0,   0,   1],
+    [0, 0,   1/3, 1],
+    [0, 1/3, 2/3, 1],
+    [1, 1,   1,   1]
+])
+
+HERMITE = "Эрмит"
+BEZIER = "Безье"
+BSPLINE = "B-Сплайн"
+
+POINTS_PER_SEGMENT = 4
+FLATNESS_TOLERANCE = 0.25  # Допустимое отклонение ломаной от кривой, пикселей
+MAX_SUBDIVISION_DEPTH = 16
+
+
+@lru_cache(maxsize=None)
+def power_basis(num_steps):
+    """Матрица степенного базиса (num_steps + 1, 4): строки [t^3, t^2, t, 1] для t = i / num_steps.
+
+    Считается один раз на число шагов и кэшируется; массив только для чтения.
+    """
+    t = np.linspace(0.0, 1.0, num_steps + 1)
+    basis = np.column_stack((t ** 3, t ** 2, t, np.ones_like(t)))
+    basis.flags.writeable = False
+    return basis
+
+
+CURVE_MATRICES = {
+    HERMITE: HERMITE_MATRIX,
+    BEZIER: BEZIER_MATRIX,
+    BSPLINE: BSPLINE_MATRIX,
+}
+
+
+def geometry_batch(segments, curve_type):
+    """Базисная матрица M и векторы геометрии G (K, 4, 2) для K сегментов одного типа."""
+    if curve_type not in CURVE_MATRICES:
+        raise ValueError(f"Неизвестный тип кривой: {curve_type}")
+    G = np.asarray(segments, dtype=np.float64)
+    if curve_type == HERMITE:
+        # Эрмит: концы P0, P3 и касательные P1 - P0, P3 - P2
+        tangent_scale = 1.0
+        G = np.stack((G[:, 0], G[:, 3], tangent_scale * (G[:, 1] - G[:, 0]),
+                      tangent_scale * (G[:, 3] - G[:, 2])), axis=1)
+    return CURVE_MATRICES[curve_type], G
+
+
+def geometry(control_points_coords, curve_type):
+    """Базисная матрица M и вектор геометрии G (4, 2) сегмента."""
+    G = np.asarray(control_points_coords[:POINTS_PER_SEGMENT], dtype=np.float64)
+    if G.shape != (4, 2):
+        raise ValueError(f"Вектор геометрии G имеет неожиданную форму: {G.shape}. Ожидалась (4, 2).")
+    matrix, G = geometry_batch(G[np.newaxis], curve_type)
+    return matrix, G[0]
+
+
+def curve_points(control_points_coords, curve_type, num_steps=50):
+    """Точки сегмента кривой по четырём контрольным точкам: массив (num_steps + 1, 2).
+
+    Все t считаются одним умножением T_all @ (M @ G) на кэшированный базис.
+    Если точек меньше четырёх, возвращается пустой массив (0, 2).
+    """
+    if len(control_points_coords) < POINTS_PER_SEGMENT:
+        return np.empty((0, 2))
+    matrix, G = geometry(control_points_coords, curve_type)
+    return power_basis(num_steps) @ (matrix @ G)
+
+
+def batch_curve_points(segments, curve_types, num_steps=50):
+    """Точки многих сегментов сразу: плоский массив (K * (num_steps + 1), 2) и смещения (K + 1,).
+
+    Точки сегмента k — points[offsets[k]:offsets[k + 1]]. Сегменты
+    группируются по типу, и каждая группа считается одним einsum с
+    произведением T_all @ M, так что число вызовов NumPy не зависит от K.
+    """
+    groups = {}
+    for index, curve_type in enumerate(curve_types):
+        groups.setdefault(curve_type, []).append(index)
+    count = len(curve_types)
+    steps = num_steps + 1
+    points = np.empty((count, steps, 2))
+    if count:
+        segments = np.asarray(segments, dtype=np.float64).reshape(count, POINTS_PER_SEGMENT, 2)
+        for curve_type, group in groups.items():
+            matrix, G = geometry_batch(segments[group], curve_type)
+            points[group] = np.einsum('sj,kjd->ksd', power_basis(num_steps) @ matrix, G, optimize=True)
+    return points.reshape(-1, 2), np.arange(count + 1) * steps
+
+
+def split_bezier(pieces):
+    """Делит кубические сегменты Безье (4, P, 2) пополам по де Кастельжо: левые и правые половины."""
+    p0, p1, p2, p3 = pieces
+    a = (p0 + p1) * 0.5
+    b = (p1 + p2) * 0.5
+    c = (p2 + p3) * 0.5
+    d = (a + b) * 0.5
+    e = (b + c) * 0.5
+    m = (d + e) * 0.5
+    return np.array((p0, a, d, m)), np.array((m, e, c, p3))
+
+
+def is_flat(pieces, tolerance):
+    """Проверка плоскостности сегментов Безье (4, P, 2): ломаная P0-P3 отклоняется не больше tolerance.
+
+    Оценка через 3 P1 - 2 P0 - P3 и 3 P2 - P0 - 2 P3: отклонение кривой от
+    хорды не больше четверти их наибольшей длины по каждой оси.
+    """
+    p0, p1, p2, p3 = pieces
+    u = np.square(3 * p1 - 2 * p0 - p3)
+    v = np.square(3 * p2 - p0 - 2 * p3)
+    return np.maximum(u, v).sum(axis=1) <= 16 * tolerance * tolerance
+
+
+def power_coefficients(segments, curve_types):
+    """Коэффициенты степенного базиса M @ G (K, 4, 2) сегментов разных типов: p(t) = [t^3, t^2, t, 1] @ C."""
+    count = len(curve_types)
+    segments = np.asarray(segments, dtype=np.float64).reshape(count, POINTS_PER_SEGMENT, 2)
+    coefficients = np.empty((count, 4, 2))
+    kinds = set(curve_types)
+    if len(kinds) == 1:
+        groups = {kinds.pop(): slice(None)}  # Все сегменты одной кривой: без разбора по типам
+    else:
+        groups = {}
+        for index, curve_type in enumerate(curve_types):
+            groups.setdefault(curve_type, []).append(index)
+    for curve_type, group in groups.items():
+        matrix, G = geometry_batch(segments[group], curve_type)
+        coefficients[group] = matrix @ G
+    return coefficients
+
+
+def batch_flatten(segments, curve_types, tolerance=FLATNESS_TOLERANCE, max_depth=MAX_SUBDIVISION_DEPTH):
+    """Адаптивная ломаная многих сегментов: плоский массив точек (N, 2) и смещения (K + 1,).
+
+    Любой сегмент (Эрмит, Безье, B-сплайн) переводится в контрольные точки
+    Безье, и все сегменты делятся пополам по де Кастельжо, пока каждый
+    кусок не станет плоским с точностью tolerance пикселей (но не глубже
+    max_depth). Концы кусков дают параметры t, в которых кривая считается
+    точно через степенной базис. Маленькие сегменты получают несколько
+    точек, сильно изогнутые — столько, сколько нужно.
+    """
+    count = len(curve_types)
+    if not count:
+        return np.empty((0, 2)), np.zeros(1, dtype=np.int64)
+    coefficients = power_coefficients(segments, curve_types)
+    # Куски хранятся как (4, P, 2): контрольные точки по отдельности непрерывны в памяти
+    pieces = np.ascontiguousarray((POWER_TO_BEZIER @ coefficients).transpose(1, 0, 2))
+    owners = np.arange(count)
+    starts = np.zeros(count)
+    width = 1.0
+    accepted_owners = [owners]
+    accepted_starts = [np.ones(count)]  # Конец t = 1 каждого сегмента
+    for depth in range(max_depth + 1):
+        if depth == max_depth:
+            accepted_owners.append(owners)
+            accepted_starts.append(starts)
+            break
+        flat = is_flat(pieces, tolerance)
+        accepted_owners.append(owners[flat])
+        accepted_starts.append(starts[flat])
+        rest = ~flat
+        if not rest.any():
+            break
+        width *= 0.5
+        left, right = split_bezier(pieces[:, rest])
+        pieces = np.concatenate((left, right), axis=1)
+        owners = np.tile(owners[rest], 2)
+        starts = starts[rest]
+        starts = np.concatenate((starts, starts + width))
+    owners = np.concatenate(accepted_owners)
+    t = np.concatenate(accepted_starts)
+    order = np.lexsort((t, owners))
+    owners = owners[order]
+    t = t[order, np.newaxis]
+    # Схема Горнера по коэффициентам степенного базиса своего сегмента
+    c = coefficients[owners]
+    points = ((c[:, 0] * t + c[:, 1]) * t + c[:, 2]) * t + c[:, 3]
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(owners, minlength=count), out=offsets[1:])
+    return points, offsets
+
+
+def flatten_curve(control_points_coords, curve_type, tolerance=FLATNESS_TOLERANCE):
+    """Адаптивная ломаная одного сегмента: массив (N, 2); N = len(...) — число точек."""
+    if len(control_points_coords) < POINTS_PER_SEGMENT:
+        return np.empty((0, 2))
+    return batch_flatten([control_points_coords[:POINTS_PER_SEGMENT]], [curve_type], tolerance)[0]
+
+
+def segment_bboxes(coefficients):
+    """Точные ограничивающие прямоугольники сегментов (K, 4): xmin, ymin, xmax, ymax.
+
+    Экстремумы координаты кубики лежат на концах t = 0, 1 или в корнях
+    производной 3a t^2 + 2b t + c на (0, 1); корни всех сегментов и обеих
+    осей находятся сразу, без цикла. Подходит для любого типа сегмента —
+    коэффициенты берутся из степенного базиса.
+    """
+    a, b, c, d = 3 * coefficients[:, 0], 2 * coefficients[:, 1], coefficients[:, 2], coefficients[:, 3]
+    discriminant = b * b - 4 * a * c
+    root = np.sqrt(np.maximum(discriminant, 0))
+    quadratic = np.abs(a) > 1e-12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Устойчивая формула корней; при a = 0 производная линейна: t = -c / b
+        q = -0.5 * (b + np.copysign(root, b))
+        roots = np.stack((np.where(quadratic, q / a, -c / b), np.where(quadratic, c / q, -c / b)))
+    valid = np.isfinite(roots) & (roots > 0) & (roots < 1) & (discriminant >= 0)
+    t = np.where(valid, roots, 0.0)
+    values = ((coefficients[:, 0] * t + coefficients[:, 1]) * t + coefficients[:, 2]) * t + d
+    ends = np.stack((d, coefficients.sum(axis=1)))
+    candidates = np.concatenate((ends, values))  # (4, K, 2): концы и два корня по каждой оси
+    return np.concatenate((candidates.min(axis=0), candidates.max(axis=0)), axis=1)
+
+
+def boxes_intersect(boxes, rect):
+    """Какие прямоугольники (K, 4) пересекают rect = (xmin, ymin, xmax, ymax)."""
+    xmin, ymin, xmax, ymax = rect
+    return (boxes[:, 0] <= xmax) & (boxes[:, 2] >= xmin) & (boxes[:, 1] <= ymax) & (boxes[:, 3] >= ymin)
+
+
+def polyline_distance(x, y, polyline):
+    """Расстояние от точки до ломаной (M, 2); inf для пустой ломаной."""
+    if len(polyline) == 0:
+        return np.inf
+    if len(polyline) == 1:
+        return float(np.hypot(x - polyline[0, 0], y - polyline[0, 1]))
+    start = polyline[:-1]
+    edge = polyline[1:] - start
+    offset = np.array((x, y)) - start
+    length = (edge * edge).sum(axis=1)
+    t = np.clip((offset * edge).sum(axis=1) / np.where(length > 0, length, 1), 0, 1)
+    return float(np.sqrt(np.min(((offset - t[:, np.newaxis] * edge) ** 2).sum(axis=1))))
+
+
+# Соседние сегменты составной кривой Безье/Эрмита делят крайнюю точку, B-сплайна — три точки
+SEGMENT_STRIDE = {
+    HERMITE: 3,
+    BEZIER: 3,
+    BSPLINE: 1,
+}
+
+
+def segment_windows(count, curve_type, closed=False):
+    """Индексы контрольных точек сегментов (K, 4) для кривой из count точек.
+
+    Открытая кривая: B-сплайн — скользящее окно (K = count - 3), составная
+    Безье/Эрмит — окна с шагом 3 (K = (count - 1) // 3, лишние точки ждут
+    следующего сегмента). Замкнутая кривая оборачивает индексы по модулю:
+    у B-сплайна K = count, у составной кривой K = count // 3.
+    """
+    if curve_type not in SEGMENT_STRIDE:
+        raise ValueError(f"Неизвестный тип кривой: {curve_type}")
+    stride = SEGMENT_STRIDE[curve_type]
+    if closed:
+        segment_count = count // stride if count >= 3 else 0
+    else:
+        segment_count = (count - POINTS_PER_SEGMENT) // stride + 1 if count >= POINTS_PER_SEGMENT else 0
+    windows = np.arange(segment_count)[:, np.newaxis] * stride + np.arange(POINTS_PER_SEGMENT)
+    if closed and segment_count:
+        windows %= segment_count * stride
+    return windows
+
+
+def check_closed(count, curve_type):
+    """Проверяет, что кривую из count точек можно замкнуть, иначе ValueError.
+
+    Замкнутой кривой нужно хотя бы три точки, а у составной кривой число
+    точек должно делиться на три — иначе лишние точки не вошли бы ни в
+    один сегмент.
+    """
+    if count < 3:
+        raise ValueError("Для замкнутой кривой нужно хотя бы три точки.")
+    if count % SEGMENT_STRIDE[curve_type]:
+        raise ValueError("Составную кривую можно замкнуть при числе точек, кратном трём.")
+
+
+def join_segments(segments):
+    """Склеивает ломаные соседних сегментов в одну, не повторяя общие концы."""
+    if not segments:
+        return np.empty((0, 2))
+    return np.concatenate([segments[0]] + [points[1:] for points in segments[1:]])
+
+
+class SplineCurve:
+    """Открытая или замкнутая кривая из N контрольных точек одной ломаной.
+
+    B-сплайн строится по всем окнам из четырёх подряд идущих точек,
+    кривые Безье и Эрмита — составные, с общей точкой на стыке
+    сегментов. Ломаные сегментов хранятся по отдельности: перенос точки
+    помечает к пересчёту только сегменты, где она участвует, а
+    tessellate_curves пересчитывает помеченные сегменты многих кривых
+    одним вызовом batch_flatten. Точные прямоугольники сегментов
+    (bboxes) служат для отсечения невидимых сегментов и выбора кривой.
+    """
+
+    def __init__(self, curve_type, points=(), closed=False, hull=None):
+        if curve_type not in SEGMENT_STRIDE:
+            raise ValueError(f"Неизвестный тип кривой: {curve_type}")
+        if closed:
+            check_closed(len(points), curve_type)
+        self.curve_type = curve_type
+        # Массив (N, 2) — например, отображение файла сцены — хранится без копирования
+        self.points = points if isinstance(points, np.ndarray) else [tuple(point) for point in points]
+        self.closed = closed
+        self.segments = []  # Ломаные сегментов; None — сегмент нужно пересчитать
+        self.culled = []  # True — сегмент вне экрана и хранится только хордой между концами
+        self.tolerance = None
+        self.cached = None  # Склеенная ломаная всей кривой
+        self.boxes = None  # Прямоугольники сегментов (K, 4)
+        self.extent = None  # Прямоугольник всей кривой
+        self.hull = hull  # Прямоугольник кривой вместе с контрольными точками; может прийти из файла сцены
+
+    def __len__(self):
+        return len(self.points)
+
+    def windows(self):
+        return segment_windows(len(self.points), self.curve_type, self.closed)
+
+    def segment_count(self):
+        return len(self.windows())
+
+    def segment_points(self, segment_indices=None):
+        """Контрольные точки сегментов (K, 4, 2), по умолчанию всех."""
+        windows = self.windows()
+        if segment_indices is not None:
+            windows = windows[segment_indices]
+        if isinstance(self.points, np.ndarray):
+            return self.points[windows].astype(np.float64)  # Читаются только нужные точки
+        return np.asarray(self.points, dtype=np.float64).reshape(-1, 2)[windows]
+
+    def coefficients(self, segment_indices=None):
+        """Коэффициенты степенного базиса сегментов (K, 4, 2), по умолчанию всех."""
+        segments = self.segment_points(segment_indices)
+        return power_coefficients(segments, [self.curve_type] * len(segments))
+
+    def bboxes(self):
+        """Точные прямоугольники сегментов (K, 4), с кэшем."""
+        if self.boxes is None:
+            self.boxes = segment_bboxes(self.coefficients())
+        return self.boxes
+
+    def bbox(self):
+        """Прямоугольник всей кривой (xmin, ymin, xmax, ymax) или None, если сегментов нет."""
+        if self.extent is None:
+            boxes = self.bboxes()
+            if not len(boxes):
+                return None
+            self.extent = (*boxes[:, :2].min(axis=0).tolist(), *boxes[:, 2:].max(axis=0).tolist())
+        return self.extent
+
+    def hull_bbox(self):
+        """Прямоугольник, содержащий и кривую, и все её контрольные точки, или None без точек."""
+        if self.hull is None:
+            if not len(self.points):
+                return None
+            points = np.asarray(self.points, dtype=np.float64).reshape(-1, 2)
+            hull = (*points.min(axis=0).tolist(), *points.max(axis=0).tolist())
+            extent = self.bbox()
+            if extent is not None:
+                hull = (min(hull[0], extent[0]), min(hull[1], extent[1]),
+                        max(hull[2], extent[2]), max(hull[3], extent[3]))
+            self.hull = hull
+        return self.hull
+
+    def append(self, x, y):
+        """Добавляет точку в конец открытой кривой; прежние сегменты не меняются."""
+        if self.closed:
+            raise ValueError("В замкнутую кривую нельзя добавить точку")
+        if isinstance(self.points, np.ndarray):
+            self.points = [tuple(point) for point in self.points.tolist()]
+        self.points.append((x, y))
+        self.cached = None
+        self.boxes = None
+        self.extent = None
+        self.hull = None
+
+    def move_point(self, index, x, y):
+        """Переносит точку и помечает к пересчёту сегменты, в которых она участвует."""
+        self.points[index] = (x, y)
+        affected = np.flatnonzero((self.windows() == index).any(axis=1))
+        for segment in affected.tolist():
+            if segment < len(self.segments):
+                self.segments[segment] = None
+        if self.boxes is not None and len(affected):
+            self.boxes[affected] = segment_bboxes(self.coefficients(affected))
+        self.cached = None
+        self.extent = None
+        self.hull = None
+
+    def set_closed(self, closed):
+        if closed:
+            check_closed(len(self.points), self.curve_type)
+        if closed != self.closed:
+            self.closed = closed
+            self.segments = []
+            self.culled = []
+            self.cached = None
+            self.boxes = None
+            self.extent = None
+            self.hull = None
+
+    def sync(self, tolerance):
+        """Подгоняет список сегментов под число точек; при смене точности пересчитывается всё."""
+        count = self.segment_count()
+        if tolerance != self.tolerance:
+            self.tolerance = tolerance
+            self.segments = [None] * count
+            self.culled = [False] * count
+            self.cached = None
+        elif len(self.segments) != count:
+            self.segments = self.segments[:count] + [None] * (count - len(self.segments))
+            self.culled = self.culled[:count] + [False] * (count - len(self.culled))
+            self.cached = None
+
+    def polyline(self, tolerance=FLATNESS_TOLERANCE, viewport=None):
+        """Ломаная всей кривой (M, 2); у замкнутой последняя точка совпадает с первой."""
+        return tessellate_curves([self], tolerance, viewport)[0]
+
+    def distance(self, x, y, radius=np.inf):
+        """Расстояние от точки до кривой (с точностью ломаной) или inf, если дальше radius.
+
+        Грубый отбор по прямоугольникам сегментов, расширенным на radius;
+        точное расстояние считается только до ломаных отобранных сегментов.
+        """
+        boxes = self.bboxes()
+        near = np.flatnonzero(boxes_intersect(boxes, (x - radius, y - radius, x + radius, y + radius)))
+        if not len(near):
+            return np.inf
+        self.sync(self.tolerance if self.tolerance is not None else FLATNESS_TOLERANCE)
+        refine = [k for k in near.tolist() if self.segments[k] is None or self.culled[k]]
+        if refine:
+            points, offsets = batch_flatten(self.segment_points(refine), [self.curve_type] * len(refine),
+                                            self.tolerance)
+            for j, k in enumerate(refine):
+                self.segments[k] = points[offsets[j]:offsets[j + 1]]
+                self.culled[k] = False
+            self.cached = None
+        distance = min(polyline_distance(x, y, self.segments[k]) for k in near.tolist())
+        return distance if distance < radius else np.inf
+
+
+def tessellate_curves(curves, tolerance=FLATNESS_TOLERANCE, viewport=None):
+    """Ломаные кривых SplineCurve: все помеченные сегменты всех кривых — одним batch_flatten.
+
+    Если задан viewport (xmin, ymin, xmax, ymax), сегменты, чей точный
+    прямоугольник его не задевает, не делятся: вместо ломаной хранится
+    хорда между концами. Хорда лежит внутри прямоугольника сегмента и
+    потому тоже невидима; такой сегмент уточняется, когда окажется в кадре.
+    Кривая с уже известным прямоугольником hull вне кадра (например,
+    только что загруженная из файла сцены) пропускается целиком: её
+    точки не читаются, а ломаная пуста.
+    """
+    segments = []
+    types = []
+    targets = []
+    shown = [viewport is None or curve.hull is None or bool(boxes_intersect(np.array([curve.hull]), viewport)[0])
+             for curve in curves]
+    for curve, in_view in zip(curves, shown):
+        if not in_view:
+            continue
+        curve.sync(tolerance)
+        if not curve.segments:
+            continue
+        pending = np.fromiter((points is None for points in curve.segments), bool, len(curve.segments))
+        refine = pending | np.array(curve.culled, dtype=bool)
+        if viewport is not None:
+            visible = boxes_intersect(curve.bboxes(), viewport)
+            hidden = np.flatnonzero(pending & ~visible).tolist()
+            refine &= visible
+        else:
+            hidden = []
+        missing = np.flatnonzero(refine).tolist()
+        if hidden:
+            coefficients = curve.coefficients(hidden)
+            chords = np.stack((coefficients[:, 3], coefficients.sum(axis=1)), axis=1)
+            for k, chord in zip(hidden, chords):
+                curve.segments[k] = chord
+                curve.culled[k] = True
+            curve.cached = None
+        if missing:
+            segments.append(curve.segment_points(missing))
+            types.extend([curve.curve_type] * len(missing))
+            targets.extend((curve, k) for k in missing)
+    if targets:
+        points, offsets = batch_flatten(np.concatenate(segments), types, tolerance)
+        for j, (curve, k) in enumerate(targets):
+            curve.segments[k] = points[offsets[j]:offsets[j + 1]]
+            curve.culled[k] = False
+            curve.cached = None
+    polylines = []
+    for curve, in_view in zip(curves, shown):
+        if not in_view:
+            polylines.append(np.empty((0, 2)))
+            continue
+        if curve.cached is None:
+            curve.cached = join_segments(curve.segments)
+        polylines.append(curve.cached)
+    return polylines
+
+
+def pick_curve(curves, x, y, radius):
+    """Индекс ближайшей к точке кривой не дальше radius или None.
+
+    Сначала отбрасываются кривые, чей прямоугольник, расширенный на
+    radius, не содержит точку, затем расстояние считает SplineCurve.distance.
+    """
+    boxes = np.array([curve.bbox() or (np.inf, np.inf, -np.inf, -np.inf) for curve in curves]).reshape(-1, 4)
+    best_index = None
+    best_distance = radius
+    for index in np.flatnonzero(boxes_intersect(boxes, (x - radius, y - radius, x + radius, y + radius))).tolist():
+        distance = curves[index].distance(x, y, best_distance)
+        if distance < best_distance:
+            best_index = index
+            best_distance = distance
+    return best_index
@@ -1,31 +1,13 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
-import numpy as np
-
-HERMITE_MATRIX = np.array([
-    [ 2, -2,  1,  1],
-    [-3,  3, -2, -1],
-    [ 0,  0,  1,  0],
-    [ 1,  0,  0,  0]
-])
-
-BEZIER_MATRIX = np.array([
-    [-1,  3, -3,  1],
-    [ 3, -6,  3,  0],
-    [-3,  3,  0,  0],
-    [ 1,  0,  0,  0]
-])
-
-BSPLINE_MATRIX = (1/6) * np.array([
-    [-1,  3, -3,  1],
-    [ 3, -6,  3,  0],
-    [-3,  0,  3,  0],
-    [ 1,  4,  1,  0]
-])
-
-HERMITE = "Эрмит"
-BEZIER = "Безье"
-BSPLINE = "B-Сплайн"
+from tkinter import ttk, messagebox, simpledialog, filedialog
+
+from curves import (HERMITE, BEZIER, BSPLINE, POINTS_PER_SEGMENT, FLATNESS_TOLERANCE, SplineCurve, tessellate_curves,
+                    pick_curve)
+from spatial import PointGrid
+from scene import SCENE_EXTENSION, save_scene, load_scene
+
+PICK_TOLERANCE = 10  # Радиус выбора контрольной точки и кривой мышью, пикселей
+CURVE_WIDTH = 2
 
 class CurveEditor(tk.Tk):
     def __init__(self):
@@ -34,10 +16,18 @@ class CurveEditor(tk.Tk):
         self.geometry("800x600")
         self.current_curve_type = tk.StringVar(value=BEZIER)
         self.is_editing = tk.BooleanVar(value=False)
-        self.control_points = []
         self.drawn_curves = []
+        self.active_curve = None  # Индекс кривой в drawn_curves, к которой добавляются точки
         self.selected_point_info = None
         self.drag_start_pos = None
+        self.drag_target = None  # Последнее положение мыши, ещё не применённое к точке
+        self.drag_job = None  # Отложенный after_idle пересчёт: не чаще одного на кадр
+        self.resize_job = None  # Отложенное уточнение сегментов, попавших в кадр после изменения размера
+        self.selected_curve = None  # Индекс кривой, выбранной щелчком по линии
+        self.canvas_items = set()  # id живых элементов канвы: проверка существования за O(1)
+        self.point_owners = {}  # id контрольной точки -> (curve_index, point_index)
+        self.point_grid = PointGrid(PICK_TOLERANCE)  # Сетка id контрольных точек для выбора мышью
+        self.flatness_tolerance = FLATNESS_TOLERANCE  # Точность ломаной кривых, пикселей
         self._create_menu()
         self._create_toolbar()
         self._create_canvas()
@@ -45,6 +35,7 @@ class CurveEditor(tk.Tk):
         self.canvas.bind("<B1-Motion>", self.on_canvas_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_canvas_release)
         self.canvas.bind("<Configure>", self.on_canvas_resize)
+        self.bind("<Return>", lambda event: self.finish_curve())
         self.status_bar = tk.Label(self, text="Режим: Рисование | Тип: Безье | Кликните для добавления точек.", bd=1, relief=tk.SUNKEN, anchor=tk.W)
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
         self.update_status_bar()
@@ -54,6 +45,8 @@ class CurveEditor(tk.Tk):
         self.config(menu=menu_bar)
         file_menu = tk.Menu(menu_bar, tearoff=0)
         menu_bar.add_cascade(label="Файл", menu=file_menu)
+        file_menu.add_command(label="Открыть...", command=self.open_scene_file)
+        file_menu.add_command(label="Сохранить как...", command=self.save_scene_file)
         file_menu.add_command(label="Очистить всё", command=self.clear_canvas)
         file_menu.add_separator()
         file_menu.add_command(label="Выход", command=self.quit)
@@ -64,7 +57,11 @@ class CurveEditor(tk.Tk):
         curve_menu.add_radiobutton(label="B-Сплайн", variable=self.current_curve_type, value=BSPLINE, command=self.on_curve_type_change)
         edit_menu = tk.Menu(menu_bar, tearoff=0)
         menu_bar.add_cascade(label="Правка", menu=edit_menu)
+        edit_menu.add_command(label="Завершить кривую", command=self.finish_curve, accelerator="Enter")
+        edit_menu.add_command(label="Замкнуть кривую", command=self.close_curve)
+        edit_menu.add_separator()
         edit_menu.add_checkbutton(label="Режим Редактирования", variable=self.is_editing, command=self.toggle_edit_mode)
+        edit_menu.add_command(label="Точность кривых...", command=self.ask_flatness_tolerance)
 
     def _create_toolbar(self):
         toolbar = tk.Frame(self, bd=1, relief=tk.RAISED)
@@ -72,10 +69,14 @@ class CurveEditor(tk.Tk):
         bezier_btn = tk.Radiobutton(toolbar, text="Безье", variable=self.current_curve_type, value=BEZIER, indicatoron=0, command=self.on_curve_type_change, width=10)
         bspline_btn = tk.Radiobutton(toolbar, text="B-Сплайн", variable=self.current_curve_type, value=BSPLINE, indicatoron=0, command=self.on_curve_type_change, width=10)
         edit_btn = tk.Checkbutton(toolbar, text="Редакт.", variable=self.is_editing, indicatoron=0, command=self.toggle_edit_mode, width=10)
+        finish_btn = tk.Button(toolbar, text="Завершить", command=self.finish_curve, width=10)
+        close_btn = tk.Button(toolbar, text="Замкнуть", command=self.close_curve, width=10)
         clear_btn = tk.Button(toolbar, text="Очистить", command=self.clear_canvas, width=10)
         hermite_btn.pack(side=tk.LEFT, padx=2, pady=2)
         bezier_btn.pack(side=tk.LEFT, padx=2, pady=2)
         bspline_btn.pack(side=tk.LEFT, padx=2, pady=2)
+        finish_btn.pack(side=tk.LEFT, padx=2, pady=2)
+        close_btn.pack(side=tk.LEFT, padx=2, pady=2)
         edit_btn.pack(side=tk.LEFT, padx=5, pady=2)
         clear_btn.pack(side=tk.LEFT, padx=5, pady=2)
         toolbar.pack(side=tk.TOP, fill=tk.X)
@@ -88,46 +89,123 @@ class CurveEditor(tk.Tk):
         mode_text = "Редактирование" if self.is_editing.get() else "Рисование"
         curve_type = self.current_curve_type.get()
         points_needed = self.get_points_needed(curve_type)
-        points_have = len(self.control_points)
         status = f"Режим: {mode_text} | Тип: {curve_type} | "
         if self.is_editing.get():
             status += "Кликните рядом с контрольной точкой для выбора и перетаскивания."
+        elif self.active_curve is None:
+            status += f"Кликните для добавления точек (новая кривая от {points_needed} точек)."
         else:
-            status += f"Кликните для добавления точек ({points_have}/{points_needed} для текущего сегмента)."
+            curve = self.drawn_curves[self.active_curve]['curve']
+            status += (f"Кликните для добавления точек (точек: {len(curve)}, сегментов: {curve.segment_count()}); "
+                       f"Enter — завершить кривую.")
+        vertex_count = sum(curve.get('vertex_count', 0) for curve in self.drawn_curves)
+        status += f" | Точек ломаных: {vertex_count} (точность {self.flatness_tolerance:g} пикс.)"
         self.status_bar.config(text=status)
 
+    def ask_flatness_tolerance(self):
+        tolerance = simpledialog.askfloat("Точность кривых", "Допустимое отклонение ломаной от кривой, пикселей:",
+                                          initialvalue=self.flatness_tolerance, minvalue=0.01, maxvalue=50.0)
+        if tolerance is not None:
+            self.flatness_tolerance = tolerance
+            self.redraw_canvas()
+            self.update_status_bar()
+
     def get_points_needed(self, curve_type):
-        return 4
+        return POINTS_PER_SEGMENT
 
     def on_curve_type_change(self):
-        if len(self.control_points) > 0 and not self.is_editing.get():
-            self.clear_current_points()
-            messagebox.showinfo("Тип кривой изменен", "Текущие точки для рисования очищены.")
+        # Новый тип действует со следующей кривой: начатая кривая завершается
+        if self.active_curve is not None and not self.is_editing.get():
+            self.finish_curve()
         self.update_status_bar()
 
     def toggle_edit_mode(self):
-        if len(self.control_points) > 0:
-            self.clear_current_points()
+        if self.active_curve is not None:
+            self.finish_curve()
         self.selected_point_info = None
+        self.selected_curve = None
         self.update_status_bar()
         self.redraw_canvas()
 
     def clear_canvas(self):
         if messagebox.askyesno("Подтверждение", "Очистить все рисунки и точки?"):
+            self.cancel_drag()
             self.canvas.delete("all")
-            self.control_points = []
+            self.canvas_items.clear()
+            self.point_owners = {}
+            self.point_grid.clear()
             self.drawn_curves = []
+            self.active_curve = None
             self.selected_point_info = None
+            self.selected_curve = None
             self.update_status_bar()
 
-    def clear_current_points(self):
-        for point_info in self.control_points:
-            if 'id' in point_info and point_info['id'] is not None:
-                try:
-                    self.canvas.delete(point_info['id'])
-                except tk.TclError:
-                    pass
-        self.control_points = []
+    def open_scene_file(self):
+        path = filedialog.askopenfilename(filetypes=[("Сцена кривых", f"*{SCENE_EXTENSION}"), ("Все файлы", "*")])
+        if not path:
+            return
+        try:
+            # Точки отображаются из файла; ломаные строятся при отрисовке только для сегментов в кадре
+            curves = load_scene(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Открытие сцены", f"Не удалось открыть {path}:\n{e}")
+            return
+        self.cancel_drag()
+        self.drawn_curves = [{'id': None, 'curve': curve, 'point_ids': [], 'vertex_count': 0} for curve in curves]
+        self.active_curve = None
+        self.selected_point_info = None
+        self.selected_curve = None
+        self.redraw_canvas()
+        self.update_status_bar()
+
+    def save_scene_file(self):
+        if self.active_curve is not None:
+            self.finish_curve()
+        path = filedialog.asksaveasfilename(defaultextension=SCENE_EXTENSION,
+                                            filetypes=[("Сцена кривых", f"*{SCENE_EXTENSION}")])
+        if not path:
+            return
+        try:
+            save_scene(path, [curve_data['curve'] for curve_data in self.drawn_curves])
+        except OSError as e:
+            messagebox.showerror("Сохранение сцены", f"Не удалось сохранить {path}:\n{e}")
+
+    def finish_curve(self):
+        """Завершает рисуемую кривую; кривая без единого сегмента удаляется."""
+        if self.active_curve is None:
+            return
+        curve_index = self.active_curve
+        self.active_curve = None
+        curve_data = self.drawn_curves[curve_index]
+        if curve_data['curve'].segment_count() == 0:
+            for point_id in curve_data['point_ids']:
+                self.delete_item(point_id)
+                self.point_owners.pop(point_id, None)
+            if self.item_exists(curve_data['id']):
+                self.delete_item(curve_data['id'])
+            # Рисуемая кривая всегда последняя, индексы остальных не меняются
+            self.drawn_curves.pop(curve_index)
+        self.update_status_bar()
+
+    def close_curve(self):
+        """Замыкает рисуемую кривую (или выбранную кривую) и завершает её."""
+        if self.active_curve is not None:
+            curve_index = self.active_curve
+        elif self.selected_point_info:
+            curve_index = self.selected_point_info['curve_index']
+        elif self.selected_curve is not None:
+            curve_index = self.selected_curve
+        else:
+            return
+        curve = self.drawn_curves[curve_index]['curve']
+        try:
+            curve.set_closed(True)
+        except ValueError as error:
+            messagebox.showwarning("Замыкание кривой", str(error))
+            return
+        self.redraw_curves([curve_index])
+        if curve_index == self.active_curve:
+            self.finish_curve()
         self.update_status_bar()
 
     def on_canvas_click(self, event):
@@ -135,233 +213,273 @@ class CurveEditor(tk.Tk):
         if self.is_editing.get():
             if self.selected_point_info:
                 prev_point_id = self.selected_point_info['canvas_id']
-                if self.canvas.winfo_exists() and prev_point_id in self.canvas.find_all():
+                if self.item_exists(prev_point_id):
                     try:
                         self.canvas.itemconfig(prev_point_id, fill="green", outline="black")
                     except tk.TclError:
                         pass
             self.selected_point_info = self.find_nearby_control_point(x, y)
+            # Щелчок мимо контрольных точек выбирает ближайшую кривую
+            self.select_curve(None if self.selected_point_info else self.find_nearby_curve(x, y))
             if self.selected_point_info:
                 self.drag_start_pos = (x, y)
                 point_id = self.selected_point_info['canvas_id']
-                if self.canvas.winfo_exists() and point_id in self.canvas.find_all():
+                if self.item_exists(point_id):
                     try:
                         self.canvas.itemconfig(point_id, fill="red", outline="red")
                     except tk.TclError:
                         pass
         else:
-            points_needed = self.get_points_needed(self.current_curve_type.get())
-            point_id = self.draw_control_point(x, y, "blue")
-            self.control_points.append({'x': x, 'y': y, 'id': point_id})
-            if len(self.control_points) == points_needed:
-                self.finalize_curve_segment()
+            self.add_control_point(x, y)
             self.update_status_bar()
 
     def on_canvas_drag(self, event):
+        # События движения только запоминают положение: пересчёт один раз, когда очередь событий опустеет
         if self.is_editing.get() and self.selected_point_info and self.drag_start_pos:
-            dx = event.x - self.drag_start_pos[0]
-            dy = event.y - self.drag_start_pos[1]
-            curve_idx = self.selected_point_info['curve_index']
-            point_idx = self.selected_point_info['point_index']
-            point_id = self.selected_point_info['canvas_id']
-            if self.canvas.winfo_exists() and point_id in self.canvas.find_all():
-                self.canvas.move(point_id, dx, dy)
-            else:
-                self.selected_point_info = None
-                self.drag_start_pos = None
-                return
-            new_x, new_y = self.drawn_curves[curve_idx]['points'][point_idx][0] + dx, self.drawn_curves[curve_idx]['points'][point_idx][1] + dy
-            self.drawn_curves[curve_idx]['points'][point_idx] = (new_x, new_y)
-            self.drag_start_pos = (event.x, event.y)
-            self.redraw_specific_curve(curve_idx)
+            self.drag_target = (event.x, event.y)
+            if self.drag_job is None:
+                self.drag_job = self.after_idle(self.apply_drag)
+
+    def apply_drag(self):
+        """Сдвигает выбранную точку к последнему положению мыши и пересчитывает сегменты, где она есть."""
+        self.drag_job = None
+        if not (self.selected_point_info and self.drag_start_pos and self.drag_target):
+            return
+        dx = self.drag_target[0] - self.drag_start_pos[0]
+        dy = self.drag_target[1] - self.drag_start_pos[1]
+        self.drag_start_pos = self.drag_target
+        self.drag_target = None
+        point_id = self.selected_point_info['canvas_id']
+        if not self.item_exists(point_id):
+            self.selected_point_info = None
+            self.drag_start_pos = None
+            return
+        self.canvas.move(point_id, dx, dy)
+        curve_idx = self.selected_point_info['curve_index']
+        point_idx = self.selected_point_info['point_index']
+        curve = self.drawn_curves[curve_idx]['curve']
+        old_x, old_y = curve.points[point_idx]
+        # Пересчитываются только сегменты кривой, в которых участвует точка
+        curve.move_point(point_idx, old_x + dx, old_y + dy)
+        self.point_grid.insert(point_id, old_x + dx, old_y + dy)
+        self.redraw_curves([curve_idx])
+
+    def cancel_drag(self):
+        if self.drag_job is not None:
+            self.after_cancel(self.drag_job)
+            self.drag_job = None
+        self.drag_target = None
 
     def on_canvas_release(self, event):
+        if self.drag_job is not None:
+            # Незаконченный пересчёт выполняется сразу, чтобы отпущенная точка встала на место
+            self.after_cancel(self.drag_job)
+            self.apply_drag()
         if self.is_editing.get() and self.selected_point_info:
             point_id = self.selected_point_info['canvas_id']
-            if self.canvas.winfo_exists() and point_id in self.canvas.find_all():
+            if self.item_exists(point_id):
                 try:
                     self.canvas.itemconfig(point_id, fill="green", outline="black")
                 except tk.TclError:
                     pass
+            self.update_status_bar()
         self.drag_start_pos = None
 
-    def find_nearby_control_point(self, x, y, tolerance=10):
-        for curve_index in range(len(self.drawn_curves) - 1, -1, -1):
-            curve = self.drawn_curves[curve_index]
-            for point_index in range(len(curve['points']) - 1, -1, -1):
-                px, py = curve['points'][point_index]
-                point_id = curve['point_ids'][point_index]
-                dist_sq = (x - px)**2 + (y - py)**2
-                if dist_sq < tolerance**2:
-                    if self.canvas.winfo_exists() and point_id in self.canvas.find_all():
-                        return {
-                            'curve_index': curve_index,
-                            'point_index': point_index,
-                            'canvas_id': point_id
-                        }
-        return None
-
-    def redraw_specific_curve(self, curve_index):
+    def find_nearby_control_point(self, x, y, tolerance=PICK_TOLERANCE):
+        # Ближайшая точка ищется в соседних ячейках сетки, а не перебором всех кривых
+        point_id = self.point_grid.nearest(x, y, tolerance)
+        if not self.item_exists(point_id):
+            return None
+        curve_index, point_index = self.point_owners[point_id]
+        return {
+            'curve_index': curve_index,
+            'point_index': point_index,
+            'canvas_id': point_id
+        }
+
+    def find_nearby_curve(self, x, y, tolerance=PICK_TOLERANCE):
+        # Кривые, чей прямоугольник далеко от щелчка, отбрасываются без расчёта расстояния
+        return pick_curve([curve_data['curve'] for curve_data in self.drawn_curves], x, y, tolerance)
+
+    def select_curve(self, curve_index):
+        """Подсвечивает выбранную кривую и снимает подсветку с прежней."""
+        for index, color in ((self.selected_curve, "black"), (curve_index, "red")):
+            if index is not None and index < len(self.drawn_curves):
+                curve_id = self.drawn_curves[index]['id']
+                if self.item_exists(curve_id):
+                    self.canvas.itemconfig(curve_id, fill=color)
+        self.selected_curve = curve_index
+
+    def redraw_curves(self, curve_indices):
+        """Обновляет ломаные указанных кривых; пересчитываются только изменённые сегменты."""
+        curve_indices = [i for i in curve_indices if 0 <= i < len(self.drawn_curves)]
+        try:
+            polylines = self.calculate_scene_points([self.drawn_curves[i] for i in curve_indices])
+        except Exception as e:
+            polylines = [None] * len(curve_indices)
+        for curve_index, plot_points in zip(curve_indices, polylines):
+            self.redraw_specific_curve(curve_index, plot_points)
+
+    def redraw_specific_curve(self, curve_index, curve_plot_points=None):
         if curve_index < 0 or curve_index >= len(self.drawn_curves):
             return
         curve_data = self.drawn_curves[curve_index]
-        control_points_coords = curve_data['points']
-        curve_type = curve_data['type']
         curve_id = curve_data.get('id')
         point_ids = curve_data.get('point_ids', [])
-        if len(control_points_coords) < self.get_points_needed(curve_type):
-            if curve_id and self.canvas.winfo_exists() and curve_id in self.canvas.find_all():
-                self.canvas.delete(curve_id)
-                curve_data['id'] = None
-            return
-        try:
-            curve_plot_points = self.calculate_curve_points(control_points_coords, curve_type)
-        except Exception as e:
-            if curve_id and self.canvas.winfo_exists() and curve_id in self.canvas.find_all():
-                self.canvas.delete(curve_id)
-                curve_data['id'] = None
-            return
-        if curve_plot_points and len(curve_plot_points) > 1:
-            if curve_id and self.canvas.winfo_exists() and curve_id in self.canvas.find_all():
-                flat_points = [coord for point in curve_plot_points for coord in point]
+        if curve_plot_points is None:
+            try:
+                curve_plot_points = self.calculate_curve_points(curve_data['curve'])
+            except Exception as e:
+                if self.item_exists(curve_id):
+                    self.delete_item(curve_id)
+                    curve_data['id'] = None
+                return
+        curve_data['vertex_count'] = len(curve_plot_points)
+        if len(curve_plot_points) > 1:
+            flat_points = curve_plot_points.ravel().tolist()
+            if self.item_exists(curve_id):
                 try:
                     self.canvas.coords(curve_id, *flat_points)
                 except tk.TclError:
-                    curve_data['id'] = None
-                    new_id = self.canvas.create_line(curve_plot_points, fill="black", width=2, tags=("curve", f"curve_{curve_index}"))
-                    curve_data['id'] = new_id
+                    self.canvas_items.discard(curve_id)
+                    curve_data['id'] = self.create_curve_line(flat_points, curve_index)
             else:
-                new_id = self.canvas.create_line(curve_plot_points, fill="black", width=2, tags=("curve", f"curve_{curve_index}"))
-                curve_data['id'] = new_id
-            for point_id in point_ids:
-                if point_id and self.canvas.winfo_exists() and point_id in self.canvas.find_all():
-                    self.canvas.tag_raise(point_id)
-        elif curve_id and self.canvas.winfo_exists() and curve_id in self.canvas.find_all():
-            self.canvas.delete(curve_id)
+                curve_data['id'] = self.create_curve_line(flat_points, curve_index)
+                for point_id in point_ids:
+                    if self.item_exists(point_id):
+                        self.canvas.tag_raise(point_id)
+        elif self.item_exists(curve_id):
+            self.delete_item(curve_id)
             curve_data['id'] = None
 
     def redraw_canvas(self):
-        self.canvas.delete("curve")
-        self.canvas.delete("control_point")
-        point_color = "green" if self.is_editing.get() else "blue"
-        point_outline = "black"
-        for curve_index, curve in enumerate(self.drawn_curves):
-            new_point_ids = []
-            points_coords = curve.get('points', [])
-            if len(points_coords) < self.get_points_needed(curve.get('type', BEZIER)):
-                curve['point_ids'] = []
-                curve['id'] = None
-                continue
-            for i, (px, py) in enumerate(points_coords):
-                current_point_color = point_color
-                current_point_outline = point_outline
-                if self.is_editing.get() and self.selected_point_info and \
-                   self.selected_point_info['curve_index'] == curve_index and \
-                   self.selected_point_info['point_index'] == i:
-                    current_point_color = "red"
-                    current_point_outline = "red"
-                pid = self.draw_control_point(px, py, current_point_color, current_point_outline, tags=("control_point", f"curve_{curve_index}", f"point_{curve_index}_{i}"))
-                new_point_ids.append(pid)
-            curve['point_ids'] = new_point_ids
-            try:
-                plot_points = self.calculate_curve_points(curve['points'], curve['type'])
-                if plot_points and len(plot_points) > 1:
-                    curve_id = self.canvas.create_line(plot_points, fill="black", width=2, tags=("curve", f"curve_{curve_index}"))
-                    curve['id'] = curve_id
-                else:
-                    curve['id'] = None
-            except Exception as e:
-                curve['id'] = None
+        self.cancel_drag()
+        # Удаляются все отслеживаемые элементы, в том числе точки без тегов, созданные при рисовании
+        self.canvas.delete(*self.canvas_items)
+        self.canvas_items.clear()
+        self.point_owners = {}
+        self.point_grid.clear()
+        # Ломаные всех кривых: изменённые сегменты сцены считаются одним пакетом
+        try:
+            polylines = self.calculate_scene_points(self.drawn_curves)
+        except Exception as e:
+            polylines = [None] * len(self.drawn_curves)
+        for curve_index, (curve_data, plot_points) in enumerate(zip(self.drawn_curves, polylines)):
+            curve_data['point_ids'] = []
+            self.draw_curve_points(curve_index)
+            curve_data['id'] = None
+            if plot_points is not None:
+                curve_data['vertex_count'] = len(plot_points)
+                if len(plot_points) > 1:
+                    curve_data['id'] = self.create_curve_line(plot_points.ravel().tolist(), curve_index)
+                    self.canvas.tag_lower(curve_data['id'])
+        if self.selected_point_info:
+            curve_data = self.drawn_curves[self.selected_point_info['curve_index']]
+            self.selected_point_info['canvas_id'] = curve_data['point_ids'][self.selected_point_info['point_index']]
 
-        if not self.is_editing.get():
-            for i, p in enumerate(self.control_points):
-                new_id = self.draw_control_point(p['x'], p['y'], "blue", "black", tags="control_point")
-                self.control_points[i]['id'] = new_id
+    def points_in_view(self, curve_index):
+        """Нужны ли контрольные точки кривой: она в кадре, рисуется или выбрана."""
+        if curve_index in (self.active_curve, self.selected_curve) or (
+                self.selected_point_info and self.selected_point_info['curve_index'] == curve_index):
+            return True
+        viewport = self.viewport()
+        hull = self.drawn_curves[curve_index]['curve'].hull_bbox()
+        if viewport is None or hull is None:
+            return True
+        return hull[0] <= viewport[2] and hull[2] >= viewport[0] and hull[1] <= viewport[3] and hull[3] >= viewport[1]
+
+    def draw_curve_points(self, curve_index):
+        """Создаёт контрольные точки кривой, если их ещё нет и кривая в кадре.
+
+        Точки кривых вне кадра не создаются: у сцены из файла их могут быть
+        миллионы, а элемент канвы на каждую делает первый кадр секундным.
+        """
+        curve_data = self.drawn_curves[curve_index]
+        if curve_data['point_ids'] or not self.points_in_view(curve_index):
+            return
+        point_color = "green" if self.is_editing.get() else "blue"
+        for i, (px, py) in enumerate(curve_data['curve'].points):
+            current_point_color = point_color
+            current_point_outline = "black"
+            if self.is_editing.get() and self.selected_point_info and \
+               self.selected_point_info['curve_index'] == curve_index and \
+               self.selected_point_info['point_index'] == i:
+                current_point_color = "red"
+                current_point_outline = "red"
+            pid = self.draw_control_point(px, py, current_point_color, current_point_outline, tags=("control_point", f"curve_{curve_index}", f"point_{curve_index}_{i}"))
+            curve_data['point_ids'].append(pid)
+            self.point_owners[pid] = (curve_index, i)
+            self.point_grid.insert(pid, px, py)
 
     def on_canvas_resize(self, event):
-        pass
+        # Сегменты, оказавшиеся в кадре, уточняются один раз после серии событий изменения размера
+        if self.resize_job is None:
+            self.resize_job = self.after_idle(self.apply_resize)
+
+    def apply_resize(self):
+        self.resize_job = None
+        self.redraw_curves(range(len(self.drawn_curves)))
+        for curve_index in range(len(self.drawn_curves)):
+            self.draw_curve_points(curve_index)
+
+    def viewport(self):
+        """Видимая область канвы с запасом на толщину линии; None, пока канва не показана."""
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if width <= 1 or height <= 1:
+            return None
+        return (-CURVE_WIDTH, -CURVE_WIDTH, width + CURVE_WIDTH, height + CURVE_WIDTH)
 
     def draw_control_point(self, x, y, color="blue", outline="black", radius=3, tags=()):
         x1, y1 = x - radius, y - radius
         x2, y2 = x + radius, y + radius
         point_id = self.canvas.create_oval(x1, y1, x2, y2, fill=color, outline=outline, tags=tags)
+        self.canvas_items.add(point_id)
         return point_id
 
-    def finalize_curve_segment(self):
-        if not self.control_points:
-            return
-        curve_type = self.current_curve_type.get()
-        points_needed = self.get_points_needed(curve_type)
-        if len(self.control_points) < points_needed:
-            return
-        current_segment_points_data = list(self.control_points)
-        current_segment_points_coords = [(p['x'], p['y']) for p in current_segment_points_data]
+    def create_curve_line(self, flat_points, curve_index):
+        color = "red" if curve_index == self.selected_curve else "black"
+        line_id = self.canvas.create_line(flat_points, fill=color, width=CURVE_WIDTH, tags=("curve", f"curve_{curve_index}"))
+        self.canvas_items.add(line_id)
+        return line_id
+
+    def item_exists(self, item_id):
+        return item_id is not None and item_id in self.canvas_items
+
+    def delete_item(self, item_id):
+        self.canvas_items.discard(item_id)
+        self.point_grid.remove(item_id)
         try:
-            plot_points = self.calculate_curve_points(current_segment_points_coords, curve_type)
-        except Exception as e:
-            messagebox.showerror("Ошибка вычисления", f"Не удалось рассчитать точки кривой: {e}")
-            self.clear_current_points()
-            return
-        if plot_points and len(plot_points) > 1:
-            curve_id = self.canvas.create_line(plot_points, fill="black", width=2, tags="curve")
-            point_ids = [p['id'] for p in current_segment_points_data]
+            self.canvas.delete(item_id)
+        except tk.TclError:
+            pass
+
+    def add_control_point(self, x, y):
+        """Добавляет точку в рисуемую кривую (начиная новую при необходимости) и обновляет её ломаную."""
+        if self.active_curve is None:
             self.drawn_curves.append({
-                'id': curve_id,
-                'points': current_segment_points_coords,
-                'type': curve_type,
-                'point_ids': point_ids
+                'id': None,
+                'curve': SplineCurve(self.current_curve_type.get()),
+                'point_ids': [],
+                'vertex_count': 0
             })
-            if curve_type == BSPLINE:
-                if len(current_segment_points_data) > 0 and current_segment_points_data[0]['id'] is not None:
-                    try:
-                        self.canvas.delete(current_segment_points_data[0]['id'])
-                    except tk.TclError:
-                        pass
-                self.control_points = current_segment_points_data[1:]
-                for i in range(len(self.control_points)):
-                    self.control_points[i]['id'] = point_ids[i + 1]
-            elif curve_type == BEZIER or curve_type == HERMITE:
-                self.control_points = []
-            self.update_status_bar()
-        else:
-            messagebox.showwarning("Предупреждение", "Сегмент кривой не содержит точек для рисования.")
-            self.clear_current_points()
+            self.active_curve = len(self.drawn_curves) - 1
+        curve_index = self.active_curve
+        curve_data = self.drawn_curves[curve_index]
+        point_index = len(curve_data['curve'])
+        point_id = self.draw_control_point(x, y, "blue", tags=("control_point", f"curve_{curve_index}", f"point_{curve_index}_{point_index}"))
+        curve_data['curve'].append(x, y)
+        curve_data['point_ids'].append(point_id)
+        self.point_owners[point_id] = (curve_index, point_index)
+        self.point_grid.insert(point_id, x, y)
+        self.redraw_curves([curve_index])
 
+    def calculate_curve_points(self, curve):
+        return curve.polyline(self.flatness_tolerance, self.viewport())
 
-    def calculate_curve_points(self, control_points_coords, curve_type, num_steps=50):
-        n_points = len(control_points_coords)
-        points_needed = self.get_points_needed(curve_type)
-        if n_points < points_needed:
-            return []
-        G_raw = np.array(control_points_coords[:points_needed])
-        matrix = None
-        G = G_raw
-        if curve_type == HERMITE:
-            matrix = HERMITE_MATRIX
-            P0 = G_raw[0]
-            P1 = G_raw[1]
-            P2 = G_raw[2]
-            P3 = G_raw[3]
-            tangent_scale = 1.0
-            T0 = tangent_scale * (P1 - P0)
-            T1 = tangent_scale * (P3 - P2)
-            G_hermite = np.array([P0, P3, T0, T1])
-            G = G_hermite
-        elif curve_type == BEZIER:
-            matrix = BEZIER_MATRIX
-        elif curve_type == BSPLINE:
-            matrix = BSPLINE_MATRIX
-        else:
-            raise ValueError(f"Неизвестный тип кривой: {curve_type}")
-        if G.shape != (4, 2):
-            raise ValueError(f"Вектор геометрии G имеет неожиданную форму: {G.shape}. Ожидалась (4, 2).")
-        plot_points = []
-        for i in range(num_steps + 1):
-            t = i / num_steps
-            T = np.array([t**3, t**2, t, 1])
-            calculated_point = T @ matrix @ G
-            plot_points.append(tuple(calculated_point))
-        return plot_points
+    def calculate_scene_points(self, curves):
+        # Сегменты вне кадра не делятся: вместо ломаной хранится хорда
+        return tessellate_curves([curve_data['curve'] for curve_data in curves], self.flatness_tolerance,
+                                 self.viewport())
 
 if __name__ == "__main__":
     app = CurveEditor()
@@ -0,0 +1,110 @@
+"""Двоичный файл сцены редактора кривых: сохранение и загрузка через np.memmap без Tk.
+
+Формат (все числа little-endian):
+    заголовок  SCENE_HEADER: сигнатура, версия, число кривых и точек;
+    таблица    SCENE_CURVE × число кривых: код типа, признак замкнутости, число точек
+               и прямоугольник кривой вместе с контрольными точками (NaN, если точек нет);
+    точки      float32 (x, y) всех кривых подряд, в порядке таблицы.
+Все сегменты кривой одного типа, поэтому код типа хранится один раз на кривую.
+По прямоугольнику из таблицы первый кадр отбрасывает кривые вне экрана,
+не читая их точек.
+"""
+import os
+
+import numpy as np
+
+from curves import HERMITE, BEZIER, BSPLINE, SplineCurve
+
+SCENE_MAGIC = b"GIISCRV3"
+SCENE_VERSION = 2
+SCENE_EXTENSION = ".crv"
+
+SCENE_HEADER = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('reserved', '<u4'),
+    ('curve_count', '<u8'),
+    ('point_count', '<u8'),
+])
+SCENE_CURVE = np.dtype([
+    ('type', 'u1'),
+    ('closed', 'u1'),
+    ('reserved', '<u2'),
+    ('point_count', '<u4'),
+    ('hull', '<f8', (4,)),
+])
+SCENE_POINT = np.dtype('<f4')
+
+TYPE_CODES = {
+    HERMITE: 1,
+    BEZIER: 2,
+    BSPLINE: 3,
+}
+CODE_TYPES = {code: curve_type for curve_type, code in TYPE_CODES.items()}
+
+
+def save_scene(path, curves):
+    """Записывает кривые SplineCurve в файл path.
+
+    Файл пишется рядом под временным именем и подменяет прежний целиком:
+    сцена, загруженная из того же файла, продолжает читать старые данные.
+    При ошибке записи временный файл удаляется, а исключение передаётся дальше.
+    """
+    table = np.zeros(len(curves), dtype=SCENE_CURVE)
+    for index, curve in enumerate(curves):
+        hull = curve.hull_bbox()
+        table[index] = (TYPE_CODES[curve.curve_type], curve.closed, 0, len(curve),
+                        hull if hull is not None else (np.nan,) * 4)
+    header = np.zeros(1, dtype=SCENE_HEADER)
+    header[0] = (SCENE_MAGIC, SCENE_VERSION, 0, len(curves), int(table['point_count'].sum()))
+    temporary = f"{path}.tmp"
+    try:
+        with open(temporary, "wb") as file:
+            file.write(header.tobytes())
+            file.write(table.tobytes())
+            for curve in curves:
+                if len(curve):
+                    file.write(np.asarray(curve.points, dtype=SCENE_POINT).reshape(-1, 2).tobytes())
+        os.replace(temporary, path)
+    except Exception:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+def load_scene(path):
+    """Читает кривые из файла path; точки не копируются, а отображаются в память.
+
+    Кривые получают срезы отображения в режиме копирования при записи:
+    страницы файла читаются при первом обращении (первой отрисовке), а
+    перенос точки меняет только копию в памяти. Ломаные строятся лениво,
+    а прямоугольник hull берётся из таблицы кривых.
+    """
+    data = np.memmap(path, dtype=np.uint8, mode='c')
+    if len(data) < SCENE_HEADER.itemsize:
+        raise ValueError("Файл слишком короткий для сцены")
+    header = data[:SCENE_HEADER.itemsize].view(SCENE_HEADER)[0]
+    if header['magic'] != SCENE_MAGIC:
+        raise ValueError("Файл не является сценой редактора кривых")
+    if header['version'] != SCENE_VERSION:
+        raise ValueError(f"Неподдерживаемая версия сцены: {header['version']}")
+    curve_count = int(header['curve_count'])
+    point_count = int(header['point_count'])
+    points_start = SCENE_HEADER.itemsize + curve_count * SCENE_CURVE.itemsize
+    if len(data) != points_start + point_count * 2 * SCENE_POINT.itemsize:
+        raise ValueError("Размер файла не совпадает с заголовком сцены")
+    table = data[SCENE_HEADER.itemsize:points_start].view(SCENE_CURVE)
+    points = data[points_start:].view(SCENE_POINT).reshape(-1, 2)
+    offsets = np.zeros(curve_count + 1, dtype=np.int64)
+    np.cumsum(table['point_count'], out=offsets[1:])
+    if offsets[-1] != point_count:
+        raise ValueError("Число точек в таблице кривых не совпадает с заголовком")
+    hulls = [tuple(hull) if known else None
+             for hull, known in zip(table['hull'].tolist(), (~np.isnan(table['hull']).any(axis=1)).tolist())]
+    curves = []
+    for code, closed, start, stop, hull in zip(table['type'].tolist(), table['closed'].tolist(),
+                                               offsets[:-1].tolist(), offsets[1:].tolist(), hulls):
+        if code not in CODE_TYPES:
+            raise ValueError(f"Неизвестный код типа кривой: {code}")
+        curves.append(SplineCurve(CODE_TYPES[code], points[start:stop], closed=bool(closed), hull=hull))
+    return curves
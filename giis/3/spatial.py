@@ -0,0 +1,75 @@
+"""Пространственный хеш контрольных точек для выбора мышью без Tk."""
+import math
+
+
+class PointGrid:
+    """Равномерная сетка: ячейка cell_size x cell_size -> множество ключей точек.
+
+    Ключ — любой хешируемый идентификатор (в редакторе — id овала канвы).
+    Вставка, перенос и удаление стоят O(1); поиск ближайшей точки в радиусе
+    просматривает только ячейки, которые задевает круг поиска.
+    """
+
+    def __init__(self, cell_size=10):
+        if cell_size <= 0:
+            raise ValueError("Размер ячейки должен быть положительным")
+        self.cell_size = cell_size
+        self.cells = {}
+        self.positions = {}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def cell(self, x, y):
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def insert(self, key, x, y):
+        """Добавляет точку; если ключ уже есть, переносит её."""
+        if key in self.positions:
+            self.move(key, x, y)
+            return
+        self.positions[key] = (x, y)
+        self.cells.setdefault(self.cell(x, y), set()).add(key)
+
+    def move(self, key, x, y):
+        old_cell = self.cell(*self.positions[key])
+        new_cell = self.cell(x, y)
+        self.positions[key] = (x, y)
+        if old_cell != new_cell:
+            self.discard_from_cell(old_cell, key)
+            self.cells.setdefault(new_cell, set()).add(key)
+
+    def remove(self, key):
+        """Удаляет точку, если она есть."""
+        position = self.positions.pop(key, None)
+        if position is not None:
+            self.discard_from_cell(self.cell(*position), key)
+
+    def discard_from_cell(self, cell, key):
+        keys = self.cells[cell]
+        keys.discard(key)
+        if not keys:
+            del self.cells[cell]
+
+    def clear(self):
+        self.cells.clear()
+        self.positions.clear()
+
+    def nearest(self, x, y, radius):
+        """Ключ ближайшей точки не дальше radius (строго ближе) или None."""
+        reach = max(1, math.ceil(radius / self.cell_size))
+        cx, cy = self.cell(x, y)
+        best_key = None
+        best_distance = radius * radius
+        for i in range(cx - reach, cx + reach + 1):
+            for j in range(cy - reach, cy + reach + 1):
+                for key in self.cells.get((i, j), ()):
+                    px, py = self.positions[key]
+                    distance = (x - px) ** 2 + (y - py) ** 2
+                    if distance < best_distance:
+                        best_key = key
+                        best_distance = distance
+        return best_key
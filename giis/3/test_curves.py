@@ -0,0 +1,249 @@
+import unittest
+
+import numpy as np
+
+from curves import (HERMITE, BEZIER, BSPLINE, HERMITE_MATRIX, BEZIER_MATRIX, BSPLINE_MATRIX,
+                    power_basis, curve_points, batch_curve_points, flatten_curve, batch_flatten,
+                    segment_windows, SplineCurve, tessellate_curves, power_coefficients, segment_bboxes,
+                    pick_curve)
+
+SEGMENT = [(10, 20), (60, 200), (250, 30), (300, 180)]
+
+
+def reference_points(control_points_coords, curve_type, num_steps):
+    """Прежний расчёт: T @ M @ G отдельно для каждого t."""
+    G = np.array(control_points_coords, dtype=float)
+    if curve_type == HERMITE:
+        G = np.array([G[0], G[3], G[1] - G[0], G[3] - G[2]])
+    matrix = {HERMITE: HERMITE_MATRIX, BEZIER: BEZIER_MATRIX, BSPLINE: BSPLINE_MATRIX}[curve_type]
+    points = []
+    for i in range(num_steps + 1):
+        t = i / num_steps
+        points.append(np.array([t ** 3, t ** 2, t, 1]) @ matrix @ G)
+    return np.array(points)
+
+
+class TestCurvePoints(unittest.TestCase):
+    def test_matches_per_step_evaluation(self):
+        for curve_type in (HERMITE, BEZIER, BSPLINE):
+            for num_steps in (1, 7, 50, 200):
+                points = curve_points(SEGMENT, curve_type, num_steps)
+                np.testing.assert_allclose(points, reference_points(SEGMENT, curve_type, num_steps),
+                                           atol=1e-9, err_msg=curve_type)
+
+    def test_contiguous_float_array(self):
+        points = curve_points(SEGMENT, BEZIER, 50)
+        self.assertEqual(points.shape, (51, 2))
+        self.assertEqual(points.dtype, np.float64)
+        self.assertTrue(points.flags.c_contiguous)
+
+    def test_endpoints(self):
+        for curve_type in (HERMITE, BEZIER):
+            points = curve_points(SEGMENT, curve_type)
+            np.testing.assert_allclose(points[[0, -1]], [SEGMENT[0], SEGMENT[3]], atol=1e-9)
+
+    def test_basis_cached_and_read_only(self):
+        self.assertIs(power_basis(50), power_basis(50))
+        self.assertFalse(power_basis(50).flags.writeable)
+        np.testing.assert_allclose(power_basis(2)[1], [0.125, 0.25, 0.5, 1])
+
+    def test_too_few_points_and_unknown_type(self):
+        self.assertEqual(curve_points(SEGMENT[:3], BEZIER).shape, (0, 2))
+        with self.assertRaises(ValueError):
+            curve_points(SEGMENT, "Катмулл-Ром")
+
+
+class TestBatchCurvePoints(unittest.TestCase):
+    def test_matches_per_segment(self):
+        rng = np.random.default_rng(1)
+        segments = rng.uniform(0, 800, (30, 4, 2))
+        types = [(HERMITE, BEZIER, BSPLINE)[i % 3] for i in rng.integers(0, 3, 30)]
+        points, offsets = batch_curve_points(segments.tolist(), types, 20)
+        self.assertEqual(offsets.tolist(), list(range(0, 31 * 21, 21)))
+        for k in range(30):
+            np.testing.assert_allclose(points[offsets[k]:offsets[k + 1]], curve_points(segments[k], types[k], 20),
+                                       atol=1e-9)
+
+    def test_empty_scene(self):
+        points, offsets = batch_curve_points([], [])
+        self.assertEqual(points.shape, (0, 2))
+        self.assertEqual(offsets.tolist(), [0])
+
+    def test_unknown_type(self):
+        with self.assertRaises(ValueError):
+            batch_curve_points([SEGMENT], ["Катмулл-Ром"])
+
+
+def polyline_distance(points, polyline):
+    """Наибольшее расстояние от точек до ломаной."""
+    a = polyline[:-1]
+    ab = polyline[1:] - a
+    ap = points[:, np.newaxis] - a
+    t = np.clip((ap * ab).sum(axis=2) / np.maximum((ab * ab).sum(axis=1), 1e-12), 0, 1)
+    return np.linalg.norm(ap - t[..., np.newaxis] * ab, axis=2).min(axis=1).max()
+
+
+class TestAdaptiveFlattening(unittest.TestCase):
+    def test_within_tolerance(self):
+        rng = np.random.default_rng(2)
+        for curve_type in (HERMITE, BEZIER, BSPLINE):
+            for segment in rng.uniform(0, 800, (10, 4, 2)):
+                for tolerance in (0.1, 0.5, 2.0):
+                    polyline = flatten_curve(segment, curve_type, tolerance)
+                    dense = curve_points(segment, curve_type, 2000)
+                    np.testing.assert_allclose(polyline[[0, -1]], dense[[0, -1]], atol=1e-9)
+                    self.assertLessEqual(polyline_distance(dense, polyline), tolerance, curve_type)
+
+    def test_point_count_follows_size_and_tolerance(self):
+        small = flatten_curve(np.array(SEGMENT) / 50, BEZIER)
+        large = flatten_curve(np.array(SEGMENT) * 4, BEZIER)
+        self.assertLess(len(small), 10)
+        self.assertGreater(len(large), 51)
+        self.assertLess(len(flatten_curve(SEGMENT, BEZIER, 2.0)), len(flatten_curve(SEGMENT, BEZIER, 0.1)))
+        self.assertEqual(len(flatten_curve([(0, 0), (1, 1), (2, 2), (3, 3)], BEZIER)), 2)
+
+    def test_batch_matches_single(self):
+        rng = np.random.default_rng(3)
+        segments = rng.uniform(0, 800, (12, 4, 2))
+        types = [(HERMITE, BEZIER, BSPLINE)[i % 3] for i in range(12)]
+        points, offsets = batch_flatten(segments, types, 0.3)
+        for k in range(12):
+            np.testing.assert_allclose(points[offsets[k]:offsets[k + 1]], flatten_curve(segments[k], types[k], 0.3))
+        self.assertEqual(batch_flatten([], [])[0].shape, (0, 2))
+
+    def test_depth_limit(self):
+        # Точность ниже достижимой: деление останавливается на max_depth
+        points, offsets = batch_flatten([SEGMENT], [BEZIER], 1e-12, max_depth=4)
+        self.assertEqual(len(points), 2 ** 4 + 1)
+
+
+class TestSplineCurve(unittest.TestCase):
+    POINTS = np.random.default_rng(4).uniform(0, 800, (13, 2)).tolist()
+
+    def test_segment_windows(self):
+        self.assertEqual(segment_windows(6, BSPLINE).tolist(), [[0, 1, 2, 3], [1, 2, 3, 4], [2, 3, 4, 5]])
+        self.assertEqual(segment_windows(8, BEZIER).tolist(), [[0, 1, 2, 3], [3, 4, 5, 6]])
+        self.assertEqual(segment_windows(3, HERMITE).shape, (0, 4))
+        self.assertEqual(segment_windows(4, BSPLINE, closed=True)[-1].tolist(), [3, 0, 1, 2])
+        self.assertEqual(segment_windows(6, BEZIER, closed=True).tolist(), [[0, 1, 2, 3], [3, 4, 5, 0]])
+
+    def test_polyline_joins_segments(self):
+        for curve_type in (HERMITE, BEZIER, BSPLINE):
+            curve = SplineCurve(curve_type, self.POINTS)
+            polyline = curve.polyline(0.5)
+            windows = segment_windows(len(self.POINTS), curve_type)
+            parts = [flatten_curve(np.array(self.POINTS)[window], curve_type, 0.5) for window in windows]
+            self.assertEqual(len(polyline), sum(map(len, parts)) - len(parts) + 1)
+            start = 0
+            for part in parts:
+                # Сегмент входит в общую ломаную без изменений; его начало — конец предыдущего
+                np.testing.assert_allclose(polyline[start], part[0], atol=1e-9)
+                np.testing.assert_array_equal(polyline[start + 1:start + len(part)], part[1:])
+                start += len(part) - 1
+
+    def test_closed_curve_returns_to_start(self):
+        curve = SplineCurve(BSPLINE, self.POINTS[:5], closed=True)
+        polyline = curve.polyline()
+        np.testing.assert_allclose(polyline[0], polyline[-1], atol=1e-9)
+        self.assertEqual(curve.segment_count(), 5)
+        with self.assertRaises(ValueError):
+            curve.append(0, 0)
+
+    def test_closing_requires_whole_segments(self):
+        # Составная кривая из 8 точек потеряла бы две последние точки
+        curve = SplineCurve(BEZIER, self.POINTS[:8])
+        with self.assertRaises(ValueError):
+            curve.set_closed(True)
+        self.assertFalse(curve.closed)
+        with self.assertRaises(ValueError):
+            SplineCurve(HERMITE, self.POINTS[:7], closed=True)
+        with self.assertRaises(ValueError):
+            SplineCurve(BSPLINE, self.POINTS[:2], closed=True)
+        curve = SplineCurve(BEZIER, self.POINTS[:9])
+        curve.set_closed(True)
+        self.assertEqual(curve.segment_count(), 3)
+
+    def test_move_point_retessellates_only_its_segments(self):
+        curve = SplineCurve(BSPLINE, self.POINTS)
+        curve.polyline()
+        kept = list(curve.segments)
+        curve.move_point(6, 400, 300)
+        self.assertEqual([points is None for points in curve.segments],
+                         [False, False, False, True, True, True, True, False, False, False])
+        np.testing.assert_array_equal(curve.polyline(), SplineCurve(BSPLINE, curve.points).polyline())
+        self.assertIs(curve.segments[0], kept[0])
+
+    def test_append_and_tolerance_change(self):
+        curve = SplineCurve(BEZIER, self.POINTS[:4])
+        self.assertEqual(curve.segment_count(), 1)
+        first = curve.polyline()
+        for point in self.POINTS[4:7]:
+            curve.append(*point)
+        self.assertEqual(curve.segment_count(), 2)
+        np.testing.assert_array_equal(curve.polyline()[:len(first)], first)
+        self.assertGreater(len(curve.polyline(0.05)), len(curve.polyline(2.0)))
+
+    def test_tessellate_many_curves(self):
+        curves = [SplineCurve(t, self.POINTS[:n]) for t, n in ((BSPLINE, 9), (BEZIER, 10), (HERMITE, 3))]
+        polylines = tessellate_curves(curves)
+        for curve, polyline in zip(curves, polylines):
+            np.testing.assert_array_equal(polyline, SplineCurve(curve.curve_type, curve.points).polyline())
+        self.assertEqual(polylines[2].shape, (0, 2))
+
+
+class TestBoundsAndPicking(unittest.TestCase):
+    POINTS = np.random.default_rng(5).uniform(0, 800, (40, 2)).tolist()
+
+    def test_bboxes_are_tight(self):
+        rng = np.random.default_rng(6)
+        segments = rng.uniform(0, 800, (60, 4, 2))
+        types = [(HERMITE, BEZIER, BSPLINE)[i % 3] for i in range(60)]
+        boxes = segment_bboxes(power_coefficients(segments, types))
+        for k in range(60):
+            dense = curve_points(segments[k], types[k], 5000)
+            expected = np.concatenate((dense.min(axis=0), dense.max(axis=0)))
+            # Прямоугольник содержит кривую и отличается от плотной выборки меньше чем на пиксель
+            np.testing.assert_allclose(boxes[k], expected, atol=1e-3)
+            self.assertTrue(np.all(boxes[k, :2] <= dense.min(axis=0)) and np.all(boxes[k, 2:] >= dense.max(axis=0)))
+
+    def test_degenerate_segments(self):
+        line = [(0, 0), (10, 10), (20, 20), (30, 30)]
+        point = [(5, 7)] * 4
+        boxes = segment_bboxes(power_coefficients([line, point], [BEZIER, BEZIER]))
+        np.testing.assert_allclose(boxes, [[0, 0, 30, 30], [5, 7, 5, 7]])
+
+    def test_distance_and_pick(self):
+        curve = SplineCurve(BEZIER, self.POINTS)
+        polyline = curve.polyline()
+        x, y = polyline[len(polyline) // 3]
+        self.assertLess(curve.distance(x, y), 1e-9)
+        self.assertEqual(curve.distance(-500, -500, 10), np.inf)
+        other = SplineCurve(BSPLINE, (np.array(self.POINTS) + 2000).tolist())
+        self.assertEqual(pick_curve([other, curve], x + 1, y, 10), 1)
+        self.assertIsNone(pick_curve([other, curve], -500, -500, 10))
+        self.assertIsNone(pick_curve([], x, y, 10))
+
+    def test_offscreen_segments_are_chords(self):
+        viewport = (0, 0, 300, 300)
+        curve = SplineCurve(BSPLINE, self.POINTS)
+        polyline = curve.polyline(viewport=viewport)
+        self.assertTrue(any(curve.culled))
+        for points, culled, box in zip(curve.segments, curve.culled, curve.bboxes()):
+            if culled:
+                self.assertEqual(len(points), 2)
+                self.assertTrue(box[0] > 300 or box[1] > 300)
+        np.testing.assert_allclose(polyline[0], curve.segments[0][0])
+        # Без окна (или после прокрутки к сегментам) ломаная совпадает с полной
+        np.testing.assert_array_equal(curve.polyline(), SplineCurve(BSPLINE, self.POINTS).polyline())
+        self.assertFalse(any(curve.culled))
+
+    def test_move_point_updates_boxes(self):
+        curve = SplineCurve(HERMITE, self.POINTS[:10])
+        curve.bbox()
+        curve.move_point(4, 2000, -300)
+        np.testing.assert_allclose(curve.bboxes(), segment_bboxes(curve.coefficients()))
+        self.assertEqual(curve.bbox()[2], curve.bboxes()[:, 2].max())
+
+
+if __name__ == "__main__":
+    unittest.main()
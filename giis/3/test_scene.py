@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from curves import HERMITE, BEZIER, BSPLINE, SplineCurve, tessellate_curves
+from scene import SCENE_HEADER, SCENE_CURVE, save_scene, load_scene
+
+
+class TestScene(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "scene.crv")
+        rng = np.random.default_rng(7)
+        self.curves = [
+            SplineCurve(BSPLINE, rng.uniform(0, 800, (9, 2)).tolist(), closed=True),
+            SplineCurve(BEZIER, rng.uniform(0, 800, (7, 2)).tolist()),
+            SplineCurve(HERMITE),
+            SplineCurve(HERMITE, [(0.5, 1.25), (2, 3), (4, 5), (6, 7.75)]),
+        ]
+
+    def test_round_trip(self):
+        save_scene(self.path, self.curves)
+        loaded = load_scene(self.path)
+        self.assertEqual([(c.curve_type, c.closed, len(c)) for c in loaded],
+                         [(c.curve_type, c.closed, len(c)) for c in self.curves])
+        self.assertIsInstance(loaded[0].points, np.memmap)
+        for curve, original in zip(loaded, self.curves):
+            np.testing.assert_allclose(curve.points, np.array(original.points).reshape(-1, 2), rtol=1e-6)
+            np.testing.assert_allclose(curve.polyline(), original.polyline(), atol=1e-3)
+        self.assertEqual(os.path.getsize(self.path), SCENE_HEADER.itemsize + 4 * SCENE_CURVE.itemsize + 20 * 8)
+
+    def test_hull_skips_offscreen_curves(self):
+        save_scene(self.path, self.curves)
+        loaded = load_scene(self.path)
+        for curve, original in zip(loaded, self.curves):
+            self.assertEqual(curve.hull, original.hull_bbox())
+        self.assertIsNone(loaded[2].hull)
+        # Кадр далеко от всех кривых: ни одна кривая не делится на сегменты
+        polylines = tessellate_curves(loaded, viewport=(5000, 5000, 5800, 5600))
+        self.assertEqual([len(polyline) for polyline in polylines], [0] * 4)
+        self.assertEqual([curve.segments for curve in loaded], [[]] * 4)
+        np.testing.assert_allclose(tessellate_curves(loaded)[1], self.curves[1].polyline(), atol=1e-3)
+
+    def test_failed_save_removes_temporary_file(self):
+        with mock.patch("scene.os.replace", side_effect=OSError("диск заполнен")):
+            with self.assertRaises(OSError):
+                save_scene(self.path, self.curves)
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), [])
+
+    def test_edits_stay_in_memory(self):
+        save_scene(self.path, self.curves)
+        curve = load_scene(self.path)[1]
+        curve.polyline()
+        curve.move_point(2, 100, 200)
+        curve.append(300, 400)
+        self.assertEqual(len(curve), 8)
+        np.testing.assert_allclose(curve.polyline(), SplineCurve(BEZIER, curve.points).polyline())
+        np.testing.assert_allclose(load_scene(self.path)[1].points, np.array(self.curves[1].points), rtol=1e-6)
+        # Перезапись того же файла не портит уже загруженную сцену
+        save_scene(self.path, [curve])
+        self.assertEqual(load_scene(self.path)[0].points[2].tolist(), [100, 200])
+
+    def test_invalid_files(self):
+        save_scene(self.path, self.curves)
+        with open(self.path, "rb") as file:
+            data = file.read()
+        for broken in (b"not a scene" * 10, data[:-4], data[:SCENE_HEADER.itemsize - 1]):
+            with open(self.path, "wb") as file:
+                file.write(broken)
+            with self.assertRaises(ValueError):
+                load_scene(self.path)
+
+    def test_closed_composite_with_partial_segment(self):
+        save_scene(self.path, self.curves)
+        # Помечаем замкнутой кривую Безье из 7 точек: 7 не делится на три
+        with open(self.path, "r+b") as file:
+            file.seek(SCENE_HEADER.itemsize + SCENE_CURVE.itemsize + SCENE_CURVE.fields['closed'][1])
+            file.write(b"\x01")
+        with self.assertRaises(ValueError):
+            load_scene(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
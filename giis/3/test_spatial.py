@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+
+from spatial import PointGrid
+
+
+def brute_nearest(points, x, y, radius):
+    best_key, best_distance = None, radius * radius
+    for key, (px, py) in points.items():
+        distance = (x - px) ** 2 + (y - py) ** 2
+        if distance < best_distance:
+            best_key, best_distance = key, distance
+    return best_key
+
+
+class TestPointGrid(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        points = {key: tuple(p) for key, p in enumerate(rng.uniform(-50, 850, (2000, 2)).tolist())}
+        grid = PointGrid(10)
+        for key, (x, y) in points.items():
+            grid.insert(key, x, y)
+        for x, y in rng.uniform(0, 800, (500, 2)).tolist():
+            for radius in (3, 10, 25):
+                self.assertEqual(grid.nearest(x, y, radius), brute_nearest(points, x, y, radius))
+
+    def test_move_remove_clear(self):
+        grid = PointGrid(10)
+        grid.insert("a", 5, 5)
+        grid.insert("b", 100, 100)
+        self.assertEqual(grid.nearest(7, 7, 10), "a")
+        grid.move("a", 95, 95)
+        self.assertIsNone(grid.nearest(7, 7, 10))
+        self.assertEqual(grid.nearest(96, 96, 10), "a")
+        grid.insert("b", -40, -40)  # Повторная вставка переносит точку
+        self.assertEqual(len(grid), 2)
+        self.assertEqual(grid.nearest(-38, -41, 10), "b")
+        grid.remove("a")
+        grid.remove("a")
+        self.assertNotIn("a", grid)
+        self.assertEqual(len(grid.cells), 1)
+        grid.clear()
+        self.assertEqual(len(grid), 0)
+        self.assertIsNone(grid.nearest(-40, -40, 10))
+
+    def test_radius_is_strict(self):
+        grid = PointGrid(10)
+        grid.insert(1, 10, 0)
+        self.assertIsNone(grid.nearest(0, 0, 10))
+        self.assertEqual(grid.nearest(0, 0, 10.5), 1)
+
+    def test_invalid_cell_size(self):
+        with self.assertRaises(ValueError):
+            PointGrid(0)
+
+
+if __name__ == "__main__":
+    unittest.main()
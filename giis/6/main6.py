@@ -1,6 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import math
+import os
+import sys
+
+COMMON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "common")
+if COMMON_DIR not in sys.path:
+    sys.path.append(COMMON_DIR)
+
+from surface import PixelSurface
 
 # --- Constants ---
 PIXEL_SIZE = 1  # For drawing individual pixels (can be > 1 for visibility)
@@ -35,6 +43,42 @@ def bresenham_line(x1, y1, x2, y2):
             y1 += sy
     return points
 
+# --- Helper: Scanline fill with an Active Edge List (no canvas, no debug output) ---
+def scanline_fill(vertices, plot):
+    """Fills a polygon scanline by scanline, calling plot(x, y) for every pixel.
+
+    Same edge table / active edge list rules as PolygonFillerApp._scanline_ael_debug:
+    horizontal edges are skipped and each span is filled up to x_end - 1.
+    """
+    edge_table = {}
+    num_vertices = len(vertices)
+    for i in range(num_vertices):
+        p1 = vertices[i]
+        p2 = vertices[(i + 1) % num_vertices]
+        if p1[1] == p2[1]:
+            continue
+        if p1[1] > p2[1]:
+            p1, p2 = p2, p1
+        slope_inv = float('inf') if p1[0] == p2[0] else (p2[0] - p1[0]) / (p2[1] - p1[1])
+        edge_table.setdefault(p1[1], []).append({'y_max': p2[1], 'x_current': float(p1[0]), 'slope_inv': slope_inv})
+
+    if not edge_table:
+        return
+    min_y = min(edge_table)
+    max_y = max(edge['y_max'] for edges in edge_table.values() for edge in edges)
+
+    active_edges = []
+    for y in range(min_y, max_y):
+        active_edges = [edge for edge in active_edges if edge['y_max'] > y]
+        active_edges.extend(edge_table.get(y, ()))
+        active_edges.sort(key=lambda edge: edge['x_current'])
+        for i in range(0, len(active_edges) - 1, 2):
+            for x in range(round(active_edges[i]['x_current']), round(active_edges[i + 1]['x_current'])):
+                plot(x, y)
+        for edge in active_edges:
+            if edge['slope_inv'] != float('inf'):
+                edge['x_current'] += edge['slope_inv']
+
 class PolygonFillerApp:
     def __init__(self, master):
         self.master = master
@@ -49,6 +93,7 @@ class PolygonFillerApp:
         self.seed_point = None
         self.is_drawing_polygon = True
         self.debug_mode = tk.BooleanVar(value=False)
+        self.legacy_pixels = tk.BooleanVar(value=False) # Debug views: one canvas item per pixel
         self.debug_generator = None
         self.debug_step_count = 0
 
@@ -85,6 +130,7 @@ class PolygonFillerApp:
         self.fill_button.config(state=tk.DISABLED)
 
         ttk.Checkbutton(controls_frame, text="Debug Mode", variable=self.debug_mode, command=self.reset_debug).pack(pady=5)
+        ttk.Checkbutton(controls_frame, text="Pixels as Canvas Items (debug)", variable=self.legacy_pixels).pack(pady=5)
         self.next_step_button = ttk.Button(controls_frame, text="Next Step", command=self.execute_next_debug_step)
         self.next_step_button.pack(fill=tk.X, pady=5)
         self.next_step_button.config(state=tk.DISABLED)
@@ -105,6 +151,8 @@ class PolygonFillerApp:
         self.canvas = tk.Canvas(self.canvas_frame, width=CANVAS_WIDTH, height=CANVAS_HEIGHT, bg=BACKGROUND_COLOR)
         self.canvas.pack(fill=tk.BOTH, expand=True)
         self.canvas.bind("<Button-1>", self.handle_canvas_click)
+        # Filled pixels go to a single PhotoImage instead of one canvas item each
+        self.surface = PixelSurface(self.canvas, CANVAS_WIDTH, CANVAS_HEIGHT, background=BACKGROUND_COLOR)
 
         self.status_bar = ttk.Label(master, text="Mode: Drawing Polygon. Click to add vertices.", relief=tk.SUNKEN, anchor=tk.W)
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
@@ -114,13 +162,11 @@ class PolygonFillerApp:
         # Ensure pixel is within canvas bounds if PIXEL_SIZE > 1
         if 0 <= x < CANVAS_WIDTH and 0 <= y < CANVAS_HEIGHT:
             # Remove previously filled pixel at this location if any
-            if (x,y) in self.filled_pixels_display:
+            if self.filled_pixels_display.get((x,y)) is not None:
                 self.canvas.delete(self.filled_pixels_display[(x,y)])
 
-            item_id = self.canvas.create_rectangle(
-                x, y, x + PIXEL_SIZE, y + PIXEL_SIZE,
-                fill=color, outline=color, tags=(tag,)
-            )
+            # Surface returns an item id only in legacy (item-per-pixel) mode
+            item_id = self.surface.put(x, y, color, size=PIXEL_SIZE, tags=(tag,))
             self.filled_pixels_display[(x,y)] = item_id
             return item_id
         return None
@@ -205,8 +251,11 @@ class PolygonFillerApp:
         self.canvas.delete("debug_highlight")
         self.canvas.delete("seed_marker") # If any old one
         for item_id in self.filled_pixels_display.values():
-            self.canvas.delete(item_id)
+            if item_id is not None:
+                self.canvas.delete(item_id)
         self.filled_pixels_display.clear()
+        self.surface.clear()
+        self.surface.legacy = self.debug_mode.get() and self.legacy_pixels.get()
 
         self.debug_text_area.config(state=tk.NORMAL)
         self.debug_text_area.delete(1.0, tk.END)
@@ -232,7 +281,7 @@ class PolygonFillerApp:
             if algo == "scanline_ordered_edge_list":
                 for _ in self._scanline_ordered_edge_list_debug(fill_color): pass
             elif algo == "scanline_ael":
-                for _ in self._scanline_ael_debug(fill_color): pass
+                scanline_fill(self.vertices, lambda x, y: self._draw_pixel(x, y, fill_color, tag="filled_pixel"))
             elif algo == "seed_fill_simple":
                 for _ in self._seed_fill_simple_debug(self.seed_point, fill_color): pass
             elif algo == "seed_fill_scanline":
@@ -296,9 +345,9 @@ class PolygonFillerApp:
         self.vertices = []
         self.current_polygon_edges = []
         self.boundary_pixels.clear()
-        for item_id in self.filled_pixels_display.values():
-            self.canvas.delete(item_id)
         self.filled_pixels_display.clear()
+        self.surface.show()
+        self.surface.clear()
         self.seed_point = None
         self.is_drawing_polygon = True # Reset to drawing mode
         
@@ -708,4 +757,4 @@ class PolygonFillerApp:
 if __name__ == '__main__':
     root = tk.Tk()
     app = PolygonFillerApp(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
@@ -0,0 +1,370 @@
+"""Замер производительности алгоритмов растеризации giis/1–giis/6 без Tk.
+
+Каждый алгоритм получает случайную (с фиксированным seed) нагрузку и
+рисует в буфер пикселей, а не на канву, поэтому результаты не зависят
+от Tk. Для каждого набора выводятся пиксели в секунду и задержка на
+один примитив (p50/p99).
+
+Запуск: python bench.py [--seed N] [--count N] [--only подстрока]
+       python bench.py --parallel [--workers N]   — масштабирование render_batch
+"""
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+GIIS_DIR = os.path.dirname(os.path.abspath(__file__))
+for lab in ("common", "1", "2", "3", "6"):
+    lab_dir = os.path.join(GIIS_DIR, lab)
+    if lab_dir not in sys.path:
+        sys.path.append(lab_dir)
+
+from raster import LINE_ALGORITHMS, new_framebuffer, plot_pixels, rasterize_segments
+from conics import (midpoint_circle, circle_pixels, midpoint_ellipse, ellipse_pixels, hyperbola, parabola,
+                    circle_conic, ellipse_conic, hyperbola_conic, conic_pixels, circle_coverage, ellipse_coverage)
+from curves import (HERMITE, BEZIER, BSPLINE, curve_points, batch_curve_points, flatten_curve, batch_flatten,
+                    power_coefficients, segment_bboxes, polyline_distance, SplineCurve, tessellate_curves, pick_curve)
+from spatial import PointGrid
+from scene import save_scene, load_scene
+from main6 import scanline_fill
+from batch import render_batch
+
+WIDTH = 800
+HEIGHT = 600
+
+
+class PixelBuffer:
+    """Приёмник пикселей: байтовый буфер кадра с отсечением по границам."""
+
+    def __init__(self, width=WIDTH, height=HEIGHT):
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(width * height)
+        self.count = 0
+
+    def plot(self, x, y):
+        self.count += 1
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.pixels[y * self.width + x] = 255
+
+
+def measure(name, primitives, render):
+    """Рисует каждый примитив через render(primitive) -> число пикселей и собирает статистику."""
+    latencies = []
+    total_pixels = 0
+    for primitive in primitives:
+        start = time.perf_counter()
+        total_pixels += render(primitive)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies)
+    total_time = latencies.sum()
+    return {
+        'name': name,
+        'primitives': len(latencies),
+        'pixels': total_pixels,
+        'pixels_per_s': total_pixels / total_time if total_time else float('inf'),
+        'p50_us': np.percentile(latencies, 50) * 1e6,
+        'p99_us': np.percentile(latencies, 99) * 1e6,
+    }
+
+
+def octant_segments(rng, count, length, octant):
+    """Отрезки заданной длины, направления которых лежат в одном октанте."""
+    angles = (octant + rng.random(count)) * (math.pi / 4)
+    x1 = rng.integers(0, WIDTH, count)
+    y1 = rng.integers(0, HEIGHT, count)
+    x2 = x1 + np.rint(length * np.cos(angles)).astype(np.int64)
+    y2 = y1 + np.rint(length * np.sin(angles)).astype(np.int64)
+    return np.column_stack((x1, y1, x2, y2))
+
+
+def random_polygon(rng, vertex_count):
+    """Звёздный многоугольник с vertex_count вершинами вокруг центра канвы."""
+    angles = np.sort(rng.random(vertex_count)) * 2 * math.pi
+    radii = rng.uniform(80, 280, vertex_count)
+    xs = np.rint(WIDTH / 2 + radii * np.cos(angles)).astype(int)
+    ys = np.rint(HEIGHT / 2 + radii * np.sin(angles)).astype(int)
+    return list(zip(xs.tolist(), ys.tolist()))
+
+
+def line_cases(rng, count, wanted):
+    for length_name, length in (("short", 12), ("long", 500)):
+        for octant in range(8):
+            segments = octant_segments(rng, count, length, octant)
+            for algorithm in LINE_ALGORITHMS:
+                name = f"line/{algorithm}/{length_name}/octant{octant}"
+                if not wanted(name):
+                    continue
+                framebuffer = new_framebuffer(WIDTH, HEIGHT, dtype=np.float32)
+
+                def render(segment, algorithm=algorithm, framebuffer=framebuffer):
+                    pixels, _, _ = rasterize_segments(segment[np.newaxis], framebuffer, algorithm)
+                    return len(pixels)
+
+                yield name, segments, render
+    # Отрезки в миллион пикселей от точки экрана: отсечение оставляет только видимые шаги
+    segments = np.concatenate([octant_segments(rng, max(count // 80, 1), 10 ** 6, octant) for octant in range(8)])
+    for algorithm in LINE_ALGORITHMS:
+        name = f"line/{algorithm}/clipped1M"
+        if not wanted(name):
+            continue
+        framebuffer = new_framebuffer(WIDTH, HEIGHT, dtype=np.float32)
+
+        def render(segment, algorithm=algorithm, framebuffer=framebuffer):
+            pixels, _, _ = rasterize_segments(segment[np.newaxis], framebuffer, algorithm)
+            return len(pixels)
+
+        yield name, segments, render
+
+
+def fixed_point_cases(rng, count, wanted):
+    # Длинные отрезки без буфера кадра: сравнение float- и 16.16-вариантов на 10 000 пикселях
+    segments = np.concatenate([octant_segments(rng, max(count // 80, 1), 10000, octant) for octant in range(8)])
+    for algorithm in ("dda", "dda_fixed", "wu", "wu_fixed"):
+
+        def render(segment, algorithm=algorithm):
+            pixels, _, _ = rasterize_segments(segment[np.newaxis], algorithm=algorithm)
+            return len(pixels)
+
+        yield f"line10k/{algorithm}", segments, render
+
+
+def conic_cases(rng, count, wanted):
+    for radius in (5, 50, 250, 1000):
+        circles = [(int(x), int(y), radius) for x, y in rng.integers(0, [WIDTH, HEIGHT], (count, 2))]
+        yield f"circle/r{radius}", circles, lambda c: render_into(midpoint_circle, *c)
+        yield f"circle_bulk/r{radius}", circles, lambda c: blit_into(circle_pixels(*c))
+        yield f"circle_aa/r{radius}", circles, lambda c: cover_into(*circle_coverage(*c))
+    ellipses = [(int(x), int(y), int(rx), int(ry)) for x, y, rx, ry in
+                rng.integers([0, 0, 5, 5], [WIDTH, HEIGHT, 300, 300], (count, 4))]
+    yield "ellipse", ellipses, lambda e: render_into(midpoint_ellipse, *e)
+    yield "ellipse_int", ellipses, lambda e: blit_into(ellipse_pixels(*e))
+    yield "ellipse_aa", ellipses, lambda e: cover_into(*ellipse_coverage(*e))
+    wide = [(x, y, rx * 100, ry * 100) for x, y, rx, ry in ellipses[:max(count // 20, 1)]]
+    yield "ellipse/x100", wide, lambda e: render_into(midpoint_ellipse, *e)
+    yield "ellipse_int/x100", wide, lambda e: blit_into(ellipse_pixels(*e))
+    hyperbolas = [(int(x), int(y), float(a), float(b)) for x, y, a, b in
+                  rng.uniform([0, 0, 10, 10], [WIDTH, HEIGHT, 100, 100], (max(count // 10, 1), 4))]
+    yield "hyperbola", hyperbolas, lambda h: render_into(hyperbola, *h, WIDTH, HEIGHT)
+    parabolas = [(int(x), int(y), float(p)) for x, y, p in
+                 rng.uniform([0, 0, 5], [WIDTH, HEIGHT, 200], (max(count // 10, 1), 3))]
+    yield "parabola", parabolas, lambda p: render_into(parabola, *p, WIDTH, HEIGHT)
+    angles = rng.uniform(0, math.pi, len(ellipses))
+    rotated = [ellipse_conic(*e, angle) for e, angle in zip(ellipses, angles)]
+    yield "conic/rotated_ellipse", rotated, lambda c: blit_into(conic_pixels(c, WIDTH, HEIGHT))
+    rotated = [hyperbola_conic(*h, angle) for h, angle in zip(hyperbolas, angles)]
+    yield "conic/rotated_hyperbola", rotated, lambda c: blit_into(conic_pixels(c, WIDTH, HEIGHT))
+
+
+def render_into(algorithm, *args):
+    """Рисует одну фигуру в новый буфер пикселей и возвращает число пикселей."""
+    sink = PixelBuffer()
+    algorithm(*args, sink.plot)
+    return sink.count
+
+
+def blit_into(pixels, width=WIDTH, height=HEIGHT):
+    """Выводит массив пикселей (N, 2) в новый буфер кадра, как PixelSurface.put_many."""
+    framebuffer = new_framebuffer(width, height)
+    xs = pixels[:, 0]
+    ys = pixels[:, 1]
+    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    framebuffer[ys[inside], xs[inside]] = 255
+    return len(pixels)
+
+
+def cover_into(pixels, coverage, width=WIDTH, height=HEIGHT):
+    """Выводит покрытие сглаженной фигуры в новый 8-битный буфер, как PixelSurface.blend_many.
+
+    Пиксели сглаженных кривых второго порядка не повторяются, поэтому
+    покрытие записывается напрямую, без суммирования через np.unique.
+    Буфер тот же, что у blit_into, и сравнение с ним — только о ядре.
+    """
+    framebuffer = new_framebuffer(width, height)
+    plot_pixels(framebuffer, pixels, coverage)
+    return len(pixels)
+
+
+def curve_cases(rng, count, wanted):
+    for curve_type in (HERMITE, BEZIER, BSPLINE):
+        for num_steps in (10, 50, 200):
+            segments = [rng.uniform(0, [WIDTH, HEIGHT], (4, 2)).tolist() for _ in range(count)]
+            yield (f"curve/{curve_type}/steps{num_steps}", segments,
+                   lambda g, t=curve_type, n=num_steps: len(curve_points(g, t, n)))
+        # Адаптивная ломаная: столбец «пикселей» — число вершин против (num_steps + 1) на сегмент
+        for tolerance in (0.25, 1.0):
+            yield (f"curve/{curve_type}/adaptive{tolerance:g}", segments,
+                   lambda g, t=curve_type, tol=tolerance: len(flatten_curve(g, t, tol)))
+    # Перерисовка всей сцены из 1000 сегментов смешанных типов: по сегменту и одним пакетом
+    scene_rng, path_rng = rng.spawn(2)
+    if wanted_any(wanted, "curve/scene1000/", ("per_segment", "batch", "adaptive", "bboxes")):
+        scenes = [(scene_rng.uniform(0, [WIDTH, HEIGHT], (1000, 4, 2)).tolist(),
+                   [(HERMITE, BEZIER, BSPLINE)[i] for i in scene_rng.integers(0, 3, 1000)])
+                  for _ in range(max(count // 20, 1))]
+        yield ("curve/scene1000/per_segment", scenes,
+               lambda s: sum(len(curve_points(g, t)) for g, t in zip(*s)))
+        yield "curve/scene1000/batch", scenes, lambda s: len(batch_curve_points(*s)[0])
+        yield "curve/scene1000/adaptive", scenes, lambda s: len(batch_flatten(*s)[0])
+        yield "curve/scene1000/bboxes", scenes, lambda s: len(segment_bboxes(power_coefficients(*s)))
+    if not wanted_any(wanted, "curve/spline1000/", ("polyline", "drag", "offscreen")):
+        return
+    # B-сплайн из 1000 точек одной ломаной: построение целиком и перенос одной точки
+    paths = [SplineCurve(BSPLINE, path_rng.uniform(0, [WIDTH, HEIGHT], (1000, 2)).tolist())
+             for _ in range(max(count // 20, 1))]
+    yield "curve/spline1000/polyline", paths, lambda c: len(SplineCurve(c.curve_type, c.points).polyline())
+
+    for curve in paths:
+        curve.polyline()
+
+    def drag(curve):
+        curve.move_point(500, *path_rng.uniform(0, [WIDTH, HEIGHT]))
+        return len(curve.polyline())
+
+    yield "curve/spline1000/drag", paths, drag
+    # Та же кривая на поле 10x10 экранов: вне кадра сегменты хранятся хордой
+    wide = [SplineCurve(BSPLINE, (np.array(c.points) * 10).tolist()) for c in paths]
+    yield ("curve/spline1000/offscreen", wide,
+           lambda c: len(SplineCurve(c.curve_type, c.points).polyline(viewport=(0, 0, WIDTH, HEIGHT))))
+
+
+def pick_cases(rng, count, wanted):
+    clicks = rng.uniform(0, [WIDTH * 10, HEIGHT * 10], (count, 2)).tolist()
+    point_rng, curve_rng = rng.spawn(2)
+    yield from point_pick_cases(point_rng, clicks, wanted)
+    if not wanted_any(wanted, "pick/", ("curve_linear/200", "curve_bbox/200")):
+        return
+    # Выбор кривой щелчком среди 200 B-сплайнов по 50 точек: расстояние до каждой ломаной и отбор по прямоугольникам
+    offsets = curve_rng.uniform(0, [WIDTH * 9, HEIGHT * 9], (200, 1, 2))
+    curves = [SplineCurve(BSPLINE, points.tolist())
+              for points in curve_rng.uniform(0, [WIDTH, HEIGHT], (200, 50, 2)) + offsets]
+    polylines = tessellate_curves(curves)
+    yield ("pick/curve_linear/200", clicks,
+           lambda click: int(min(polyline_distance(click[0], click[1], p) for p in polylines) < 10))
+    yield "pick/curve_bbox/200", clicks, lambda click: int(pick_curve(curves, click[0], click[1], 10) is not None)
+
+
+def point_pick_cases(rng, clicks, wanted):
+    if not wanted_any(wanted, "pick/", ("linear/100k", "grid/100k")):
+        return
+    # Выбор контрольной точки щелчком среди 100 000 точек: перебор, как раньше в lab3, и сетка PointGrid
+    points = rng.uniform(0, [WIDTH * 10, HEIGHT * 10], (100000, 2)).tolist()
+    grid = PointGrid(10)
+    for key, (x, y) in enumerate(points):
+        grid.insert(key, x, y)
+
+    def linear(click, tolerance=10):
+        x, y = click
+        for key in range(len(points) - 1, -1, -1):
+            px, py = points[key]
+            if (x - px) ** 2 + (y - py) ** 2 < tolerance ** 2:
+                return 1
+        return 0
+
+    yield "pick/linear/100k", clicks, linear
+    yield "pick/grid/100k", clicks, lambda click: int(grid.nearest(click[0], click[1], 10) is not None)
+
+
+def scene_cases(rng, count, wanted):
+    # Сцена из 2 000 B-сплайнов по 1 000 точек (16 МБ): открытие файла и первый кадр 800x600 на поле 10x10 экранов
+    if not wanted_any(wanted, "scene/", ("load/2M", "first_view/2M")):
+        return
+    offsets = rng.uniform(0, [WIDTH * 9, HEIGHT * 9], (2000, 1, 2))
+    curves = [SplineCurve(BSPLINE, points) for points in rng.uniform(0, [WIDTH, HEIGHT], (2000, 1000, 2)) + offsets]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "scene.crv")
+        save_scene(path, curves)
+        runs = [path] * max(count // 40, 1)
+        yield "scene/load/2M", runs, lambda p: sum(len(curve) for curve in load_scene(p))
+        yield ("scene/first_view/2M", runs,
+               lambda p: sum(map(len, tessellate_curves(load_scene(p), viewport=(0, 0, WIDTH, HEIGHT)))))
+
+
+def fill_cases(rng, count, wanted):
+    for vertex_count in (3, 8, 32, 128):
+        polygons = [random_polygon(rng, vertex_count) for _ in range(max(count // 10, 1))]
+
+        def render(polygon):
+            sink = PixelBuffer()
+            scanline_fill(polygon, sink.plot)
+            return sink.count
+
+        yield f"fill/scanline/v{vertex_count}", polygons, render
+
+
+def wanted_any(wanted, prefix, names):
+    """Нужен ли хотя бы один из наборов prefix + name — иначе нагрузку не строим."""
+    return any(wanted(prefix + name) for name in names)
+
+
+CASES = (line_cases, fixed_point_cases, conic_cases, curve_cases, pick_cases, scene_cases, fill_cases)
+
+
+def run(seed=0, count=200, only=None):
+    """Прогоняет наборы, в имени которых есть only (все, если не задано), и возвращает результаты measure().
+
+    Генератор набора получает wanted(name) и строит тяжёлую нагрузку только
+    для выбранных наборов. У каждой группы и у её тяжёлых блоков свой поток
+    случайных чисел, так что пропуск одних наборов не меняет данные других.
+    """
+    def wanted(name):
+        return not only or only in name
+
+    results = []
+    for index, cases in enumerate(CASES):
+        rng = np.random.default_rng([seed, index])
+        for name, primitives, render in cases(rng, count, wanted):
+            if wanted(name):
+                results.append(measure(name, primitives, render))
+    return results
+
+
+def run_parallel(seed=0, count=200, max_workers=None):
+    """Масштабирование render_batch: время на count * 50 окружностей и эллипсов по числу процессов."""
+    rng = np.random.default_rng(seed)
+    total = count * 50
+    primitives = [circle_conic(int(x), int(y), int(r))
+                  for x, y, r in rng.integers([0, 0, 3], [WIDTH, HEIGHT, 60], (total // 2, 3))]
+    primitives += [ellipse_conic(int(x), int(y), int(rx), int(ry), float(angle))
+                   for (x, y, rx, ry), angle in zip(rng.integers([0, 0, 3, 3], [WIDTH, HEIGHT, 60, 60],
+                                                                 (total - total // 2, 4)).tolist(),
+                                                    rng.uniform(0, math.pi, total - total // 2))]
+    max_workers = max_workers or os.cpu_count() or 1
+    # Ускорение выше числа ядер невозможно: при одном ядре таблица показывает только накладные расходы
+    print(f"ядер: {os.cpu_count()}")
+    print(f"{'процессов':>10} {'фигур':>8} {'время, с':>10} {'ускорение':>10} {'эффект.':>8}")
+    # Степени двойки и само max_workers
+    worker_counts = sorted({2 ** i for i in range(max_workers.bit_length()) if 2 ** i <= max_workers} | {max_workers})
+    base = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        render_batch(primitives, WIDTH, HEIGHT, workers=workers)
+        elapsed = time.perf_counter() - start
+        base = base or elapsed
+        print(f"{workers:>10} {len(primitives):>8} {elapsed:>10.3f} {base / elapsed:>10.2f} "
+              f"{base / elapsed / workers:>8.2f}")
+
+
+def print_report(results):
+    print(f"{'набор':<40} {'прим.':>6} {'пикселей':>10} {'пикс/с':>12} {'p50, мкс':>10} {'p99, мкс':>10}")
+    for r in results:
+        print(f"{r['name']:<40} {r['primitives']:>6} {r['pixels']:>10} {r['pixels_per_s']:>12.0f} "
+              f"{r['p50_us']:>10.1f} {r['p99_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Замер алгоритмов растеризации")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--count", type=int, default=200, help="примитивов в наборе")
+    parser.add_argument("--only", help="запускать только наборы, содержащие подстроку")
+    parser.add_argument("--parallel", action="store_true",
+                        help="замерить масштабирование render_batch по числу процессов")
+    parser.add_argument("--workers", type=int, help="наибольшее число процессов для --parallel")
+    args = parser.parse_args()
+    if args.parallel:
+        run_parallel(args.seed, args.count, args.workers)
+    else:
+        print_report(run(args.seed, args.count, args.only))
@@ -0,0 +1,111 @@
+"""Отсечение отрезков прямоугольником: алгоритмы Коэна–Сазерленда и Лианга–Барски."""
+import numpy as np
+
+INSIDE = 0
+LEFT = 1
+RIGHT = 2
+BOTTOM = 4
+TOP = 8
+
+
+def outcode(x, y, xmin, ymin, xmax, ymax):
+    """Код области точки относительно прямоугольника отсечения.
+
+    Работает и для чисел, и для массивов координат: тогда возвращает массив кодов.
+    """
+    return (x < xmin) * LEFT | (x > xmax) * RIGHT | (y < ymin) * BOTTOM | (y > ymax) * TOP
+
+
+def cohen_sutherland(x1, y1, x2, y2, xmin, ymin, xmax, ymax):
+    """Отсекает отрезок алгоритмом Коэна–Сазерленда.
+
+    Возвращает концы видимой части (x1, y1, x2, y2) или None,
+    если отрезок целиком вне прямоугольника.
+    """
+    code1 = outcode(x1, y1, xmin, ymin, xmax, ymax)
+    code2 = outcode(x2, y2, xmin, ymin, xmax, ymax)
+    while True:
+        if not (code1 | code2):
+            return x1, y1, x2, y2
+        if code1 & code2:
+            return None
+
+        code = code1 or code2
+        if code & TOP:
+            x = x1 + (x2 - x1) * (ymax - y1) / (y2 - y1)
+            y = ymax
+        elif code & BOTTOM:
+            x = x1 + (x2 - x1) * (ymin - y1) / (y2 - y1)
+            y = ymin
+        elif code & RIGHT:
+            y = y1 + (y2 - y1) * (xmax - x1) / (x2 - x1)
+            x = xmax
+        else:
+            y = y1 + (y2 - y1) * (xmin - x1) / (x2 - x1)
+            x = xmin
+
+        if code == code1:
+            x1, y1 = x, y
+            code1 = outcode(x1, y1, xmin, ymin, xmax, ymax)
+        else:
+            x2, y2 = x, y
+            code2 = outcode(x2, y2, xmin, ymin, xmax, ymax)
+
+
+def liang_barsky(x1, y1, x2, y2, xmin, ymin, xmax, ymax):
+    """Отсекает отрезок параметрическим алгоритмом Лианга–Барски.
+
+    Возвращает концы видимой части (x1, y1, x2, y2) или None.
+    """
+    dx = x2 - x1
+    dy = y2 - y1
+    t0, t1 = 0.0, 1.0
+    for p, q in ((-dx, x1 - xmin), (dx, xmax - x1), (-dy, y1 - ymin), (dy, ymax - y1)):
+        if p == 0:
+            if q < 0:
+                return None
+            continue
+        t = q / p
+        if p < 0:
+            if t > t1:
+                return None
+            t0 = max(t0, t)
+        else:
+            if t < t0:
+                return None
+            t1 = min(t1, t)
+    return x1 + t0 * dx, y1 + t0 * dy, x1 + t1 * dx, y1 + t1 * dy
+
+
+def liang_barsky_batch(segments, xmin, ymin, xmax, ymax):
+    """Векторный Лианг–Барски для массива отрезков (N, 4).
+
+    Возвращает отсечённые отрезки (N, 4) float64 и маску видимых отрезков.
+    Строки невидимых отрезков не определены.
+    """
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    x1, y1, x2, y2 = segments.T
+    dx = x2 - x1
+    dy = y2 - y1
+    t0 = np.zeros(len(segments))
+    t1 = np.ones(len(segments))
+    visible = np.ones(len(segments), dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for p, q in ((-dx, x1 - xmin), (dx, xmax - x1), (-dy, y1 - ymin), (dy, ymax - y1)):
+            parallel = p == 0
+            visible &= ~(parallel & (q < 0))
+            t = q / np.where(parallel, 1.0, p)
+            entering = (p < 0) & ~parallel
+            leaving = (p > 0) & ~parallel
+            t0 = np.where(entering, np.maximum(t0, t), t0)
+            t1 = np.where(leaving, np.minimum(t1, t), t1)
+    visible &= t0 <= t1
+
+    clipped = np.column_stack((x1 + t0 * dx, y1 + t0 * dy, x1 + t1 * dx, y1 + t1 * dy))
+    return clipped, visible
+
+
+def rect_intersects(bbox, rect):
+    """Пересекаются ли прямоугольники (xmin, ymin, xmax, ymax) включительно."""
+    return not (bbox[2] < rect[0] or bbox[0] > rect[2] or
+                bbox[3] < rect[1] or bbox[1] > rect[3])
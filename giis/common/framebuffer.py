@@ -0,0 +1,59 @@
+"""Буфер кадра покрытия и его смешивание с цветом — общее для растеризаторов."""
+import numpy as np
+
+
+def new_framebuffer(width, height, dtype=np.uint8):
+    """Создаёт пустой буфер кадра (height, width): uint8 или float32 покрытие."""
+    return np.zeros((height, width), dtype=dtype)
+
+
+def plot_pixels(framebuffer, pixels, coverage, accumulate=False):
+    """Записывает пиксели в буфер кадра, отбрасывая точки вне его границ.
+
+    При accumulate=True покрытие прибавляется к буферу float32, так что
+    пересекающиеся линии складываются, а не затирают друг друга.
+    """
+    height, width = framebuffer.shape
+    xs = pixels[:, 0]
+    ys = pixels[:, 1]
+    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    values = coverage[inside]
+    if accumulate:
+        if framebuffer.dtype != np.float32:
+            raise ValueError("Накопление покрытия требует буфер float32")
+        # Суммируем повторяющиеся индексы через np.unique + np.bincount —
+        # быстрый эквивалент np.add.at, не зависящий от размера буфера.
+        # Запись по парам индексов работает и для среза (не непрерывного буфера)
+        flat = ys[inside].astype(np.int64) * width + xs[inside]
+        unique, inverse = np.unique(flat, return_inverse=True)
+        framebuffer[unique // width, unique % width] += np.bincount(inverse, weights=values).astype(np.float32)
+        return
+    if framebuffer.dtype == np.uint8:
+        values = np.rint(values * 255).astype(np.uint8)
+    framebuffer[ys[inside], xs[inside]] = values
+
+
+def blend(base, ink, coverage):
+    """Смешивает base с цветом чернил по покрытию: base + (ink - base) * coverage.
+
+    base — цвет (3,) или массив (..., 3), coverage — (...,) в [0, 1];
+    результат — 8-битный RGB (..., 3). Так смешиваются и отрезки
+    алгоритма Ву, и сглаженные окружности и эллипсы.
+    """
+    base = np.asarray(base, dtype=np.float32)
+    ink = np.asarray(ink, dtype=np.float32)
+    rgb = base + (ink - base) * np.asarray(coverage, dtype=np.float32)[..., np.newaxis]
+    return np.rint(rgb).astype(np.uint8)
+
+
+def resolve(framebuffer, ink=(0, 0, 0), background=(255, 255, 255)):
+    """Сводит буфер покрытия к 8-битному RGB (H, W, 3).
+
+    Накопленное покрытие насыщается на 1, после чего цвет чернил
+    смешивается с фоном: rgb = background + (ink - background) * coverage.
+    """
+    if framebuffer.dtype == np.uint8:
+        coverage = framebuffer.astype(np.float32) / 255
+    else:
+        coverage = np.clip(framebuffer, 0.0, 1.0)
+    return blend(background, ink, coverage)
@@ -0,0 +1,130 @@
+"""Общая поверхность пикселей для редакторов: один tk.PhotoImage вместо элемента канвы на пиксель."""
+import tkinter as tk
+
+import numpy as np
+
+from framebuffer import blend
+
+
+class PixelSurface:
+    """Буфер RGB (NumPy), выводимый на канву одним изображением.
+
+    Пиксели пишутся в массив, а в PhotoImage уходит только изменённая
+    полоса строк — одним вызовом put на кадр (после after_idle).
+    При legacy=True каждый пиксель по-старому рисуется отдельным
+    прямоугольником канвы — это удобно для отладочных представлений.
+    """
+
+    def __init__(self, canvas, width, height, background="white", legacy=False):
+        self.canvas = canvas
+        self.width = width
+        self.height = height
+        self.legacy = legacy
+        self.colors = {}
+        self.background = self.color_rgb(background)
+        self.rgb = np.empty((height, width, 3), dtype=np.uint8)
+        self.rgb[...] = self.background
+        self.image = tk.PhotoImage(width=width, height=height)
+        self.item = None
+        self.dirty = None
+        self.flush_job = None
+        self.invalidate(0, 0, width, height)
+        self.show()
+
+    def color_rgb(self, color):
+        """Переводит цвет Tk (имя или #rrggbb) в тройку байтов, с кэшем."""
+        if color not in self.colors:
+            r, g, b = self.canvas.winfo_rgb(color)
+            self.colors[color] = (r >> 8, g >> 8, b >> 8)
+        return self.colors[color]
+
+    def show(self):
+        """Создаёт элемент изображения, если канву очистили, и опускает его под остальные."""
+        if self.item is None or not self.canvas.type(self.item):
+            self.item = self.canvas.create_image(0, 0, anchor=tk.NW, image=self.image, tags="surface")
+        self.canvas.tag_lower(self.item)
+
+    def put(self, x, y, color="black", size=1, tags=()):
+        """Закрашивает квадрат size x size с левым верхним углом (x, y).
+
+        В режиме legacy возвращает id созданного прямоугольника канвы.
+        """
+        if self.legacy:
+            return self.canvas.create_rectangle(x, y, x + size, y + size, fill=color, outline=color, tags=tags)
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + size, self.width), min(y + size, self.height)
+        if x0 < x1 and y0 < y1:
+            self.rgb[y0:y1, x0:x1] = self.color_rgb(color)
+            self.invalidate(x0, y0, x1, y1)
+        return None
+
+    def put_many(self, pixels, color="black"):
+        """Закрашивает массив пикселей (N, 2) одним присваиванием NumPy."""
+        pixels = np.asarray(pixels).reshape(-1, 2)
+        if self.legacy:
+            for x, y in pixels.tolist():
+                self.put(x, y, color)
+            return
+        xs = pixels[:, 0]
+        ys = pixels[:, 1]
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        xs = xs[inside]
+        ys = ys[inside]
+        if len(xs):
+            self.rgb[ys, xs] = self.color_rgb(color)
+            self.invalidate(int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)
+
+    def blend_many(self, pixels, coverage, color="black"):
+        """Смешивает пиксели (N, 2) с цветом по покрытию (N,) — как сглаженные линии в giis/1."""
+        pixels = np.asarray(pixels).reshape(-1, 2)
+        coverage = np.clip(np.asarray(coverage, dtype=np.float32), 0.0, 1.0)
+        ink = self.color_rgb(color)
+        if self.legacy:
+            for (x, y), rgb in zip(pixels.tolist(), blend(self.background, ink, coverage).tolist()):
+                self.put(x, y, "#%02x%02x%02x" % tuple(rgb))
+            return
+        xs = pixels[:, 0]
+        ys = pixels[:, 1]
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        xs = xs[inside]
+        ys = ys[inside]
+        if len(xs):
+            self.rgb[ys, xs] = blend(self.rgb[ys, xs], ink, coverage[inside])
+            self.invalidate(int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)
+
+    def blit(self, rgb, x=0, y=0):
+        """Копирует готовый блок RGB (H, W, 3) в поверхность."""
+        height, width = rgb.shape[:2]
+        self.rgb[y:y + height, x:x + width] = rgb
+        self.invalidate(x, y, x + width, y + height)
+
+    def clear(self, rect=None):
+        """Заливает фоном всю поверхность или прямоугольник rect = (xmin, ymin, xmax, ymax) включительно."""
+        x0, y0, x1, y1 = (0, 0, self.width, self.height) if rect is None else \
+            (max(rect[0], 0), max(rect[1], 0), min(rect[2] + 1, self.width), min(rect[3] + 1, self.height))
+        if x0 < x1 and y0 < y1:
+            self.rgb[y0:y1, x0:x1] = self.background
+            self.invalidate(x0, y0, x1, y1)
+
+    def invalidate(self, x0, y0, x1, y1):
+        """Добавляет прямоугольник к области, которую нужно вывести, и планирует вывод."""
+        if self.dirty is None:
+            self.dirty = [x0, y0, x1, y1]
+        else:
+            self.dirty = [min(self.dirty[0], x0), min(self.dirty[1], y0),
+                          max(self.dirty[2], x1), max(self.dirty[3], y1)]
+        if self.flush_job is None:
+            self.flush_job = self.canvas.after_idle(self.flush)
+
+    def flush(self):
+        """Выводит изменённую область в PhotoImage одним блоком PPM."""
+        if self.flush_job is not None:
+            self.canvas.after_cancel(self.flush_job)
+            self.flush_job = None
+        if self.dirty is None:
+            return
+        x0, y0, x1, y1 = self.dirty
+        self.dirty = None
+        block = np.ascontiguousarray(self.rgb[y0:y1, x0:x1])
+        data = f"P6 {x1 - x0} {y1 - y0} 255\n".encode("ascii") + block.tobytes()
+        self.image.tk.call(self.image.name, "put", data, "-format", "ppm", "-to", x0, y0)
@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+
+from clipping import (cohen_sutherland, liang_barsky, liang_barsky_batch, outcode,
+                      rect_intersects, INSIDE, LEFT, RIGHT, BOTTOM, TOP)
+
+RECT = (0, 0, 799, 599)
+
+
+class TestClipping(unittest.TestCase):
+    def test_outcode(self):
+        self.assertEqual(outcode(10, 10, *RECT), INSIDE)
+        self.assertEqual(outcode(-1, 700, *RECT), LEFT | TOP)
+        codes = outcode(np.array([10, -1, 900]), np.array([10, 700, -5]), *RECT)
+        self.assertEqual(codes.tolist(), [INSIDE, LEFT | TOP, RIGHT | BOTTOM])
+
+    def test_inside_segment_is_unchanged(self):
+        for clip in (cohen_sutherland, liang_barsky):
+            self.assertEqual(clip(10, 20, 300, 400, *RECT), (10, 20, 300, 400))
+
+    def test_outside_segment_is_rejected(self):
+        for clip in (cohen_sutherland, liang_barsky):
+            self.assertIsNone(clip(-100, -5, -1, 5000, *RECT))
+            self.assertIsNone(clip(900, 10, 1000, 10, *RECT))
+
+    def test_crossing_segment_is_cut_to_border(self):
+        for clip in (cohen_sutherland, liang_barsky):
+            x1, y1, x2, y2 = clip(-100, 300, 1000, 300, *RECT)
+            self.assertAlmostEqual(x1, 0)
+            self.assertAlmostEqual(x2, 799)
+            self.assertAlmostEqual(y1, 300)
+
+    def test_algorithms_agree(self):
+        rng = np.random.default_rng(6)
+        segments = rng.integers(-2000, 2000, size=(500, 4))
+        clipped, visible = liang_barsky_batch(segments, *RECT)
+        for i, segment in enumerate(segments.tolist()):
+            expected = liang_barsky(*segment, *RECT)
+            self.assertEqual(visible[i], expected is not None)
+            other = cohen_sutherland(*segment, *RECT)
+            self.assertEqual(other is None, expected is None)
+            if expected is not None:
+                np.testing.assert_allclose(clipped[i], expected, atol=1e-9)
+                np.testing.assert_allclose(other, expected, atol=1e-6)
+
+    def test_rect_intersects(self):
+        self.assertTrue(rect_intersects((-10, -10, 0, 0), RECT))
+        self.assertFalse(rect_intersects((800, 0, 900, 100), RECT))
+
+
+if __name__ == "__main__":
+    unittest.main()